@@ -13,7 +13,14 @@ from src.core.database import Base
 from src.models.user import User
 from src.models.book import Book
 from src.models.reader import Reader
-from src.models.borrowing import BorrowedBook
+from src.models.borrowing import BorrowedBook, ArchivedBorrowing
+from src.models.branch import Branch, BranchInventory, BookStockChange
+from src.models.item import Item
+from src.models.analytics import DailyBookStats, DailyReaderStats
+from src.models.hold import Hold
+from src.models.recommendation import BookNeighbour
+from src.models.audit import AuditEvent
+from src.models.outbox import OutboxEvent
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
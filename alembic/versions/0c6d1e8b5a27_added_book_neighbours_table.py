@@ -0,0 +1,34 @@
+"""added book neighbours table
+
+Revision ID: 0c6d1e8b5a27
+Revises: f2b7c4d98e15
+Create Date: 2026-02-24 16:03:51.774019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c6d1e8b5a27'
+down_revision: Union[str, Sequence[str], None] = 'f2b7c4d98e15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('book_neighbours',
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.SmallInteger(), nullable=False),
+    sa.Column('neighbour_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('book_id', 'rank')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('book_neighbours')
@@ -0,0 +1,62 @@
+"""branches and branch inventory
+
+Revision ID: 3c8a5f0d7e19
+Revises: 9b1f3d7e2a64
+Create Date: 2026-03-05 15:22:49.604118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c8a5f0d7e19'
+down_revision: Union[str, Sequence[str], None] = '9b1f3d7e2a64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('branches',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('code', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('code')
+    )
+    # First row of a fresh table, so it gets id 1 (Branch.DEFAULT_ID)
+    op.execute("INSERT INTO branches (code, name) VALUES ('main', 'Main branch')")
+
+    op.create_table('branch_inventory',
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('branch_id', sa.Integer(), nullable=False),
+    sa.Column('copies_available', sa.Integer(), nullable=False),
+    sa.CheckConstraint('copies_available >= 0', name='ck_branch_inventory_copies'),
+    sa.ForeignKeyConstraint(['book_id'], ['books.id'], ),
+    sa.ForeignKeyConstraint(['branch_id'], ['branches.id'], ),
+    sa.PrimaryKeyConstraint('book_id', 'branch_id')
+    )
+    op.create_index('ix_branch_inventory_branch', 'branch_inventory', ['branch_id', 'book_id'], unique=False)
+
+    # Every existing copy belongs to the default branch
+    op.execute(
+        'INSERT INTO branch_inventory (book_id, branch_id, copies_available) '
+        'SELECT id, 1, copies_available FROM books'
+    )
+
+    op.add_column('borrowed_books', sa.Column('branch_id', sa.Integer(), server_default='1', nullable=False))
+    op.create_foreign_key('borrowed_books_branch_id_fkey', 'borrowed_books', 'branches', ['branch_id'], ['id'])
+    op.add_column('borrowed_books_archive', sa.Column('branch_id', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('borrowed_books_archive', 'branch_id')
+    op.drop_constraint('borrowed_books_branch_id_fkey', 'borrowed_books', type_='foreignkey')
+    op.drop_column('borrowed_books', 'branch_id')
+    op.drop_index('ix_branch_inventory_branch', table_name='branch_inventory')
+    op.drop_table('branch_inventory')
+    op.drop_table('branches')
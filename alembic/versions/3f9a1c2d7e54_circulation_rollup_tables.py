@@ -0,0 +1,74 @@
+"""circulation rollup tables
+
+Revision ID: 3f9a1c2d7e54
+Revises: dc04a1577bc9
+Create Date: 2026-01-12 10:14:02.118530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9a1c2d7e54'
+down_revision: Union[str, Sequence[str], None] = 'dc04a1577bc9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('daily_book_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('checkouts', sa.Integer(), nullable=False),
+    sa.Column('returns', sa.Integer(), nullable=False),
+    sa.Column('loan_seconds', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'book_id')
+    )
+    op.create_table('daily_reader_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('reader_id', sa.Integer(), nullable=False),
+    sa.Column('checkouts', sa.Integer(), nullable=False),
+    sa.Column('returns', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'reader_id')
+    )
+
+    # Backfill the rollups from the existing history once
+    op.execute("""
+        INSERT INTO daily_book_stats (day, book_id, checkouts, returns, loan_seconds)
+        SELECT day, book_id, SUM(checkouts), SUM(returns), SUM(loan_seconds)
+        FROM (
+            SELECT CAST(borrow_date AT TIME ZONE 'UTC' AS date) AS day, book_id,
+                   1 AS checkouts, 0 AS returns, 0 AS loan_seconds
+            FROM borrowed_books
+            UNION ALL
+            SELECT CAST(return_date AT TIME ZONE 'UTC' AS date), book_id, 0, 1,
+                   GREATEST(CAST(EXTRACT(EPOCH FROM return_date - borrow_date) AS bigint), 0)
+            FROM borrowed_books
+            WHERE return_date IS NOT NULL
+        ) AS events
+        GROUP BY day, book_id
+    """)
+    op.execute("""
+        INSERT INTO daily_reader_stats (day, reader_id, checkouts, returns)
+        SELECT day, reader_id, SUM(checkouts), SUM(returns)
+        FROM (
+            SELECT CAST(borrow_date AT TIME ZONE 'UTC' AS date) AS day, reader_id,
+                   1 AS checkouts, 0 AS returns
+            FROM borrowed_books
+            UNION ALL
+            SELECT CAST(return_date AT TIME ZONE 'UTC' AS date), reader_id, 0, 1
+            FROM borrowed_books
+            WHERE return_date IS NOT NULL
+        ) AS events
+        GROUP BY day, reader_id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('daily_reader_stats')
+    op.drop_table('daily_book_stats')
@@ -0,0 +1,47 @@
+"""reader trigram search indexes
+
+Revision ID: 4d8e2f6a1b93
+Revises: e7a3b9f2c416
+Create Date: 2026-02-12 10:21:05.418227
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d8e2f6a1b93'
+down_revision: Union[str, Sequence[str], None] = 'e7a3b9f2c416'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    op.create_index(
+        'ix_readers_name_trgm',
+        'readers',
+        ['name'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'name': 'gin_trgm_ops'}
+    )
+    op.create_index(
+        'ix_readers_email_trgm',
+        'readers',
+        ['email'],
+        unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'email': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_readers_email_trgm', table_name='readers')
+    op.drop_index('ix_readers_name_trgm', table_name='readers')
@@ -0,0 +1,228 @@
+"""items with barcodes
+
+Revision ID: 7d2e9a4c6b18
+Revises: 3c8a5f0d7e19
+Create Date: 2026-03-09 11:07:35.842211
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e9a4c6b18'
+down_revision: Union[str, Sequence[str], None] = '3c8a5f0d7e19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+items = sa.table(
+    'items',
+    sa.column('book_id', sa.Integer()),
+    sa.column('branch_id', sa.Integer()),
+    sa.column('copy_number', sa.Integer()),
+    sa.column('barcode', sa.String()),
+    sa.column('status', sa.String())
+)
+
+
+def barcode(book_id: int, copy_number: int) -> str:
+    # Same format as Item.default_barcode
+    return f'{book_id:07d}{copy_number:05d}'
+
+
+def explode_inventory(conn: sa.Connection) -> None:
+    """One available item per counted copy, a committed batch of books at a time."""
+    last_book_id = 0
+    while True:
+        with conn.begin():
+            book_ids = conn.execute(
+                sa.text('SELECT id FROM books WHERE id > :last ORDER BY id LIMIT :limit'),
+                {'last': last_book_id, 'limit': BATCH_SIZE}
+            ).scalars().all()
+            if not book_ids:
+                break
+            last_book_id = book_ids[-1]
+
+            stock = conn.execute(
+                sa.text(
+                    'SELECT book_id, branch_id, copies_available FROM branch_inventory '
+                    'WHERE book_id >= :first AND book_id <= :last AND copies_available > 0 '
+                    'ORDER BY book_id, branch_id'
+                ),
+                {'first': book_ids[0], 'last': last_book_id}
+            ).all()
+
+            rows = []
+            copy_numbers = {}
+            for book_id, branch_id, copies in stock:
+                for _ in range(copies):
+                    copy_number = copy_numbers[book_id] = copy_numbers.get(book_id, 0) + 1
+                    rows.append({
+                        'book_id': book_id,
+                        'branch_id': branch_id,
+                        'copy_number': copy_number,
+                        'barcode': barcode(book_id, copy_number),
+                        'status': 'available'
+                    })
+            if rows:
+                conn.execute(items.insert(), rows)
+
+
+def link_active_loans(conn: sa.Connection) -> None:
+    """Give every open loan an item of its own, numbered after the shelved copies.
+
+    Each batch of loans gets its items and its ``item_id`` in one short
+    transaction, so only those rows are locked, and only until it commits.
+    """
+    with conn.begin():
+        copy_numbers = dict(conn.execute(
+            sa.text('SELECT book_id, max(copy_number) FROM items GROUP BY book_id')
+        ).all())
+
+    last_loan_id = 0
+    while True:
+        with conn.begin():
+            loans = conn.execute(
+                sa.text(
+                    'SELECT id, book_id, branch_id, borrow_date FROM borrowed_books '
+                    'WHERE return_date IS NULL AND id > :last ORDER BY id LIMIT :limit'
+                ),
+                {'last': last_loan_id, 'limit': BATCH_SIZE}
+            ).all()
+            if not loans:
+                break
+            last_loan_id = loans[-1].id
+
+            rows = []
+            links = []
+            for loan_id, book_id, branch_id, borrow_date in loans:
+                copy_number = copy_numbers[book_id] = copy_numbers.get(book_id, 0) + 1
+                rows.append({
+                    'book_id': book_id,
+                    'branch_id': branch_id,
+                    'copy_number': copy_number,
+                    'barcode': barcode(book_id, copy_number),
+                    'status': 'on_loan'
+                })
+                links.append({'id': loan_id, 'borrow_date': borrow_date, 'barcode': barcode(book_id, copy_number)})
+
+            conn.execute(items.insert(), rows)
+            # borrow_date is part of the key and prunes the update to one partition
+            conn.execute(
+                sa.text(
+                    'UPDATE borrowed_books SET item_id = (SELECT id FROM items WHERE items.barcode = :barcode) '
+                    'WHERE id = :id AND borrow_date = :borrow_date'
+                ),
+                links
+            )
+
+
+def create_active_item_index(bind) -> None:
+    """``ix_borrowed_books_active_item`` without blocking writes to the loans."""
+    if bind.dialect.name != 'postgresql':
+        op.create_index(
+            'ix_borrowed_books_active_item',
+            'borrowed_books',
+            ['item_id'],
+            unique=False,
+            sqlite_where=sa.text('return_date IS NULL')
+        )
+        return
+
+    partitioned = bind.execute(
+        sa.text(
+            'SELECT 1 FROM pg_partitioned_table t '
+            "JOIN pg_class c ON c.oid = t.partrelid WHERE c.relname = 'borrowed_books'"
+        )
+    ).first() is not None
+    if not partitioned:
+        op.create_index(
+            'ix_borrowed_books_active_item',
+            'borrowed_books',
+            ['item_id'],
+            unique=False,
+            postgresql_where=sa.text('return_date IS NULL'),
+            postgresql_concurrently=True
+        )
+        return
+
+    # A partitioned index can't be built CONCURRENTLY; it starts out invalid on
+    # the parent only and becomes valid once every partition's index is attached
+    op.execute('CREATE INDEX ix_borrowed_books_active_item ON ONLY borrowed_books (item_id) WHERE return_date IS NULL')
+    partitions = bind.execute(
+        sa.text(
+            'SELECT c.relname FROM pg_inherits i '
+            'JOIN pg_class c ON c.oid = i.inhrelid '
+            'JOIN pg_class p ON p.oid = i.inhparent '
+            "WHERE p.relname = 'borrowed_books' ORDER BY c.relname"
+        )
+    ).scalars().all()
+    for partition in partitions:
+        index = f'{partition}_item_id_idx'
+        op.execute(f'CREATE INDEX CONCURRENTLY {index} ON {partition} (item_id) WHERE return_date IS NULL')
+        op.execute(f'ALTER INDEX ix_borrowed_books_active_item ATTACH PARTITION {index}')
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    The migration's own transaction is committed around the long steps. Their
+    batches run on a connection of their own and commit one by one, so no
+    lock is held for the whole run.
+    """
+    bind = op.get_bind()
+
+    op.create_table('items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('branch_id', sa.Integer(), nullable=False),
+    sa.Column('copy_number', sa.Integer(), nullable=False),
+    sa.Column('barcode', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['book_id'], ['books.id'], ),
+    sa.ForeignKeyConstraint(['branch_id'], ['branches.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    with op.get_context().autocommit_block(), bind.engine.connect() as conn:
+        # Only writes to the new table and reads the others
+        explode_inventory(conn)
+
+    op.create_index('ux_items_barcode', 'items', ['barcode'], unique=True)
+    op.create_index('ux_items_copy', 'items', ['book_id', 'copy_number'], unique=True)
+    op.create_index(
+        'ix_items_available',
+        'items',
+        ['book_id', 'branch_id', 'id'],
+        unique=False,
+        postgresql_where=sa.text("status = 'available'")
+    )
+
+    with op.get_context().autocommit_block(), bind.engine.connect() as conn:
+        # A nullable column without a default only touches the catalog, and
+        # its ACCESS EXCLUSIVE lock is released as soon as it is added
+        op.add_column('borrowed_books', sa.Column('item_id', sa.Integer(), nullable=True))
+        op.add_column('borrowed_books_archive', sa.Column('item_id', sa.Integer(), nullable=True))
+        link_active_loans(conn)
+        create_active_item_index(bind)
+        # Postgres can't add a NOT VALID foreign key to a partitioned table, so
+        # this validates with a scan that holds off writes to the loans; it is
+        # the only step that does, and it commits on its own
+        op.create_foreign_key('borrowed_books_item_id_fkey', 'borrowed_books', 'items', ['item_id'], ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_borrowed_books_active_item', table_name='borrowed_books')
+    op.drop_constraint('borrowed_books_item_id_fkey', 'borrowed_books', type_='foreignkey')
+    op.drop_column('borrowed_books_archive', 'item_id')
+    op.drop_column('borrowed_books', 'item_id')
+    op.drop_index('ix_items_available', table_name='items')
+    op.drop_index('ux_items_copy', table_name='items')
+    op.drop_index('ux_items_barcode', table_name='items')
+    op.drop_table('items')
@@ -0,0 +1,43 @@
+"""borrowing due dates
+
+Revision ID: 8b2e6d41c0f3
+Revises: 3f9a1c2d7e54
+Create Date: 2026-01-19 16:32:47.504118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e6d41c0f3'
+down_revision: Union[str, Sequence[str], None] = '3f9a1c2d7e54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('borrowed_books', sa.Column('due_date', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('borrowed_books', sa.Column('overdue_notified_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Existing loans get the default 14 day loan period
+    op.execute("UPDATE borrowed_books SET due_date = borrow_date + INTERVAL '14 days'")
+    op.alter_column('borrowed_books', 'due_date', nullable=False)
+
+    op.create_index(
+        'ix_borrowed_books_active_due_date',
+        'borrowed_books',
+        ['due_date'],
+        unique=False,
+        postgresql_where=sa.text('return_date IS NULL')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_borrowed_books_active_due_date', table_name='borrowed_books')
+    op.drop_column('borrowed_books', 'overdue_notified_at')
+    op.drop_column('borrowed_books', 'due_date')
@@ -0,0 +1,125 @@
+"""soft deletes and borrowing archive
+
+Revision ID: a93c5e17d2f8
+Revises: 4d8e2f6a1b93
+Create Date: 2026-02-16 11:08:42.907153
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93c5e17d2f8'
+down_revision: Union[str, Sequence[str], None] = '4d8e2f6a1b93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('books', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('readers', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+
+    # Uniqueness only applies to live rows
+    op.drop_index(op.f('ix_books_isbn'), table_name='books')
+    op.create_index(
+        'ux_books_isbn_live',
+        'books',
+        ['isbn'],
+        unique=True,
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+    op.create_index('ix_books_live', 'books', ['id'], unique=False, postgresql_where=sa.text('deleted_at IS NULL'))
+
+    op.drop_index('ix_books_available', table_name='books')
+    op.create_index(
+        'ix_books_available',
+        'books',
+        ['id'],
+        unique=False,
+        postgresql_where=sa.text('copies_available > 0 AND deleted_at IS NULL')
+    )
+
+    op.drop_index(op.f('ix_readers_email'), table_name='readers')
+    op.create_index(
+        'ux_readers_email_live',
+        'readers',
+        ['email'],
+        unique=True,
+        postgresql_where=sa.text('deleted_at IS NULL')
+    )
+    op.create_index('ix_readers_live', 'readers', ['id'], unique=False, postgresql_where=sa.text('deleted_at IS NULL'))
+
+    # History is never deleted with its book or reader any more
+    op.drop_constraint('borrowed_books_book_id_fkey', 'borrowed_books', type_='foreignkey')
+    op.drop_constraint('borrowed_books_reader_id_fkey', 'borrowed_books', type_='foreignkey')
+    op.create_foreign_key('borrowed_books_book_id_fkey', 'borrowed_books', 'books', ['book_id'], ['id'])
+    op.create_foreign_key('borrowed_books_reader_id_fkey', 'borrowed_books', 'readers', ['reader_id'], ['id'])
+
+    op.create_index(
+        'ix_borrowed_books_returned',
+        'borrowed_books',
+        ['return_date'],
+        unique=False,
+        postgresql_where=sa.text('return_date IS NOT NULL')
+    )
+
+    op.create_table('borrowed_books_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('reader_id', sa.Integer(), nullable=False),
+    sa.Column('borrow_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('due_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('return_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('overdue_notified_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_borrowed_books_archive_reader_id'),
+        'borrowed_books_archive',
+        ['reader_id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_borrowed_books_archive_reader_id'), table_name='borrowed_books_archive')
+    op.drop_table('borrowed_books_archive')
+    op.drop_index('ix_borrowed_books_returned', table_name='borrowed_books')
+
+    op.drop_constraint('borrowed_books_reader_id_fkey', 'borrowed_books', type_='foreignkey')
+    op.drop_constraint('borrowed_books_book_id_fkey', 'borrowed_books', type_='foreignkey')
+    op.create_foreign_key(
+        'borrowed_books_book_id_fkey', 'borrowed_books', 'books', ['book_id'], ['id'], ondelete='CASCADE'
+    )
+    op.create_foreign_key(
+        'borrowed_books_reader_id_fkey', 'borrowed_books', 'readers', ['reader_id'], ['id'], ondelete='CASCADE'
+    )
+
+    # Soft-deleted rows would break the restored unique indexes
+    op.execute('DELETE FROM readers WHERE deleted_at IS NOT NULL')
+    op.execute('DELETE FROM books WHERE deleted_at IS NOT NULL')
+
+    op.drop_index('ix_readers_live', table_name='readers')
+    op.drop_index('ux_readers_email_live', table_name='readers')
+    op.create_index(op.f('ix_readers_email'), 'readers', ['email'], unique=True)
+
+    op.drop_index('ix_books_available', table_name='books')
+    op.create_index(
+        'ix_books_available',
+        'books',
+        ['id'],
+        unique=False,
+        postgresql_where=sa.text('copies_available > 0')
+    )
+    op.drop_index('ix_books_live', table_name='books')
+    op.drop_index('ux_books_isbn_live', table_name='books')
+    op.create_index(op.f('ix_books_isbn'), 'books', ['isbn'], unique=True)
+
+    op.drop_column('readers', 'deleted_at')
+    op.drop_column('books', 'deleted_at')
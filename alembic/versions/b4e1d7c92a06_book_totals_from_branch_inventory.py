@@ -0,0 +1,59 @@
+"""book totals from branch inventory
+
+Revision ID: b4e1d7c92a06
+Revises: 7d2e9a4c6b18
+Create Date: 2026-03-30 10:12:48.517304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e1d7c92a06'
+down_revision: Union[str, Sequence[str], None] = '7d2e9a4c6b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_branch_inventory_available',
+        'branch_inventory',
+        ['book_id'],
+        unique=False,
+        postgresql_where=sa.text('copies_available > 0')
+    )
+    op.drop_index('ix_books_available', table_name='books')
+    op.drop_column('books', 'copies_available')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column(
+        'books',
+        sa.Column('copies_available', sa.Integer(), server_default='0', nullable=False)
+    )
+    op.execute(
+        """
+        UPDATE books SET copies_available = totals.copies
+        FROM (
+            SELECT book_id, SUM(copies_available) AS copies
+            FROM branch_inventory
+            GROUP BY book_id
+        ) AS totals
+        WHERE totals.book_id = books.id
+        """
+    )
+    op.alter_column('books', 'copies_available', server_default=None)
+    op.create_index(
+        'ix_books_available',
+        'books',
+        ['id'],
+        unique=False,
+        postgresql_where=sa.text('copies_available > 0 AND deleted_at IS NULL')
+    )
+    op.drop_index('ix_branch_inventory_available', table_name='branch_inventory')
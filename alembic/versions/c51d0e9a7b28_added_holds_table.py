@@ -0,0 +1,55 @@
+"""added holds table
+
+Revision ID: c51d0e9a7b28
+Revises: 8b2e6d41c0f3
+Create Date: 2026-01-26 11:05:39.871204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c51d0e9a7b28'
+down_revision: Union[str, Sequence[str], None] = '8b2e6d41c0f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('holds',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('book_id', sa.Integer(), nullable=False),
+    sa.Column('reader_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('fulfilled_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('borrowing_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['book_id'], ['books.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['reader_id'], ['readers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_holds_waiting_queue',
+        'holds',
+        ['book_id', 'id'],
+        unique=False,
+        postgresql_where=sa.text("status = 'waiting'")
+    )
+    op.create_index(
+        'ux_holds_waiting_reader',
+        'holds',
+        ['book_id', 'reader_id'],
+        unique=True,
+        postgresql_where=sa.text("status = 'waiting'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_holds_waiting_reader', table_name='holds')
+    op.drop_index('ix_holds_waiting_queue', table_name='holds')
+    op.drop_table('holds')
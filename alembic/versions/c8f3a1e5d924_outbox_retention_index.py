@@ -0,0 +1,32 @@
+"""outbox retention index
+
+Revision ID: c8f3a1e5d924
+Revises: b4e1d7c92a06
+Create Date: 2026-03-31 09:26:14.203871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f3a1e5d924'
+down_revision: Union[str, Sequence[str], None] = 'b4e1d7c92a06'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_outbox_delivered', 'outbox', ['delivered_at'], unique=False,
+        postgresql_where=sa.text('delivered_at IS NOT NULL'),
+        sqlite_where=sa.text('delivered_at IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_delivered', table_name='outbox')
@@ -0,0 +1,75 @@
+"""folded book totals
+
+Revision ID: e2c7a9d4b361
+Revises: c8f3a1e5d924
+Create Date: 2026-04-02 11:05:37.640218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c7a9d4b361'
+down_revision: Union[str, Sequence[str], None] = 'c8f3a1e5d924'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'book_stock_changes',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('book_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['book_id'], ['books.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.add_column(
+        'books',
+        sa.Column('copies_available', sa.Integer(), server_default='0', nullable=False)
+    )
+    op.alter_column('books', 'copies_available', server_default=None)
+    # Running loans don't write the book row, so only catalog edits wait for this
+    op.execute(
+        """
+        UPDATE books SET copies_available = totals.copies
+        FROM (
+            SELECT book_id, SUM(copies_available) AS copies
+            FROM branch_inventory
+            GROUP BY book_id
+        ) AS totals
+        WHERE totals.book_id = books.id
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_books_available',
+            'books',
+            ['id'],
+            unique=False,
+            postgresql_where=sa.text('copies_available > 0 AND deleted_at IS NULL'),
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            'ix_branch_inventory_available',
+            table_name='branch_inventory',
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(
+        'ix_branch_inventory_available',
+        'branch_inventory',
+        ['book_id'],
+        unique=False,
+        postgresql_where=sa.text('copies_available > 0')
+    )
+    op.drop_index('ix_books_available', table_name='books')
+    op.drop_column('books', 'copies_available')
+    op.drop_table('book_stock_changes')
@@ -0,0 +1,40 @@
+"""book catalog filter indexes
+
+Revision ID: e7a3b9f2c416
+Revises: c51d0e9a7b28
+Create Date: 2026-02-09 14:47:21.336902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3b9f2c416'
+down_revision: Union[str, Sequence[str], None] = 'c51d0e9a7b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_books_title'), 'books', ['title'], unique=False)
+    op.create_index(op.f('ix_books_year'), 'books', ['year'], unique=False)
+    op.create_index('ix_books_author_year', 'books', ['author', 'year'], unique=False)
+    op.create_index(
+        'ix_books_available',
+        'books',
+        ['id'],
+        unique=False,
+        postgresql_where=sa.text('copies_available > 0')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_books_available', table_name='books')
+    op.drop_index('ix_books_author_year', table_name='books')
+    op.drop_index(op.f('ix_books_year'), table_name='books')
+    op.drop_index(op.f('ix_books_title'), table_name='books')
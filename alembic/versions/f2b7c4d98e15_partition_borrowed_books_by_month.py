@@ -0,0 +1,159 @@
+"""partition borrowed_books by month
+
+Revision ID: f2b7c4d98e15
+Revises: a93c5e17d2f8
+Create Date: 2026-02-20 09:42:17.255631
+
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b7c4d98e15'
+down_revision: Union[str, Sequence[str], None] = 'a93c5e17d2f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = 'id, book_id, reader_id, borrow_date, due_date, return_date, overdue_notified_at'
+MONTHS_AHEAD = 3
+
+
+def add_month(value: datetime) -> datetime:
+    if value.month == 12:
+        return value.replace(year=value.year + 1, month=1)
+    return value.replace(month=value.month + 1)
+
+
+def create_indexes() -> None:
+    op.create_index(
+        'ix_borrowed_books_active_due_date',
+        'borrowed_books',
+        ['due_date'],
+        unique=False,
+        postgresql_where=sa.text('return_date IS NULL')
+    )
+    op.create_index(
+        'ix_borrowed_books_active_borrow_date',
+        'borrowed_books',
+        ['borrow_date'],
+        unique=False,
+        postgresql_where=sa.text('return_date IS NULL')
+    )
+    op.create_index(
+        'ix_borrowed_books_returned',
+        'borrowed_books',
+        ['return_date'],
+        unique=False,
+        postgresql_where=sa.text('return_date IS NOT NULL')
+    )
+
+
+def drop_indexes(table_name: str) -> None:
+    op.drop_index('ix_borrowed_books_returned', table_name=table_name)
+    op.drop_index('ix_borrowed_books_active_due_date', table_name=table_name)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.create_index(
+            'ix_borrowed_books_active_borrow_date',
+            'borrowed_books',
+            ['borrow_date'],
+            unique=False,
+            sqlite_where=sa.text('return_date IS NULL')
+        )
+        return
+
+    # The old table is kept aside until its rows are copied into the partitions
+    op.rename_table('borrowed_books', 'borrowed_books_unpartitioned')
+    op.execute('ALTER TABLE borrowed_books_unpartitioned RENAME CONSTRAINT borrowed_books_pkey TO borrowed_books_unpartitioned_pkey')
+    drop_indexes('borrowed_books_unpartitioned')
+
+    # The partition key has to be part of the primary key; ids stay unique through the sequence
+    op.execute("""
+        CREATE TABLE borrowed_books (
+            id INTEGER NOT NULL DEFAULT nextval('borrowed_books_id_seq'),
+            book_id INTEGER NOT NULL,
+            reader_id INTEGER NOT NULL,
+            borrow_date TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            due_date TIMESTAMP WITH TIME ZONE NOT NULL,
+            return_date TIMESTAMP WITH TIME ZONE,
+            overdue_notified_at TIMESTAMP WITH TIME ZONE,
+            CONSTRAINT borrowed_books_pkey PRIMARY KEY (id, borrow_date),
+            CONSTRAINT borrowed_books_book_id_fkey FOREIGN KEY (book_id) REFERENCES books (id),
+            CONSTRAINT borrowed_books_reader_id_fkey FOREIGN KEY (reader_id) REFERENCES readers (id)
+        ) PARTITION BY RANGE (borrow_date)
+    """)
+
+    now = datetime.now(timezone.utc)
+    oldest = bind.execute(sa.text('SELECT min(borrow_date) FROM borrowed_books_unpartitioned')).scalar()
+    start = (oldest or now).astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    last = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(MONTHS_AHEAD):
+        last = add_month(last)
+
+    while start <= last:
+        end = add_month(start)
+        op.execute(
+            f"CREATE TABLE borrowed_books_p{start:%Y_%m} PARTITION OF borrowed_books "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+        start = end
+
+    op.execute(f'INSERT INTO borrowed_books ({COLUMNS}) SELECT {COLUMNS} FROM borrowed_books_unpartitioned')
+    op.execute('ALTER SEQUENCE borrowed_books_id_seq OWNED BY borrowed_books.id')
+    op.drop_table('borrowed_books_unpartitioned')
+
+    create_indexes()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.drop_index('ix_borrowed_books_active_borrow_date', table_name='borrowed_books')
+        return
+
+    op.rename_table('borrowed_books', 'borrowed_books_partitioned')
+    op.execute('ALTER TABLE borrowed_books_partitioned RENAME CONSTRAINT borrowed_books_pkey TO borrowed_books_partitioned_pkey')
+    op.drop_index('ix_borrowed_books_active_borrow_date', table_name='borrowed_books_partitioned')
+    drop_indexes('borrowed_books_partitioned')
+
+    op.execute("""
+        CREATE TABLE borrowed_books (
+            id INTEGER NOT NULL DEFAULT nextval('borrowed_books_id_seq'),
+            book_id INTEGER NOT NULL,
+            reader_id INTEGER NOT NULL,
+            borrow_date TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            due_date TIMESTAMP WITH TIME ZONE NOT NULL,
+            return_date TIMESTAMP WITH TIME ZONE,
+            overdue_notified_at TIMESTAMP WITH TIME ZONE,
+            CONSTRAINT borrowed_books_pkey PRIMARY KEY (id),
+            CONSTRAINT borrowed_books_book_id_fkey FOREIGN KEY (book_id) REFERENCES books (id),
+            CONSTRAINT borrowed_books_reader_id_fkey FOREIGN KEY (reader_id) REFERENCES readers (id)
+        )
+    """)
+    op.execute(f'INSERT INTO borrowed_books ({COLUMNS}) SELECT {COLUMNS} FROM borrowed_books_partitioned')
+    op.execute('ALTER SEQUENCE borrowed_books_id_seq OWNED BY borrowed_books.id')
+    op.drop_table('borrowed_books_partitioned')
+
+    op.create_index(
+        'ix_borrowed_books_active_due_date',
+        'borrowed_books',
+        ['due_date'],
+        unique=False,
+        postgresql_where=sa.text('return_date IS NULL')
+    )
+    op.create_index(
+        'ix_borrowed_books_returned',
+        'borrowed_books',
+        ['return_date'],
+        unique=False,
+        postgresql_where=sa.text('return_date IS NOT NULL')
+    )
@@ -0,0 +1,137 @@
+"""Borrow/return throughput in embedded mode on a SQLite file.
+
+Starts ``python -m src.serve`` on a fresh SQLite database, registers
+``--concurrency`` readers and a shelf of books, then has every reader
+borrow and return books in a loop for ``--seconds``. Prints completed
+round trips per second and the failed requests; with ``--unserialized``
+writes skip the writer lock, which shows the "database is locked" errors
+it prevents.
+
+    python -m benchmarks.embedded_borrow [--seconds 10] [--concurrency 16] [--books 20] [--unserialized]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.serve_scaling import free_port, wait_until_up
+
+
+async def post(client: httpx.AsyncClient, path: str, payload: dict, headers: dict | None = None) -> dict:
+    # Unserialized writers can collide with the background jobs even while seeding
+    for _ in range(10):
+        response = await client.post(path, json=payload, headers=headers)
+        if response.status_code < 500:
+            break
+    response.raise_for_status()
+    return response.json()
+
+
+async def seed(client: httpx.AsyncClient, readers: int, books: int) -> tuple[dict, list[int], list[int]]:
+    credentials = {"email": "bench@example.com", "password": "bench-pass"}
+    await post(client, "/auth/register", credentials)
+    token = (await post(client, "/auth/login", credentials))["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    reader_ids = []
+    for number in range(readers):
+        reader = {"name": f"Reader {number}", "email": f"reader{number}@example.com"}
+        reader_ids.append((await post(client, "/readers/", reader, headers))["id"])
+
+    book_ids = []
+    for number in range(books):
+        book = {
+            "title": f"Book {number}",
+            "author": "Bench",
+            "year": 2020,
+            "isbn": f"978-0-00-{number:06d}-0",
+            "copies_available": readers
+        }
+        book_ids.append((await post(client, "/books/", book, headers))["id"])
+    return headers, reader_ids, book_ids
+
+
+async def borrow_loop(
+        client: httpx.AsyncClient,
+        headers: dict,
+        reader_id: int,
+        book_ids: list[int],
+        deadline: float,
+        outcomes: Counter
+) -> None:
+    turn = reader_id
+    while time.monotonic() < deadline:
+        loan = {"book_id": book_ids[turn % len(book_ids)], "reader_id": reader_id}
+        turn += 1
+        for path in ("/borrowing/borrow", "/borrowing/return"):
+            try:
+                response = await client.post(path, json=loan, headers=headers)
+            except httpx.TransportError as exc:
+                # Uvicorn drops the connection when a request dies mid-response
+                outcomes[f"{path} {type(exc).__name__}"] += 1
+                break
+            if response.status_code >= 400:
+                outcomes[f"{path} {response.status_code}"] += 1
+                break
+        else:
+            outcomes["round trips"] += 1
+
+
+async def run_load(base_url: str, args) -> Counter:
+    outcomes = Counter()
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        headers, reader_ids, book_ids = await seed(client, args.concurrency, args.books)
+        deadline = time.monotonic() + args.seconds
+        await asyncio.gather(*(
+            borrow_loop(client, headers, reader_id, book_ids, deadline, outcomes) for reader_id in reader_ids
+        ))
+    return outcomes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10, help="load duration")
+    parser.add_argument("--concurrency", type=int, default=16, help="readers borrowing at the same time")
+    parser.add_argument("--books", type=int, default=20, help="titles on the shelf")
+    parser.add_argument("--unserialized", action="store_true", help="let write transactions skip the writer lock")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        port = free_port()
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite+aiosqlite:///{directory}/library.db",
+            "SQLITE_SERIALIZE_WRITES": str(not args.unserialized).lower(),
+            "SERVER_HOST": "127.0.0.1",
+            "SERVER_PORT": str(port),
+            "OPENAPI_SCHEMA_PATH": f"{directory}/openapi.json",
+            "OUTBOX_FILE_PATH": f"{directory}/outbox.jsonl",
+        }
+        server = subprocess.Popen(
+            [sys.executable, "-m", "src.serve"], env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            base_url = f"http://127.0.0.1:{port}"
+            wait_until_up(f"{base_url}/openapi.json")
+            outcomes = asyncio.run(run_load(base_url, args))
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+    mode = "unserialized" if args.unserialized else "writer lock"
+    print(f"{mode}: {outcomes.pop('round trips', 0) / args.seconds:.0f} borrow+return round trips/s")
+    for outcome, count in sorted(outcomes.items()):
+        print(f"  {outcome}: {count} failed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+"""Per-request cost of access token verification.
+
+Compares python-jose (the previous implementation), the native HMAC
+backend, and ``decode_access_token`` with a warm verified-token cache.
+
+    python -m benchmarks.jwt_decode [--number 20000]
+"""
+import argparse
+import timeit
+from datetime import datetime, timedelta, UTC
+
+from src.core.config import settings
+from src.core.security import decode_access_token, token_cache
+from src.core.tokens import JoseBackend, NativeHMACBackend
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000, help="verifications per case")
+    args = parser.parse_args()
+
+    claims = {"sub": "librarian@example.com", "exp": datetime.now(UTC) + timedelta(hours=1)}
+    token = JoseBackend().encode(claims, settings.SECRET_KEY, settings.ALGORITHM)
+    algorithms = [settings.ALGORITHM]
+
+    jose_backend = JoseBackend()
+    native_backend = NativeHMACBackend()
+
+    token_cache.clear()
+    decode_access_token(token)
+
+    cases = {
+        "python-jose": lambda: jose_backend.decode(token, settings.SECRET_KEY, algorithms),
+        "native HMAC": lambda: native_backend.decode(token, settings.SECRET_KEY, algorithms),
+        "cached": lambda: decode_access_token(token)
+    }
+
+    baseline = None
+    print(f"{'backend':<14}{'us/verify':>12}{'speedup':>10}")
+    for name, call in cases.items():
+        seconds = min(timeit.repeat(call, number=args.number, repeat=5)) / args.number
+        baseline = baseline or seconds
+        print(f"{name:<14}{seconds * 1e6:>12.2f}{baseline / seconds:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
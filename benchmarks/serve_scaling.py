@@ -0,0 +1,128 @@
+"""Throughput of ``python -m src.serve`` as workers are added.
+
+Starts the server with 1, 2, 4, ... up to ``--max-workers`` workers and
+the background jobs switched off, drives ``GET --path`` from several
+load-generator processes for ``--seconds`` and prints requests per second
+and the speedup over a single worker. The default path serves the precomputed OpenAPI
+document, which is CPU-bound and needs no database, so the numbers show how
+well the server itself scales across cores.
+
+    python -m benchmarks.serve_scaling [--max-workers 4] [--seconds 5] [--clients 4] [--concurrency 32]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from src.serve import available_cpus
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def drive(url: str, seconds: float, concurrency: int) -> int:
+    deadline = time.monotonic() + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits) as client:
+
+        async def worker() -> int:
+            done = 0
+            while time.monotonic() < deadline:
+                response = await client.get(url)
+                response.raise_for_status()
+                done += 1
+            return done
+
+        return sum(await asyncio.gather(*(worker() for _ in range(concurrency))))
+
+
+def load_process(args: tuple[str, float, int]) -> int:
+    return asyncio.run(drive(*args))
+
+
+def wait_until_up(url: str, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"server did not come up at {url}")
+
+
+def measure(workers: int, args, directory: str) -> float:
+    port = free_port()
+    env = {
+        **os.environ,
+        "SERVER_HOST": "127.0.0.1",
+        "SERVER_PORT": str(port),
+        "SERVER_WORKERS": str(workers),
+        "OPENAPI_SCHEMA_PATH": f"{directory}/openapi.json",
+        "OVERDUE_SCHEDULER_ENABLED": "false",
+        "ARCHIVE_ENABLED": "false",
+        "AUDIT_ENABLED": "false",
+        "OUTBOX_RELAY_ENABLED": "false",
+        # Per-process state that src.serve refuses to run several workers with
+        "IDEMPOTENCY_ENABLED": "false",
+        "READER_SUMMARY_CACHE_TTL_SECONDS": "0",
+    }
+    server = subprocess.Popen(
+        [sys.executable, "-m", "src.serve"], env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        url = f"http://127.0.0.1:{port}{args.path}"
+        wait_until_up(url)
+        # Let every worker finish starting before the clock runs
+        load_process((url, 1, args.concurrency))
+        with multiprocessing.Pool(args.clients) as pool:
+            counts = pool.map(load_process, [(url, args.seconds, args.concurrency)] * args.clients)
+        return sum(counts) / args.seconds
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-workers", type=int, default=available_cpus(), help="largest worker count to try")
+    parser.add_argument("--seconds", type=float, default=5, help="load duration per worker count")
+    parser.add_argument("--clients", type=int, default=4, help="load-generator processes")
+    parser.add_argument("--concurrency", type=int, default=32, help="connections per load generator")
+    parser.add_argument("--path", default="/openapi.json", help="endpoint to request")
+    args = parser.parse_args()
+
+    counts = []
+    workers = 1
+    while workers < args.max_workers:
+        counts.append(workers)
+        workers *= 2
+    counts.append(args.max_workers)
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = {**os.environ, "OPENAPI_SCHEMA_PATH": f"{directory}/openapi.json"}
+        subprocess.run([sys.executable, "-m", "src.core.openapi"], env=env, capture_output=True, check=True)
+
+        baseline = None
+        print(f"{'workers':>8}{'req/s':>12}{'speedup':>10}")
+        for workers in counts:
+            throughput = measure(workers, args, directory)
+            baseline = baseline or throughput
+            print(f"{workers:>8}{throughput:>12.0f}{throughput / baseline:>9.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Cold-start cost of a worker against an import-time budget.
+
+Imports ``src.main`` in fresh interpreters, reports the median import
+time and the slowest modules, then times the first ``app.openapi()`` with
+and without the precomputed schema. Exits non-zero when the median import
+exceeds ``--budget-ms``.
+
+    python -m benchmarks.startup [--runs 5] [--budget-ms 1500] [--top 10]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+FIRST_OPENAPI = (
+    "import time\n"
+    "from src.main import app\n"
+    "started = time.perf_counter()\n"
+    "app.openapi()\n"
+    "print(time.perf_counter() - started)\n"
+)
+
+
+def import_profile() -> tuple[float, dict[str, int]]:
+    """Seconds to import ``src.main`` and cumulative microseconds per module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import src.main"],
+        capture_output=True, text=True, check=True
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(cumulative)
+    return modules["src.main"] / 1e6, modules
+
+
+def first_openapi(schema_path: str) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_OPENAPI],
+        capture_output=True, text=True, check=True,
+        env={**os.environ, "OPENAPI_SCHEMA_PATH": schema_path}
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--budget-ms", type=float, default=1500, help="allowed median import time")
+    parser.add_argument("--top", type=int, default=10, help="slowest top-level imports to list")
+    args = parser.parse_args()
+
+    timings = []
+    modules = {}
+    for _ in range(args.runs):
+        seconds, modules = import_profile()
+        timings.append(seconds)
+    median = statistics.median(timings)
+
+    # Direct dependencies of the application are where lazy imports pay off
+    top_level = {
+        name: cumulative for name, cumulative in modules.items()
+        if name != "src.main" and ("." not in name or name.startswith("src."))
+    }
+    print(f"import src.main: {median * 1e3:.0f} ms median of {args.runs} (budget {args.budget_ms:.0f} ms)")
+    for name, cumulative in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<40}{cumulative / 1e3:>8.1f} ms")
+
+    with tempfile.TemporaryDirectory() as directory:
+        schema_path = os.path.join(directory, "openapi.json")
+        generated = statistics.median(first_openapi(schema_path) for _ in range(args.runs))
+        subprocess.run(
+            [sys.executable, "-m", "src.core.openapi", "--output", schema_path],
+            capture_output=True, check=True
+        )
+        precomputed = statistics.median(first_openapi(schema_path) for _ in range(args.runs))
+    print(f"first app.openapi(): {generated * 1e3:.0f} ms generated, {precomputed * 1e3:.1f} ms precomputed")
+
+    return 0 if median * 1e3 <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+import asyncio
+from dataclasses import asdict
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+from src.core.config import settings
+from src.core.database import slow_query_log
+from src.core.dependencies import get_current_user
+from src.core.profiler import profiler
+from src.models.user import User
+from src.schemas.admin import ProfilerRecord, ProfilerStart, ProfilerStatus, SlowQueryList, SlowQueryResponse
+
+router = APIRouter()
+
+
+@router.get(
+    "/slow-queries",
+    response_model=SlowQueryList,
+    summary="Recent statements over the slow query threshold on this worker, newest first"
+)
+async def get_slow_queries(
+        limit: int = Query(50, ge=1, le=1000),
+        current_user: User = Depends(get_current_user)
+):
+    entries = list(slow_query_log.entries)[::-1][:limit]
+    return SlowQueryList(
+        threshold_ms=slow_query_log.threshold_ms,
+        queries=[SlowQueryResponse(**asdict(entry)) for entry in entries]
+    )
+
+
+def arm_profiler(request: Request, options: ProfilerStart) -> None:
+    if not settings.PROFILER_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profiler is disabled")
+    if profiler.armed:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already being recorded")
+    if options.requests > settings.PROFILER_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.PROFILER_MAX_REQUESTS} requests can be profiled at once"
+        )
+
+    routes = None
+    if options.route is not None:
+        routes = [route for route in request.app.routes if getattr(route, "path", None) == options.route]
+        if not routes:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Route not found")
+
+    profiler.start(
+        options.requests,
+        routes=routes,
+        route=options.route,
+        mode=options.mode,
+        interval=options.interval_ms / 1000
+    )
+
+
+def export_profile(format: str) -> Response:
+    if format == "speedscope":
+        return JSONResponse(profiler.speedscope())
+    return PlainTextResponse(profiler.collapsed())
+
+
+# The profiler is per worker: with several workers, these endpoints each
+# reach whichever worker takes the request, see src.core.profiler
+@router.post(
+    "/profiler",
+    response_model=ProfilerStatus,
+    status_code=status.HTTP_201_CREATED,
+    summary="Profile the next requests, optionally only those to one route"
+)
+async def start_profiler(
+        request: Request,
+        options: ProfilerStart,
+        current_user: User = Depends(get_current_user)
+):
+    arm_profiler(request, options)
+    return profiler.status()
+
+
+@router.post(
+    "/profiler/record",
+    summary="Profile the next requests on this worker and return the profile"
+)
+async def record_profile(
+        request: Request,
+        options: ProfilerRecord,
+        current_user: User = Depends(get_current_user)
+) -> Response:
+    arm_profiler(request, options)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + options.wait_seconds
+    while not profiler.finished and loop.time() < deadline:
+        await asyncio.sleep(0.05)
+    profiler.stop()
+    # Requests still in flight at the deadline are left out of a cProfile export
+    return export_profile(options.format)
+
+
+@router.get(
+    "/profiler",
+    response_model=ProfilerStatus,
+    summary="Progress of the current profile and time per library"
+)
+async def get_profiler_status(current_user: User = Depends(get_current_user)):
+    return profiler.status()
+
+
+@router.delete(
+    "/profiler",
+    response_model=ProfilerStatus,
+    summary="Stop profiling new requests"
+)
+async def stop_profiler(current_user: User = Depends(get_current_user)):
+    profiler.stop()
+    return profiler.status()
+
+
+@router.get(
+    "/profiler/profile",
+    summary="Recorded profile as collapsed stacks or speedscope JSON"
+)
+async def get_profile(
+        format: Literal["collapsed", "speedscope"] = Query("collapsed"),
+        current_user: User = Depends(get_current_user)
+) -> Response:
+    if profiler.data is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No profile has been recorded")
+    return export_profile(format)
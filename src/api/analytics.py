@@ -0,0 +1,137 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import get_db
+from src.core.dependencies import get_current_user
+from src.models.analytics import DailyBookStats, DailyReaderStats
+from src.models.book import Book
+from src.models.reader import Reader
+from src.models.user import User
+from src.schemas.analytics import TopBook, TopReader, LoanDuration, DailyCheckouts
+from src.services.analytics import period_start
+
+router = APIRouter()
+
+
+@router.get(
+    "/top-books",
+    response_model=list[TopBook],
+    summary="Most borrowed books"
+)
+async def get_top_books(
+        days: int = Query(30, ge=1, le=3660),
+        limit: int = Query(10, ge=1, le=100),
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    checkouts = func.sum(DailyBookStats.checkouts).label("checkouts")
+    top = (
+        select(DailyBookStats.book_id, checkouts)
+        .where(DailyBookStats.day >= period_start(days))
+        .group_by(DailyBookStats.book_id)
+        .having(checkouts > 0)
+        .order_by(checkouts.desc(), DailyBookStats.book_id)
+        .limit(limit)
+        .subquery()
+    )
+    result = await db.execute(
+        select(top.c.book_id, Book.title, top.c.checkouts)
+        .outerjoin(Book, Book.id == top.c.book_id)
+        .order_by(top.c.checkouts.desc(), top.c.book_id)
+    )
+
+    return [
+        TopBook(book_id=book_id, title=title, checkouts=count)
+        for book_id, title, count in result.all()
+    ]
+
+
+@router.get(
+    "/top-readers",
+    response_model=list[TopReader],
+    summary="Busiest readers"
+)
+async def get_top_readers(
+        days: int = Query(30, ge=1, le=3660),
+        limit: int = Query(10, ge=1, le=100),
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    checkouts = func.sum(DailyReaderStats.checkouts).label("checkouts")
+    top = (
+        select(DailyReaderStats.reader_id, checkouts)
+        .where(DailyReaderStats.day >= period_start(days))
+        .group_by(DailyReaderStats.reader_id)
+        .having(checkouts > 0)
+        .order_by(checkouts.desc(), DailyReaderStats.reader_id)
+        .limit(limit)
+        .subquery()
+    )
+    result = await db.execute(
+        select(top.c.reader_id, Reader.name, top.c.checkouts)
+        .outerjoin(Reader, Reader.id == top.c.reader_id)
+        .order_by(top.c.checkouts.desc(), top.c.reader_id)
+    )
+
+    return [
+        TopReader(reader_id=reader_id, name=name, checkouts=count)
+        for reader_id, name, count in result.all()
+    ]
+
+
+@router.get(
+    "/loan-duration",
+    response_model=LoanDuration,
+    summary="Average loan duration"
+)
+async def get_loan_duration(
+        days: int = Query(30, ge=1, le=3660),
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    since = period_start(days)
+    result = await db.execute(
+        select(
+            func.coalesce(func.sum(DailyBookStats.returns), 0),
+            func.coalesce(func.sum(DailyBookStats.loan_seconds), 0)
+        )
+        .where(DailyBookStats.day >= since)
+    )
+    returns, loan_seconds = result.one()
+
+    average = loan_seconds / returns if returns else None
+
+    return LoanDuration(
+        since=since,
+        returns=returns,
+        average_seconds=average,
+        average_days=average / 86400 if average is not None else None
+    )
+
+
+@router.get(
+    "/daily-checkouts",
+    response_model=list[DailyCheckouts],
+    summary="Daily checkout volume"
+)
+async def get_daily_checkouts(
+        days: int = Query(30, ge=1, le=3660),
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    result = await db.execute(
+        select(
+            DailyBookStats.day,
+            func.sum(DailyBookStats.checkouts),
+            func.sum(DailyBookStats.returns)
+        )
+        .where(DailyBookStats.day >= period_start(days))
+        .group_by(DailyBookStats.day)
+        .order_by(DailyBookStats.day)
+    )
+
+    return [
+        DailyCheckouts(day=day, checkouts=checkouts, returns=returns)
+        for day, checkouts, returns in result.all()
+    ]
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import get_db
+from src.core.dependencies import get_current_user
+from src.models.audit import AuditEvent
+from src.models.user import User
+from src.schemas.audit import AuditEventList, AuditMetricsResponse
+from src.services.audit import audit_buffer
+
+router = APIRouter()
+
+
+@router.get(
+    "/",
+    response_model=AuditEventList,
+    summary="Audit trail, newest first"
+)
+async def get_audit_events(
+        entity: str | None = Query(None),
+        entity_id: int | None = Query(None),
+        user_id: int | None = Query(None),
+        action: str | None = Query(None),
+        before: int | None = Query(None, description="Cursor: next_cursor of the previous page"),
+        limit: int = Query(50, ge=1, le=500),
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    query = select(AuditEvent)
+    if entity is not None:
+        query = query.where(AuditEvent.entity == entity)
+    if entity_id is not None:
+        query = query.where(AuditEvent.entity_id == entity_id)
+    if user_id is not None:
+        query = query.where(AuditEvent.user_id == user_id)
+    if action is not None:
+        query = query.where(AuditEvent.action == action)
+    if before is not None:
+        query = query.where(AuditEvent.id < before)
+
+    result = await db.execute(query.order_by(AuditEvent.id.desc()).limit(limit + 1))
+    events = list(result.scalars())
+
+    has_more = len(events) > limit
+    events = events[:limit]
+
+    return AuditEventList(events=events, next_cursor=events[-1].id if has_more else None)
+
+
+@router.get(
+    "/metrics",
+    response_model=AuditMetricsResponse,
+    summary="Audit buffer depth and flush statistics"
+)
+async def get_audit_metrics(current_user: User = Depends(get_current_user)):
+    return audit_buffer.metrics()
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import logging
+
+from fastapi import APIRouter, Depends, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import get_db, run_callbacks
+from src.core.dependencies import get_current_user
+from src.models.user import User
+from src.schemas.batch import BatchOperation, BatchRequest, BatchItemResponse, BatchResponse
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+async def dispatch(request: Request, operation: BatchOperation, state: dict) -> BatchItemResponse:
+    """Run one operation through the full application stack as an in-process sub-request."""
+    path, _, query = operation.path.partition("?")
+    body = b"" if operation.body is None else json.dumps(operation.body).encode()
+
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode())
+    ]
+    authorization = request.headers.get("authorization")
+    if authorization:
+        headers.append((b"authorization", authorization.encode()))
+
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": operation.method,
+        "scheme": request.url.scheme,
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": headers,
+        "state": {**request.scope.get("state", {}), **state}
+    }
+
+    received = False
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    response_status = 500
+    chunks = []
+
+    async def send(message):
+        nonlocal response_status
+        if message["type"] == "http.response.start":
+            response_status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # ServerErrorMiddleware re-raises once it has answered 500; one failing
+        # operation must not cost the client the results of the others
+        logger.exception("Batch operation %s %s failed", operation.method, path)
+        return BatchItemResponse(
+            id=operation.id,
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            body={"detail": "Internal Server Error"}
+        )
+
+    raw = b"".join(chunks)
+    try:
+        payload = json.loads(raw) if raw else None
+    except ValueError:
+        payload = raw.decode(errors="replace")
+
+    return BatchItemResponse(id=operation.id, status=response_status, body=payload)
+
+
+def group_operations(operations: list[BatchOperation]) -> list[list[BatchOperation]]:
+    """Split operations into runs: consecutive reads share a run, every write gets its own."""
+    groups = []
+    for operation in operations:
+        if operation.method == "GET" and groups and groups[-1][0].method == "GET":
+            groups[-1].append(operation)
+        else:
+            groups.append([operation])
+    return groups
+
+
+@router.post(
+    "/batch",
+    response_model=BatchResponse,
+    summary="Execute several API operations in one request"
+)
+async def execute_batch(
+        request: Request,
+        batch: BatchRequest,
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    # Sub-requests run inside this request's turn at the SQLite writer lock
+    state = {"batch_user": current_user, "holds_writer_lock": True}
+
+    if not batch.atomic:
+        # Reads between two writes don't depend on each other and run concurrently;
+        # writes keep the submitted order
+        responses = []
+        for group in group_operations(batch.operations):
+            responses.extend(
+                await asyncio.gather(*(dispatch(request, operation, state) for operation in group))
+            )
+        return BatchResponse(responses=responses, committed=True)
+
+    # Handlers commit their own work; bound to an open transaction with
+    # create_savepoint, each of those commits only releases a savepoint
+    connection = await db.connection()
+    shared_session = AsyncSession(
+        bind=connection,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint"
+    )
+    state["db_session"] = shared_session
+    # Side effects of the sub-requests wait for the outcome of the whole batch
+    state["after_commit"] = []
+    state["after_batch"] = []
+
+    responses = []
+    failed = False
+    try:
+        for operation in batch.operations:
+            if failed:
+                responses.append(
+                    BatchItemResponse(id=operation.id, status=status.HTTP_424_FAILED_DEPENDENCY)
+                )
+                continue
+
+            response = await dispatch(request, operation, state)
+            responses.append(response)
+            failed = response.status >= 400
+    finally:
+        await shared_session.close()
+
+    if failed:
+        await db.rollback()
+    else:
+        await db.commit()
+        await run_callbacks(state["after_commit"])
+    await run_callbacks(state["after_batch"])
+
+    return BatchResponse(responses=responses, committed=not failed)
@@ -1,12 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select, func
+import asyncio
+import json
+from collections import Counter
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, update, func, case
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import flag_modified
 
-from src.core.database import get_db
-from src.core.dependencies import get_current_user
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.core.database import get_db, after_commit, invalidate
+from src.core.dependencies import get_id_list
+from src.core.fields import sparse_fields, partial_response
+from src.core.pubsub import Subscription
 from src.models.book import Book
-from src.models.user import User
-from src.schemas.book import BookCreate, BookUpdate, BookResponse, BookList
+from src.models.branch import Branch, BranchInventory
+from src.models.hold import Hold
+from src.models.recommendation import BookNeighbour
+from src.schemas.book import (
+    BookCreate,
+    BookUpdate,
+    BookResponse,
+    BookList,
+    BookPartial,
+    BookPartialList,
+    BookFilter,
+    BookFacets,
+    FacetCount,
+    DecadeCount,
+    AvailabilityCount,
+    RelatedBook,
+    RelatedBookList,
+    BranchAvailability,
+    BookAvailability
+)
+from src.services.audit import AuditTrail, audit_trail
+from src.services.availability import availability_broker, publish_availability
+from src.services.circulation import assign_holds
+from src.services.inventory import add_copies, adjust_copies, branch_copies, refresh_copies
+from src.services.outbox import add_event
+from src.services.summary import summary_cache
 
 router = APIRouter()
 
@@ -18,12 +53,13 @@ router = APIRouter()
     summary="Create book"
 )
 async def create_book(
+        request: Request,
         book_data: BookCreate,
         db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        audit: AuditTrail = Depends(audit_trail)
 ):
     result = await db.execute(
-        select(Book).where(Book.isbn == book_data.isbn)
+        select(Book).where(Book.isbn == book_data.isbn, Book.deleted_at.is_(None))
     )
     existing_book = result.scalar_one_or_none()
 
@@ -38,35 +74,192 @@ async def create_book(
         author=book_data.author,
         year=book_data.year,
         isbn=book_data.isbn,
+        # Stored with the new row; the copies registered below only add stock changes
         copies_available=book_data.copies_available,
         description=book_data.description or ""
     )
 
     db.add(new_book)
+    await db.flush()
+    await add_copies(db, new_book, Branch.DEFAULT_ID, book_data.copies_available)
+    add_event(db, "book.created", "book", new_book.id, isbn=new_book.isbn, title=new_book.title)
     await db.commit()
+    await invalidate(request, facet_cache.clear)
     await db.refresh(new_book)
+    audit.record("create", "book", new_book.id, isbn=new_book.isbn)
 
     return new_book
 
 
+BOOK_SORTS = {
+    "id": (Book.id,),
+    "title": (Book.title, Book.id),
+    "-title": (Book.title.desc(), Book.id),
+    "year": (Book.year, Book.id),
+    "-year": (Book.year.desc(), Book.id)
+}
+
+facet_cache = TTLCache(maxsize=settings.FACET_CACHE_SIZE, ttl=settings.FACET_CACHE_TTL_SECONDS)
+
+
+def book_conditions(filters: BookFilter) -> list:
+    conditions = [Book.deleted_at.is_(None)]
+    if filters.author:
+        conditions.append(Book.author.in_(filters.author))
+    if filters.year_from is not None:
+        conditions.append(Book.year >= filters.year_from)
+    if filters.year_to is not None:
+        conditions.append(Book.year <= filters.year_to)
+    if filters.available is True:
+        conditions.append(Book.copies_available > 0)
+    elif filters.available is False:
+        conditions.append(Book.copies_available <= 0)
+    return conditions
+
+
+async def select_books(
+        db: AsyncSession,
+        fields: list[str] | None,
+        *conditions,
+        sort: str = "id"
+) -> list:
+    """Books matching ``conditions``; with ``fields`` only those columns are read."""
+    if fields is None:
+        result = await db.execute(
+            select(Book).where(*conditions).order_by(*BOOK_SORTS[sort])
+        )
+        return list(result.scalars())
+
+    result = await db.execute(
+        select(*(getattr(Book, field) for field in fields))
+        .where(*conditions)
+        .order_by(*BOOK_SORTS[sort])
+    )
+    return [BookPartial.model_validate(row) for row in result.mappings()]
+
+
 @router.get(
     "/",
     response_model=BookList,
     summary="Get all books"
 )
 async def get_books(
+        filters: BookFilter = Query(),
+        ids: list[int] | None = Depends(get_id_list),
+        fields: list[str] | None = Depends(sparse_fields(BookResponse)),
         db: AsyncSession = Depends(get_db)
 ):
-    count_result = await db.execute(select(func.count(Book.id)))
-    total = count_result.scalar_one()
+    list_model = BookList if fields is None else BookPartialList
+    conditions = book_conditions(filters)
+
+    if ids is not None:
+        found = {
+            book.id: book
+            for book in await select_books(db, fields, Book.id.in_(ids), *conditions)
+        }
+
+        book_list = list_model(
+            books=[found[book_id] for book_id in ids if book_id in found],
+            total=len(found),
+            missing=[book_id for book_id in ids if book_id not in found]
+        )
+    else:
+        count_result = await db.execute(select(func.count(Book.id)).where(*conditions))
+        total = count_result.scalar_one()
 
+        book_list = list_model(
+            books=await select_books(db, fields, *conditions, sort=filters.sort),
+            total=total,
+            missing=[]
+        )
+
+    if fields is not None:
+        return partial_response(book_list)
+    return book_list
+
+
+@router.get(
+    "/facets",
+    response_model=BookFacets,
+    summary="Facet counts for the book catalog"
+)
+async def get_book_facets(
+        filters: BookFilter = Query(),
+        db: AsyncSession = Depends(get_db)
+):
+    cache_key = filters.model_dump_json(exclude={"sort"})
+    facets = facet_cache.get(cache_key)
+    if facets is not None:
+        return facets
+
+    # A single grouped scan; the three facets are folded from its rows
+    decade = (Book.year // 10 * 10).label("decade")
+    available = case((Book.copies_available > 0, True), else_=False).label("available")
     result = await db.execute(
-        select(Book)
-        .order_by(Book.id)
+        select(Book.author, decade, available, func.count(Book.id))
+        .where(*book_conditions(filters))
+        .group_by(Book.author, decade, available)
+    )
+
+    authors = Counter()
+    decades = Counter()
+    availability = Counter()
+    for author, book_decade, is_available, count in result.all():
+        authors[author] += count
+        decades[book_decade] += count
+        availability[bool(is_available)] += count
+
+    facets = BookFacets(
+        authors=[
+            FacetCount(value=author, count=count)
+            for author, count in sorted(authors.items(), key=lambda item: (-item[1], item[0]))
+        ],
+        decades=[DecadeCount(decade=value, count=count) for value, count in sorted(decades.items())],
+        availability=AvailabilityCount(available=availability[True], unavailable=availability[False]),
+        total=sum(authors.values())
     )
-    books = result.scalars().all()
+    facet_cache.set(cache_key, facets)
+
+    return facets
+
+
+async def availability_events(request: Request, subscription: Subscription, book_ids: set[int] | None):
+    with subscription:
+        yield "retry: 3000\n\n"
+        while not await request.is_disconnected():
+            try:
+                message = await asyncio.wait_for(
+                    subscription.get(),
+                    timeout=settings.AVAILABILITY_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
 
-    return BookList(books=books, total=total)
+            if message is None:
+                break
+            if book_ids and message["book_id"] not in book_ids:
+                continue
+
+            yield f"event: availability\ndata: {json.dumps(message)}\n\n"
+
+
+@router.get(
+    "/availability/stream",
+    summary="Stream book availability changes (SSE)",
+    response_class=StreamingResponse
+)
+async def stream_availability(
+        request: Request,
+        book_id: list[int] | None = Query(None)
+):
+    subscription = availability_broker.subscribe()
+
+    return StreamingResponse(
+        availability_events(request, subscription, set(book_id) if book_id else None),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get(
@@ -76,20 +269,90 @@ async def get_books(
 )
 async def get_book(
         book_id: int,
+        fields: list[str] | None = Depends(sparse_fields(BookResponse)),
+        db: AsyncSession = Depends(get_db)
+):
+    books = await select_books(db, fields, Book.id == book_id, Book.deleted_at.is_(None))
+
+    if not books:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Book {book_id} not found"
+        )
+
+    if fields is not None:
+        return partial_response(books[0])
+    return books[0]
+
+
+@router.get(
+    "/{book_id}/related",
+    response_model=RelatedBookList,
+    summary="Books most often borrowed by readers of this book"
+)
+async def get_related_books(
+        book_id: int,
+        limit: int = Query(10, ge=1, le=settings.RECOMMENDATIONS_TOP_K),
         db: AsyncSession = Depends(get_db)
 ):
     result = await db.execute(
-        select(Book).where(Book.id == book_id)
+        select(Book, BookNeighbour.score)
+        .select_from(BookNeighbour)
+        .join(Book, Book.id == BookNeighbour.neighbour_id)
+        .where(BookNeighbour.book_id == book_id, Book.deleted_at.is_(None))
+        .order_by(BookNeighbour.rank)
+        .limit(limit)
     )
-    book = result.scalar_one_or_none()
+    books = [
+        RelatedBook.model_validate({**BookResponse.model_validate(book).model_dump(), "score": score})
+        for book, score in result.all()
+    ]
 
-    if not book:
+    if not books:
+        # Only unknown books need the extra lookup
+        exists = await db.execute(select(Book.id).where(Book.id == book_id, Book.deleted_at.is_(None)))
+        if exists.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Book with id {book_id} not found"
+            )
+
+    return RelatedBookList(books=books, total=len(books))
+
+
+@router.get(
+    "/{book_id}/availability",
+    response_model=BookAvailability,
+    summary="Free copies of a book per branch"
+)
+async def get_book_availability(
+        book_id: int,
+        db: AsyncSession = Depends(get_db)
+):
+    result = await db.execute(
+        select(Book.id).where(Book.id == book_id, Book.deleted_at.is_(None))
+    )
+
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Book {book_id} not found"
+            detail=f"Book with id {book_id} not found"
         )
 
-    return book
+    result = await db.execute(
+        select(Branch.id, Branch.code, Branch.name, BranchInventory.copies_available)
+        .join(BranchInventory, BranchInventory.branch_id == Branch.id)
+        .where(BranchInventory.book_id == book_id)
+        .order_by(Branch.id)
+    )
+    branches = [
+        BranchAvailability(branch_id=branch_id, code=code, name=name, copies_available=copies)
+        for branch_id, code, name, copies in result.all()
+    ]
+
+    # The branch rows are at hand, so the total is the live one rather than the folded one
+    total = sum(branch.copies_available for branch in branches)
+    return BookAvailability(book_id=book_id, copies_available=total, branches=branches)
 
 
 @router.put(
@@ -98,13 +361,14 @@ async def get_book(
     summary="Update book"
 )
 async def update_book(
+        request: Request,
         book_id: int,
         book_data: BookUpdate,
         db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        audit: AuditTrail = Depends(audit_trail)
 ):
     result = await db.execute(
-        select(Book).where(Book.id == book_id)
+        select(Book).where(Book.id == book_id, Book.deleted_at.is_(None))
     )
     book = result.scalar_one_or_none()
 
@@ -116,7 +380,7 @@ async def update_book(
 
     if book_data.isbn and book_data.isbn != book.isbn:
         isbn_check = await db.execute(
-            select(Book).where(Book.isbn == book_data.isbn)
+            select(Book).where(Book.isbn == book_data.isbn, Book.deleted_at.is_(None))
         )
         if isbn_check.scalar_one_or_none():
             raise HTTPException(
@@ -124,12 +388,41 @@ async def update_book(
                 detail=f"Book with ISBN {book_data.isbn} already exists"
             )
 
+    copies_before = await refresh_copies(db, book)
     update_data = book_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
-        setattr(book, field, value)
+        if field != "copies_available":
+            setattr(book, field, value)
+
+    # The total is adjusted through the default branch; other branches keep their stock
+    if "copies_available" in update_data:
+        delta = update_data["copies_available"] - copies_before
+        if not await adjust_copies(db, book, Branch.DEFAULT_ID, delta):
+            available = await branch_copies(db, book.id, Branch.DEFAULT_ID)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cannot remove {-delta} copies, the default branch only has {available}"
+            )
+
+    add_event(db, "book.updated", "book", book.id, changes=update_data)
+    fulfilled = []
+    if "copies_available" in update_data:
+        fulfilled = await assign_holds(db, book)
+        # The book row is written anyway, so it takes the new total right away
+        flag_modified(book, "copies_available")
 
     await db.commit()
     await db.refresh(book)
+    audit.record("update", "book", book.id, changes=update_data)
+    for hold in fulfilled:
+        audit.record("borrow", "borrowing", hold.borrowing_id, hold_id=hold.id, reader_id=hold.reader_id)
+    await invalidate(request, facet_cache.clear)
+    # Summaries embed book details, and new loans may come from fulfilled holds
+    await invalidate(request, summary_cache.clear)
+
+    await after_commit(
+        request, publish_availability, book.id, book.copies_available, book.copies_available - copies_before
+    )
 
     return book
 
@@ -140,12 +433,13 @@ async def update_book(
     summary="Delete book"
 )
 async def delete_book(
+        request: Request,
         book_id: int,
         db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        audit: AuditTrail = Depends(audit_trail)
 ):
     result = await db.execute(
-        select(Book).where(Book.id == book_id)
+        select(Book).where(Book.id == book_id, Book.deleted_at.is_(None))
     )
     book = result.scalar_one_or_none()
 
@@ -155,7 +449,18 @@ async def delete_book(
             detail=f"Book {book_id} not found"
         )
 
-    await db.delete(book)
+    # Soft delete keeps the borrowing history; waiting holds can never be served now
+    book.deleted_at = datetime.now(timezone.utc)
+    await db.execute(
+        update(Hold)
+        .where(Hold.book_id == book.id, Hold.status == Hold.WAITING)
+        .values(status=Hold.CANCELLED)
+        .execution_options(synchronize_session=False)
+    )
+    add_event(db, "book.deleted", "book", book.id)
     await db.commit()
+    await invalidate(request, facet_cache.clear)
+    await invalidate(request, summary_cache.clear)
+    audit.record("delete", "book", book.id)
 
     return None
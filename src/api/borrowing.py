@@ -1,90 +1,164 @@
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import select, func, and_
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy import select, update, func, and_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import selectinload, load_only, raiseload
+from sqlalchemy.orm.attributes import set_committed_value
 
-from src.core.database import get_db
+from src.core.config import settings
+from src.core.database import get_db, after_commit, invalidate
 from src.core.dependencies import get_current_user
+from src.core.fields import sparse_fields, partial_response
 from src.models.book import Book
 from src.models.reader import Reader
 from src.models.borrowing import BorrowedBook
+from src.models.branch import Branch
+from src.models.item import Item
 from src.models.user import User
 from src.schemas.borrowing import (
     BorrowingCreate,
     BorrowingReturn,
+    ItemCheckout,
+    ItemCheckin,
     BorrowingResponse,
     BorrowingDetailResponse,
     BorrowingList,
+    BorrowingDetailPartial,
+    BorrowingPartialList,
     ActiveBorrowingResponse
 )
+from src.services import analytics
+from src.services.audit import AuditTrail, audit_trail
+from src.services.availability import publish_availability
+from src.services.circulation import open_loan, assign_holds
+from src.services.inventory import refresh_copies, return_copy
+from src.services.outbox import add_event
+from src.services.partitions import active_loan_conditions
+from src.services.summary import invalidate_reader_summary
 
 router = APIRouter()
 
+BORROWING_RELATIONSHIPS = {
+    "book": BorrowedBook.book_id,
+    "reader": BorrowedBook.reader_id
+}
 
-@router.post(
-    "/borrow",
-    response_model=BorrowingResponse,
-    status_code=status.HTTP_201_CREATED,
-    summary="Borrow a book"
-)
-async def borrow_book(
-        borrow_data: BorrowingCreate,
-        db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user)
-):
-    book_result = await db.execute(
-        select(Book).where(Book.id == borrow_data.book_id)
+
+def select_borrowings(fields: list[str] | None):
+    """Base query for detailed borrowings, projected to ``fields`` when given.
+
+    Only the requested columns are read and related books/readers are only
+    loaded when they were asked for.
+    """
+    if fields is None:
+        return select(BorrowedBook).options(
+            selectinload(BorrowedBook.book),
+            selectinload(BorrowedBook.reader)
+        )
+
+    columns = []
+    options = []
+    for name, foreign_key in BORROWING_RELATIONSHIPS.items():
+        relationship = getattr(BorrowedBook, name)
+        if name in fields:
+            columns.append(foreign_key)
+            options.append(selectinload(relationship))
+        else:
+            options.append(raiseload(relationship))
+
+    columns.extend(
+        getattr(BorrowedBook, field) for field in fields if field not in BORROWING_RELATIONSHIPS
     )
-    book = book_result.scalar_one_or_none()
 
-    if not book:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Book with id {borrow_data.book_id} not found"
+    return select(BorrowedBook).options(load_only(*columns), *options)
+
+
+def borrowing_detail(borrowing: BorrowedBook, fields: list[str] | None):
+    if fields is not None:
+        return BorrowingDetailPartial.model_validate(
+            {field: getattr(borrowing, field) for field in fields}
         )
 
+    return BorrowingDetailResponse(
+        id=borrowing.id,
+        book=borrowing.book,
+        reader=borrowing.reader,
+        borrow_date=borrowing.borrow_date,
+        due_date=borrowing.due_date,
+        return_date=borrowing.return_date
+    )
+
+
+def borrowing_list(borrowings, total: int, fields: list[str] | None):
+    details = [borrowing_detail(b, fields) for b in borrowings]
+
+    if fields is not None:
+        return partial_response(BorrowingPartialList(borrowings=details, total=total))
+    return BorrowingList(borrowings=details, total=total)
+
+
+async def lend(
+        request: Request,
+        db: AsyncSession,
+        audit: AuditTrail,
+        book: Book,
+        reader_id: int,
+        branch_id: int,
+        item: Item | None = None
+) -> BorrowedBook:
     reader_result = await db.execute(
-        select(Reader).where(Reader.id == borrow_data.reader_id)
+        select(Reader).where(Reader.id == reader_id, Reader.deleted_at.is_(None))
     )
     reader = reader_result.scalar_one_or_none()
 
     if not reader:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Reader with id {borrow_data.reader_id} not found"
+            detail=f"Reader with id {reader_id} not found"
+        )
+
+    if item is not None and item.status != Item.AVAILABLE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Item {item.barcode} is {item.status.replace('_', ' ')}"
         )
 
-    if book.copies_available <= 0:
+    # The stored total may not have folded in the latest loans and returns yet
+    if await refresh_copies(db, book) <= 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Book '{book.title}' has no available copies"
+            detail=f"Book '{book.title}' has no available copies. Place a hold to join the waitlist"
         )
 
+    active_loans = await active_loan_conditions(db)
+
     active_borrowings_result = await db.execute(
         select(func.count(BorrowedBook.id))
         .where(
             and_(
-                BorrowedBook.reader_id == borrow_data.reader_id,
-                BorrowedBook.return_date.is_(None)
+                BorrowedBook.reader_id == reader_id,
+                *active_loans
             )
         )
     )
     active_count = active_borrowings_result.scalar_one()
 
-    if active_count >= 3:
+    if active_count >= settings.MAX_ACTIVE_BORROWINGS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Reader '{reader.name}' already has {active_count} active borrowings. Maximum is 3."
+            detail=(
+                f"Reader '{reader.name}' already has {active_count} active borrowings. "
+                f"Maximum is {settings.MAX_ACTIVE_BORROWINGS}."
+            )
         )
 
     existing_borrow_result = await db.execute(
         select(BorrowedBook)
         .where(
             and_(
-                BorrowedBook.book_id == borrow_data.book_id,
-                BorrowedBook.reader_id == borrow_data.reader_id,
-                BorrowedBook.return_date.is_(None)
+                BorrowedBook.book_id == book.id,
+                BorrowedBook.reader_id == reader_id,
+                *active_loans
             )
         )
     )
@@ -96,29 +170,182 @@ async def borrow_book(
             detail=f"Reader '{reader.name}' already has this book and hasn't returned it yet"
         )
 
-    new_borrowing = BorrowedBook(
-        book_id=borrow_data.book_id,
-        reader_id=borrow_data.reader_id
-    )
+    new_borrowing = await open_loan(db, book, reader.id, branch_id, item)
 
-    book.copies_available -= 1
+    if new_borrowing is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=(
+                f"Item {item.barcode} was just lent out" if item is not None
+                else f"Book '{book.title}' has no available copies at branch {branch_id}"
+            )
+        )
 
-    db.add(new_borrowing)
     await db.commit()
     await db.refresh(new_borrowing)
+    await invalidate(request, invalidate_reader_summary, reader.id)
+    audit.record(
+        "borrow", "borrowing", new_borrowing.id,
+        book_id=book.id, reader_id=reader.id, branch_id=new_borrowing.branch_id
+    )
+
+    await after_commit(request, publish_availability, book.id, book.copies_available, -1)
 
     return new_borrowing
 
 
+async def close_loan(
+        request: Request,
+        db: AsyncSession,
+        audit: AuditTrail,
+        borrowing: BorrowedBook,
+        branch_id: int | None
+) -> BorrowedBook:
+    """Return ``borrowing`` to ``branch_id``, by default the branch that lent it."""
+    if branch_id is None:
+        branch_id = borrowing.branch_id
+    else:
+        branch_result = await db.execute(select(Branch.id).where(Branch.id == branch_id))
+        if branch_result.scalar_one_or_none() is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Branch with id {branch_id} not found"
+            )
+
+    book_result = await db.execute(
+        select(Book).where(Book.id == borrowing.book_id)
+    )
+    book = book_result.scalar_one()
+
+    copies_before = await refresh_copies(db, book)
+    # The loan was read without a lock; of concurrent returns only one closes it
+    return_date = datetime.now(timezone.utc)
+    result = await db.execute(
+        update(BorrowedBook)
+        .where(
+            BorrowedBook.id == borrowing.id,
+            BorrowedBook.return_date.is_(None)
+        )
+        .values(return_date=return_date)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0 or not await return_copy(db, book, borrowing.item_id, branch_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="This loan was just returned"
+        )
+    set_committed_value(borrowing, "return_date", return_date)
+
+    await analytics.record_return(
+        db,
+        borrowing.book_id,
+        borrowing.reader_id,
+        borrowing.borrow_date,
+        borrowing.return_date
+    )
+    add_event(
+        db, "book.returned", "borrowing", borrowing.id,
+        book_id=book.id,
+        reader_id=borrowing.reader_id,
+        branch_id=branch_id
+    )
+    fulfilled = await assign_holds(db, book, branch_id)
+
+    await db.commit()
+    await db.refresh(borrowing)
+    await invalidate(
+        request, invalidate_reader_summary, borrowing.reader_id, *(hold.reader_id for hold in fulfilled)
+    )
+    audit.record("return", "borrowing", borrowing.id, book_id=book.id, reader_id=borrowing.reader_id)
+    for hold in fulfilled:
+        audit.record("borrow", "borrowing", hold.borrowing_id, hold_id=hold.id, reader_id=hold.reader_id)
+
+    await after_commit(
+        request, publish_availability, book.id, book.copies_available, book.copies_available - copies_before
+    )
+
+    return borrowing
+
+
+async def get_item_or_404(db: AsyncSession, barcode: str) -> Item:
+    # Point lookup on ux_items_barcode
+    result = await db.execute(select(Item).where(Item.barcode == barcode))
+    item = result.scalar_one_or_none()
+
+    if not item:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Item {barcode} not found"
+        )
+
+    return item
+
+
+@router.post(
+    "/borrow",
+    response_model=BorrowingResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Borrow a book"
+)
+async def borrow_book(
+        request: Request,
+        borrow_data: BorrowingCreate,
+        db: AsyncSession = Depends(get_db),
+        audit: AuditTrail = Depends(audit_trail)
+):
+    book_result = await db.execute(
+        select(Book).where(Book.id == borrow_data.book_id, Book.deleted_at.is_(None))
+    )
+    book = book_result.scalar_one_or_none()
+
+    if not book:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Book with id {borrow_data.book_id} not found"
+        )
+
+    branch_id = borrow_data.branch_id or Branch.DEFAULT_ID
+    return await lend(request, db, audit, book, borrow_data.reader_id, branch_id)
+
+
+@router.post(
+    "/checkout",
+    response_model=BorrowingResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Lend a scanned item"
+)
+async def checkout_item(
+        request: Request,
+        checkout_data: ItemCheckout,
+        db: AsyncSession = Depends(get_db),
+        audit: AuditTrail = Depends(audit_trail)
+):
+    item = await get_item_or_404(db, checkout_data.barcode)
+
+    book_result = await db.execute(
+        select(Book).where(Book.id == item.book_id, Book.deleted_at.is_(None))
+    )
+    book = book_result.scalar_one_or_none()
+
+    if not book:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Item {item.barcode} belongs to a deleted book"
+        )
+
+    return await lend(request, db, audit, book, checkout_data.reader_id, item.branch_id, item)
+
+
 @router.post(
     "/return",
     response_model=BorrowingResponse,
     summary="Return a book"
 )
 async def return_book(
+        request: Request,
         return_data: BorrowingReturn,
         db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        audit: AuditTrail = Depends(audit_trail)
 ):
     result = await db.execute(
         select(BorrowedBook)
@@ -126,7 +353,7 @@ async def return_book(
             and_(
                 BorrowedBook.book_id == return_data.book_id,
                 BorrowedBook.reader_id == return_data.reader_id,
-                BorrowedBook.return_date.is_(None)
+                *await active_loan_conditions(db)
             )
         )
     )
@@ -138,18 +365,41 @@ async def return_book(
             detail="This book was not borrowed by this reader or was already returned"
         )
 
-    book_result = await db.execute(
-        select(Book).where(Book.id == return_data.book_id)
-    )
-    book = book_result.scalar_one()
+    return await close_loan(request, db, audit, borrowing, return_data.branch_id)
 
-    borrowing.return_date = datetime.now(timezone.utc)
-    book.copies_available += 1
 
-    await db.commit()
-    await db.refresh(borrowing)
+@router.post(
+    "/checkin",
+    response_model=BorrowingResponse,
+    summary="Return a scanned item"
+)
+async def checkin_item(
+        request: Request,
+        checkin_data: ItemCheckin,
+        db: AsyncSession = Depends(get_db),
+        audit: AuditTrail = Depends(audit_trail)
+):
+    item = await get_item_or_404(db, checkin_data.barcode)
 
-    return borrowing
+    # Point lookup on ix_borrowed_books_active_item
+    result = await db.execute(
+        select(BorrowedBook)
+        .where(
+            and_(
+                BorrowedBook.item_id == item.id,
+                *await active_loan_conditions(db)
+            )
+        )
+    )
+    borrowing = result.scalar_one_or_none()
+
+    if not borrowing:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Item {item.barcode} is not on loan"
+        )
+
+    return await close_loan(request, db, audit, borrowing, checkin_data.branch_id)
 
 
 @router.get(
@@ -161,20 +411,17 @@ async def get_all_borrowings(
         skip: int = Query(0, ge=0),
         limit: int = Query(100, ge=1, le=100),
         active_only: bool = Query(False),
+        fields: list[str] | None = Depends(sparse_fields(BorrowingDetailResponse)),
         db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
-    query = select(BorrowedBook).options(
-        selectinload(BorrowedBook.book),
-        selectinload(BorrowedBook.reader)
-    )
-
-    if active_only:
-        query = query.where(BorrowedBook.return_date.is_(None))
-
+    query = select_borrowings(fields)
     count_query = select(func.count(BorrowedBook.id))
+
     if active_only:
-        count_query = count_query.where(BorrowedBook.return_date.is_(None))
+        active_loans = await active_loan_conditions(db)
+        query = query.where(*active_loans)
+        count_query = count_query.where(*active_loans)
 
     count_result = await db.execute(count_query)
     total = count_result.scalar_one()
@@ -183,19 +430,41 @@ async def get_all_borrowings(
     result = await db.execute(query)
     borrowings = result.scalars().all()
 
-    detail_borrowings = []
-    for b in borrowings:
-        detail_borrowings.append(
-            BorrowingDetailResponse(
-                id=b.id,
-                book=b.book,
-                reader=b.reader,
-                borrow_date=b.borrow_date,
-                return_date=b.return_date
-            )
-        )
+    return borrowing_list(borrowings, total, fields)
 
-    return BorrowingList(borrowings=detail_borrowings, total=total)
+
+@router.get(
+    "/overdue",
+    response_model=BorrowingList,
+    summary="Get overdue borrowings"
+)
+async def get_overdue_borrowings(
+        skip: int = Query(0, ge=0),
+        limit: int = Query(100, ge=1, le=100),
+        fields: list[str] | None = Depends(sparse_fields(BorrowingDetailResponse)),
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    overdue = and_(
+        *await active_loan_conditions(db),
+        BorrowedBook.due_date < datetime.now(timezone.utc)
+    )
+
+    count_result = await db.execute(
+        select(func.count(BorrowedBook.id)).where(overdue)
+    )
+    total = count_result.scalar_one()
+
+    result = await db.execute(
+        select_borrowings(fields)
+        .where(overdue)
+        .order_by(BorrowedBook.due_date, BorrowedBook.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    borrowings = result.scalars().all()
+
+    return borrowing_list(borrowings, total, fields)
 
 
 @router.get(
@@ -209,7 +478,7 @@ async def get_reader_active_borrowings(
         current_user: User = Depends(get_current_user)
 ):
     reader_result = await db.execute(
-        select(Reader).where(Reader.id == reader_id)
+        select(Reader).where(Reader.id == reader_id, Reader.deleted_at.is_(None))
     )
     reader = reader_result.scalar_one_or_none()
 
@@ -225,7 +494,7 @@ async def get_reader_active_borrowings(
         .where(
             and_(
                 BorrowedBook.reader_id == reader_id,
-                BorrowedBook.return_date.is_(None)
+                *await active_loan_conditions(db)
             )
         )
         .order_by(BorrowedBook.borrow_date.desc())
@@ -235,7 +504,8 @@ async def get_reader_active_borrowings(
     active_borrowings = [
         ActiveBorrowingResponse(
             book=b.book,
-            borrow_date=b.borrow_date
+            borrow_date=b.borrow_date,
+            due_date=b.due_date
         )
         for b in borrowings
     ]
@@ -250,15 +520,12 @@ async def get_reader_active_borrowings(
 )
 async def get_borrowing(
         borrowing_id: int,
+        fields: list[str] | None = Depends(sparse_fields(BorrowingDetailResponse)),
         db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
     result = await db.execute(
-        select(BorrowedBook)
-        .options(
-            selectinload(BorrowedBook.book),
-            selectinload(BorrowedBook.reader)
-        )
+        select_borrowings(fields)
         .where(BorrowedBook.id == borrowing_id)
     )
     borrowing = result.scalar_one_or_none()
@@ -269,10 +536,8 @@ async def get_borrowing(
             detail=f"Borrowing record with id {borrowing_id} not found"
         )
 
-    return BorrowingDetailResponse(
-        id=borrowing.id,
-        book=borrowing.book,
-        reader=borrowing.reader,
-        borrow_date=borrowing.borrow_date,
-        return_date=borrowing.return_date
-    )
+    detail = borrowing_detail(borrowing, fields)
+
+    if fields is not None:
+        return partial_response(detail)
+    return detail
@@ -0,0 +1,124 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.books import facet_cache
+from src.core.database import get_db, after_commit, invalidate
+from src.core.dependencies import get_current_user
+from src.models.book import Book
+from src.models.branch import Branch
+from src.models.user import User
+from src.schemas.branch import BranchCreate, BranchResponse, BranchList, InventoryUpdate, InventoryResponse
+from src.services.audit import AuditTrail, audit_trail
+from src.services.availability import publish_availability
+from src.services.circulation import assign_holds
+from src.services.inventory import refresh_copies, set_copies
+from src.services.summary import invalidate_reader_summary
+
+router = APIRouter()
+
+
+@router.get(
+    "/",
+    response_model=BranchList,
+    summary="List branches"
+)
+async def get_branches(
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    result = await db.execute(select(Branch).order_by(Branch.id))
+    branches = result.scalars().all()
+
+    return BranchList(branches=branches, total=len(branches))
+
+
+@router.post(
+    "/",
+    response_model=BranchResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create branch"
+)
+async def create_branch(
+        branch_data: BranchCreate,
+        db: AsyncSession = Depends(get_db),
+        audit: AuditTrail = Depends(audit_trail)
+):
+    result = await db.execute(select(Branch.id).where(Branch.code == branch_data.code))
+    if result.scalar_one_or_none() is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Branch with code {branch_data.code} already exists"
+        )
+
+    branch = Branch(code=branch_data.code, name=branch_data.name)
+
+    db.add(branch)
+    await db.commit()
+    await db.refresh(branch)
+    audit.record("create", "branch", branch.id, code=branch.code)
+
+    return branch
+
+
+@router.put(
+    "/{branch_id}/inventory/{book_id}",
+    response_model=InventoryResponse,
+    summary="Set the free copies of a book at a branch"
+)
+async def set_branch_inventory(
+        request: Request,
+        branch_id: int,
+        book_id: int,
+        inventory_data: InventoryUpdate,
+        db: AsyncSession = Depends(get_db),
+        audit: AuditTrail = Depends(audit_trail)
+):
+    branch_result = await db.execute(select(Branch.id).where(Branch.id == branch_id))
+    if branch_result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Branch with id {branch_id} not found"
+        )
+
+    book_result = await db.execute(
+        select(Book).where(Book.id == book_id, Book.deleted_at.is_(None))
+    )
+    book = book_result.scalar_one_or_none()
+
+    if not book:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Book with id {book_id} not found"
+        )
+
+    copies_before = await refresh_copies(db, book)
+    delta = await set_copies(db, book, branch_id, inventory_data.copies_available)
+    if delta is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Copies at this branch were lent out meanwhile, retry with the current inventory"
+        )
+    fulfilled = await assign_holds(db, book, branch_id) if delta > 0 else []
+    copies_available = inventory_data.copies_available - len(fulfilled)
+
+    await db.commit()
+    audit.record(
+        "update", "inventory", book.id,
+        branch_id=branch_id, copies_available=inventory_data.copies_available
+    )
+    for hold in fulfilled:
+        audit.record("borrow", "borrowing", hold.borrowing_id, hold_id=hold.id, reader_id=hold.reader_id)
+    await invalidate(request, invalidate_reader_summary, *(hold.reader_id for hold in fulfilled))
+    await invalidate(request, facet_cache.clear)
+
+    await after_commit(
+        request, publish_availability, book.id, book.copies_available, book.copies_available - copies_before
+    )
+
+    return InventoryResponse(
+        branch_id=branch_id,
+        book_id=book.id,
+        copies_available=copies_available,
+        book_copies_available=book.copies_available
+    )
@@ -0,0 +1,230 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select, func, and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import get_db
+from src.core.dependencies import get_current_user
+from src.models.book import Book
+from src.models.borrowing import BorrowedBook
+from src.models.hold import Hold
+from src.models.reader import Reader
+from src.models.user import User
+from src.schemas.hold import HoldCreate, HoldResponse, HoldList
+from src.services.audit import AuditTrail, audit_trail
+from src.services.inventory import refresh_copies
+
+router = APIRouter()
+
+
+async def get_queue_position(db: AsyncSession, hold: Hold) -> int | None:
+    """1-based place of a waiting hold in its book's queue.
+
+    A range count over ix_holds_waiting_queue, so the cost grows with the
+    position rather than being a single seek. A queue only holds the readers
+    waiting for one title, which keeps this cheaper than a stored rank that
+    every fulfilment and cancellation would have to renumber.
+    """
+    if hold.status != Hold.WAITING:
+        return None
+
+    # (book_id, id) < (book_id, hold.id)
+    result = await db.execute(
+        select(func.count(Hold.id))
+        .where(
+            and_(
+                Hold.book_id == hold.book_id,
+                Hold.status == Hold.WAITING,
+                Hold.id < hold.id
+            )
+        )
+    )
+    return result.scalar_one() + 1
+
+
+async def get_hold_or_404(db: AsyncSession, book_id: int, hold_id: int) -> Hold:
+    result = await db.execute(
+        select(Hold).where(
+            and_(
+                Hold.id == hold_id,
+                Hold.book_id == book_id
+            )
+        )
+    )
+    hold = result.scalar_one_or_none()
+
+    if not hold:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Hold {hold_id} for book {book_id} not found"
+        )
+
+    return hold
+
+
+@router.post(
+    "/{book_id}/holds",
+    response_model=HoldResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Place a hold on a book"
+)
+async def create_hold(
+        book_id: int,
+        hold_data: HoldCreate,
+        db: AsyncSession = Depends(get_db),
+        audit: AuditTrail = Depends(audit_trail)
+):
+    book_result = await db.execute(
+        select(Book).where(Book.id == book_id, Book.deleted_at.is_(None))
+    )
+    book = book_result.scalar_one_or_none()
+
+    if not book:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Book with id {book_id} not found"
+        )
+
+    reader_result = await db.execute(
+        select(Reader).where(Reader.id == hold_data.reader_id, Reader.deleted_at.is_(None))
+    )
+    reader = reader_result.scalar_one_or_none()
+
+    if not reader:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Reader with id {hold_data.reader_id} not found"
+        )
+
+    if await refresh_copies(db, book) > 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Book '{book.title}' has available copies and can be borrowed directly"
+        )
+
+    existing_result = await db.execute(
+        select(Hold.id).where(
+            and_(
+                Hold.book_id == book_id,
+                Hold.reader_id == hold_data.reader_id,
+                Hold.status == Hold.WAITING
+            )
+        )
+    )
+    if existing_result.scalar_one_or_none():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Reader '{reader.name}' is already waiting for this book"
+        )
+
+    borrowed_result = await db.execute(
+        select(BorrowedBook.id).where(
+            and_(
+                BorrowedBook.book_id == book_id,
+                BorrowedBook.reader_id == hold_data.reader_id,
+                BorrowedBook.return_date.is_(None)
+            )
+        )
+    )
+    if borrowed_result.scalar_one_or_none():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Reader '{reader.name}' already has this book and hasn't returned it yet"
+        )
+
+    hold = Hold(book_id=book_id, reader_id=hold_data.reader_id)
+    reader_name = reader.name
+
+    db.add(hold)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent request placed the same hold after the check above; ux_holds_waiting_reader refused it
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Reader '{reader_name}' is already waiting for this book"
+        )
+    await db.refresh(hold)
+    audit.record("create", "hold", hold.id, book_id=book_id, reader_id=hold.reader_id)
+
+    response = HoldResponse.model_validate(hold)
+    response.position = await get_queue_position(db, hold)
+
+    return response
+
+
+@router.get(
+    "/{book_id}/holds",
+    response_model=HoldList,
+    summary="Get the hold queue of a book"
+)
+async def get_holds(
+        book_id: int,
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    result = await db.execute(
+        select(Hold)
+        .where(
+            and_(
+                Hold.book_id == book_id,
+                Hold.status == Hold.WAITING
+            )
+        )
+        .order_by(Hold.id)
+    )
+    holds = result.scalars().all()
+
+    return HoldList(
+        holds=[
+            HoldResponse.model_validate(hold).model_copy(update={"position": position})
+            for position, hold in enumerate(holds, start=1)
+        ],
+        total=len(holds)
+    )
+
+
+@router.get(
+    "/{book_id}/holds/{hold_id}",
+    response_model=HoldResponse,
+    summary="Get hold with queue position"
+)
+async def get_hold(
+        book_id: int,
+        hold_id: int,
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    hold = await get_hold_or_404(db, book_id, hold_id)
+
+    response = HoldResponse.model_validate(hold)
+    response.position = await get_queue_position(db, hold)
+
+    return response
+
+
+@router.delete(
+    "/{book_id}/holds/{hold_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Cancel hold"
+)
+async def cancel_hold(
+        book_id: int,
+        hold_id: int,
+        db: AsyncSession = Depends(get_db),
+        audit: AuditTrail = Depends(audit_trail)
+):
+    hold = await get_hold_or_404(db, book_id, hold_id)
+
+    if hold.status != Hold.WAITING:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Hold {hold_id} is already {hold.status}"
+        )
+
+    hold.status = Hold.CANCELLED
+    await db.commit()
+    audit.record("cancel", "hold", hold.id, book_id=book_id, reader_id=hold.reader_id)
+
+    return None
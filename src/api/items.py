@@ -0,0 +1,106 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.books import facet_cache
+from src.core.database import get_db, after_commit, invalidate
+from src.core.dependencies import get_current_user
+from src.models.book import Book
+from src.models.branch import Branch
+from src.models.item import Item
+from src.models.user import User
+from src.schemas.item import ItemCreate, ItemList
+from src.services.audit import AuditTrail, audit_trail
+from src.services.availability import publish_availability
+from src.services.circulation import assign_holds
+from src.services.inventory import add_copies, refresh_copies
+from src.services.summary import invalidate_reader_summary
+
+router = APIRouter()
+
+
+async def get_book_or_404(db: AsyncSession, book_id: int) -> Book:
+    result = await db.execute(
+        select(Book).where(Book.id == book_id, Book.deleted_at.is_(None))
+    )
+    book = result.scalar_one_or_none()
+
+    if not book:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Book with id {book_id} not found"
+        )
+
+    return book
+
+
+@router.get(
+    "/{book_id}/items",
+    response_model=ItemList,
+    summary="Physical copies of a book"
+)
+async def get_items(
+        book_id: int,
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    await get_book_or_404(db, book_id)
+
+    result = await db.execute(
+        select(Item).where(Item.book_id == book_id).order_by(Item.copy_number)
+    )
+    items = result.scalars().all()
+
+    return ItemList(items=items, total=len(items))
+
+
+@router.post(
+    "/{book_id}/items",
+    response_model=ItemList,
+    status_code=status.HTTP_201_CREATED,
+    summary="Register copies with pre-printed barcodes"
+)
+async def create_items(
+        request: Request,
+        book_id: int,
+        item_data: ItemCreate,
+        db: AsyncSession = Depends(get_db),
+        audit: AuditTrail = Depends(audit_trail)
+):
+    book = await get_book_or_404(db, book_id)
+    branch_id = item_data.branch_id or Branch.DEFAULT_ID
+
+    branch_result = await db.execute(select(Branch.id).where(Branch.id == branch_id))
+    if branch_result.scalar_one_or_none() is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Branch with id {branch_id} not found"
+        )
+
+    barcodes = item_data.barcodes
+    existing_result = await db.execute(select(Item.barcode).where(Item.barcode.in_(barcodes)))
+    taken = set(existing_result.scalars())
+    if taken or len(set(barcodes)) != len(barcodes):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Duplicate barcodes: {', '.join(sorted(taken)) or 'repeated in request'}"
+        )
+
+    copies_before = await refresh_copies(db, book)
+    items = await add_copies(db, book, branch_id, len(barcodes), barcodes)
+    fulfilled = await assign_holds(db, book, branch_id)
+
+    await db.commit()
+    for item in items:
+        await db.refresh(item)
+    audit.record("create", "item", book.id, branch_id=branch_id, barcodes=barcodes)
+    for hold in fulfilled:
+        audit.record("borrow", "borrowing", hold.borrowing_id, hold_id=hold.id, reader_id=hold.reader_id)
+    await invalidate(request, invalidate_reader_summary, *(hold.reader_id for hold in fulfilled))
+    await invalidate(request, facet_cache.clear)
+
+    await after_commit(
+        request, publish_availability, book.id, book.copies_available, book.copies_available - copies_before
+    )
+
+    return ItemList(items=items, total=len(items))
@@ -0,0 +1,36 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import get_db
+from src.core.dependencies import get_current_user
+from src.models.outbox import OutboxEvent
+from src.models.user import User
+from src.schemas.outbox import OutboxMetricsResponse
+from src.services.outbox import outbox_relay
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics",
+    response_model=OutboxMetricsResponse,
+    summary="Outbox backlog and relay throughput"
+)
+async def get_outbox_metrics(
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    result = await db.execute(
+        select(func.count(OutboxEvent.id), func.min(OutboxEvent.created_at))
+        .where(OutboxEvent.delivered_at.is_(None))
+    )
+    pending, oldest_pending_at = result.one()
+
+    return OutboxMetricsResponse(
+        pending=pending,
+        oldest_pending_at=oldest_pending_at,
+        **asdict(outbox_relay.metrics())
+    )
@@ -1,12 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import select, func
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from sqlalchemy import select, update, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.core.database import get_db
-from src.core.dependencies import get_current_user
+from src.core.database import get_db, invalidate
+from src.core.dependencies import get_current_user, get_id_list
+from src.core.fields import sparse_fields, partial_response
+from src.models.hold import Hold
 from src.models.reader import Reader
 from src.models.user import User
-from src.schemas.reader import ReaderCreate, ReaderUpdate, ReaderResponse, ReaderList
+from src.schemas.reader import (
+    ReaderCreate,
+    ReaderUpdate,
+    ReaderResponse,
+    ReaderList,
+    ReaderPartial,
+    ReaderPartialList,
+    ReaderMatch,
+    ReaderSearchList,
+    ReaderSummary
+)
+from src.services.audit import AuditTrail, audit_trail
+from src.services.search import search_readers
+from src.services.summary import get_reader_summary, invalidate_reader_summary
 
 router = APIRouter()
 
@@ -20,10 +36,10 @@ router = APIRouter()
 async def create_reader(
         reader_data: ReaderCreate,
         db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        audit: AuditTrail = Depends(audit_trail)
 ):
     result = await db.execute(
-        select(Reader).where(Reader.email == reader_data.email)
+        select(Reader).where(Reader.email == reader_data.email, Reader.deleted_at.is_(None))
     )
     existing_reader = result.scalar_one_or_none()
 
@@ -41,29 +57,80 @@ async def create_reader(
     db.add(new_reader)
     await db.commit()
     await db.refresh(new_reader)
+    audit.record("create", "reader", new_reader.id)
 
     return new_reader
 
 
+async def select_readers(db: AsyncSession, fields: list[str] | None, *conditions) -> list:
+    """Live readers matching ``conditions``; with ``fields`` only those columns are read."""
+    conditions = (Reader.deleted_at.is_(None), *conditions)
+    if fields is None:
+        result = await db.execute(
+            select(Reader).where(*conditions).order_by(Reader.id)
+        )
+        return list(result.scalars())
+
+    result = await db.execute(
+        select(*(getattr(Reader, field) for field in fields))
+        .where(*conditions)
+        .order_by(Reader.id)
+    )
+    return [ReaderPartial.model_validate(row) for row in result.mappings()]
+
+
 @router.get(
     "/",
     response_model=ReaderList,
     summary="Get all readers"
 )
 async def get_readers(
+        ids: list[int] | None = Depends(get_id_list),
+        fields: list[str] | None = Depends(sparse_fields(ReaderResponse)),
         db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
-    count_result = await db.execute(select(func.count(Reader.id)))
-    total = count_result.scalar_one()
+    list_model = ReaderList if fields is None else ReaderPartialList
 
-    result = await db.execute(
-        select(Reader)
-        .order_by(Reader.id)
-    )
-    readers = result.scalars().all()
+    if ids is not None:
+        found = {reader.id: reader for reader in await select_readers(db, fields, Reader.id.in_(ids))}
+
+        reader_list = list_model(
+            readers=[found[reader_id] for reader_id in ids if reader_id in found],
+            total=len(found),
+            missing=[reader_id for reader_id in ids if reader_id not in found]
+        )
+    else:
+        count_result = await db.execute(
+            select(func.count(Reader.id)).where(Reader.deleted_at.is_(None))
+        )
+        total = count_result.scalar_one()
+
+        reader_list = list_model(readers=await select_readers(db, fields), total=total, missing=[])
+
+    if fields is not None:
+        return partial_response(reader_list)
+    return reader_list
+
+
+@router.get(
+    "/search",
+    response_model=ReaderSearchList,
+    summary="Fuzzy search readers by name or email"
+)
+async def search(
+        q: str = Query(..., min_length=2, max_length=255),
+        limit: int = Query(10, ge=1, le=50),
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    matches = await search_readers(db, q.strip(), limit)
 
-    return ReaderList(readers=readers, total=total)
+    readers = [
+        ReaderMatch(id=reader.id, name=reader.name, email=reader.email, score=round(score, 4))
+        for reader, score in matches
+    ]
+    return ReaderSearchList(readers=readers, total=len(readers))
 
 
 @router.get(
@@ -73,21 +140,42 @@ async def get_readers(
 )
 async def get_reader(
         reader_id: int,
+        fields: list[str] | None = Depends(sparse_fields(ReaderResponse)),
         db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
-    result = await db.execute(
-        select(Reader).where(Reader.id == reader_id)
-    )
-    reader = result.scalar_one_or_none()
+    readers = await select_readers(db, fields, Reader.id == reader_id)
 
-    if not reader:
+    if not readers:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Reader {reader_id} not found"
         )
 
-    return reader
+    if fields is not None:
+        return partial_response(readers[0])
+    return readers[0]
+
+
+@router.get(
+    "/{reader_id}/summary",
+    response_model=ReaderSummary,
+    summary="Get reader dashboard: active loans, overdue status and recent returns"
+)
+async def get_summary(
+        reader_id: int,
+        db: AsyncSession = Depends(get_db),
+        current_user: User = Depends(get_current_user)
+):
+    summary = await get_reader_summary(db, reader_id)
+
+    if summary is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Reader {reader_id} not found"
+        )
+
+    return summary
 
 
 @router.put(
@@ -96,14 +184,15 @@ async def get_reader(
     summary="Update reader"
 )
 async def update_reader(
+        request: Request,
         reader_id: int,
         reader_data: ReaderUpdate,
         db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        audit: AuditTrail = Depends(audit_trail)
 ):
     # Get existing reader
     result = await db.execute(
-        select(Reader).where(Reader.id == reader_id)
+        select(Reader).where(Reader.id == reader_id, Reader.deleted_at.is_(None))
     )
     reader = result.scalar_one_or_none()
 
@@ -115,7 +204,7 @@ async def update_reader(
 
     if reader_data.email and reader_data.email != reader.email:
         email_check = await db.execute(
-            select(Reader).where(Reader.email == reader_data.email)
+            select(Reader).where(Reader.email == reader_data.email, Reader.deleted_at.is_(None))
         )
         if email_check.scalar_one_or_none():
             raise HTTPException(
@@ -129,6 +218,8 @@ async def update_reader(
 
     await db.commit()
     await db.refresh(reader)
+    await invalidate(request, invalidate_reader_summary, reader.id)
+    audit.record("update", "reader", reader.id, changes=update_data)
 
     return reader
 
@@ -139,12 +230,13 @@ async def update_reader(
     summary="Delete reader"
 )
 async def delete_reader(
+        request: Request,
         reader_id: int,
         db: AsyncSession = Depends(get_db),
-        current_user: User = Depends(get_current_user)
+        audit: AuditTrail = Depends(audit_trail)
 ):
     result = await db.execute(
-        select(Reader).where(Reader.id == reader_id)
+        select(Reader).where(Reader.id == reader_id, Reader.deleted_at.is_(None))
     )
     reader = result.scalar_one_or_none()
 
@@ -154,7 +246,16 @@ async def delete_reader(
             detail=f"Reader {reader_id} not found"
         )
 
-    await db.delete(reader)
+    # Soft delete keeps the borrowing history and frees the email for reuse
+    reader.deleted_at = datetime.now(timezone.utc)
+    await db.execute(
+        update(Hold)
+        .where(Hold.reader_id == reader.id, Hold.status == Hold.WAITING)
+        .values(status=Hold.CANCELLED)
+        .execution_options(synchronize_session=False)
+    )
     await db.commit()
+    await invalidate(request, invalidate_reader_summary, reader_id)
+    audit.record("delete", "reader", reader_id)
 
     return None
@@ -0,0 +1,220 @@
+"""Response compression negotiated through ``Accept-Encoding``.
+
+gzip is always available; brotli and zstd are used when the optional
+``brotli`` / ``zstandard`` packages are installed. Complete responses
+under ``min_size`` are sent as is, larger ones are compressed in one go.
+Streaming responses are compressed chunk by chunk and flushed after every
+chunk, so SSE events still reach the client immediately.
+
+Responses that already carry a ``Content-Encoding`` pass through
+untouched, which is how cached responses stored precompressed are served.
+"""
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml"
+)
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+class CompressionPolicy:
+    def __init__(
+            self,
+            min_size: int = 1024,
+            gzip_level: int = 6,
+            brotli_quality: int = 5,
+            zstd_level: int = 3
+    ):
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.zstd_level = zstd_level
+
+        # Server preference when the client accepts several encodings equally
+        self.encodings = [
+            encoding
+            for encoding, available in (("zstd", zstandard), ("br", brotli), ("gzip", zlib))
+            if available is not None
+        ]
+
+    def negotiate(self, accept_encoding: str | None) -> str | None:
+        if not accept_encoding:
+            return None
+
+        weights = {}
+        for part in accept_encoding.split(","):
+            name, _, params = part.strip().partition(";")
+            weight = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    weight = float(params[2:])
+                except ValueError:
+                    weight = 0.0
+            weights[name.strip().lower()] = weight
+
+        wildcard = weights.get("*", 0.0)
+        best, best_weight = None, 0.0
+        for encoding in self.encodings:
+            weight = weights.get(encoding, wildcard)
+            if weight > best_weight:
+                best, best_weight = encoding, weight
+        return best
+
+    @staticmethod
+    def is_compressible(headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return False
+        return headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+    def stream(self, encoding: str):
+        if encoding == "zstd":
+            return _ZstdStream(self.zstd_level)
+        if encoding == "br":
+            return _BrotliStream(self.brotli_quality)
+        return _GzipStream(self.gzip_level)
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "zstd":
+            return zstandard.ZstdCompressor(level=self.zstd_level).compress(body)
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return self._gzip(body)
+
+    def _gzip(self, body: bytes) -> bytes:
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        return compressor.compress(body) + compressor.flush()
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, policy: CompressionPolicy):
+        self.app = app
+        self.policy = policy
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.policy.negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(self.policy, encoding, send)
+        await self.app(scope, receive, responder)
+
+
+class _CompressingResponder:
+    def __init__(self, policy: CompressionPolicy, encoding: str, send: Send):
+        self.policy = policy
+        self.encoding = encoding
+        self.send = send
+
+        self.start_message: Message | None = None
+        self.active = False
+        self.started = False
+        self.stream = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message.setdefault("headers", []))
+            self.active = self.policy.is_compressible(headers)
+            if self.active:
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if not self.active:
+            await self._send_start()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started and not more_body:
+            # Complete response in a single message
+            if len(body) < self.policy.min_size:
+                await self._send_start()
+                await self.send(message)
+                return
+
+            compressed = self.policy.compress(body, self.encoding)
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers["Content-Length"] = str(len(compressed))
+            await self._send_start()
+            await self.send({"type": "http.response.body", "body": compressed})
+            return
+
+        if not self.started:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            headers["Content-Encoding"] = self.encoding
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            self.stream = self.policy.stream(self.encoding)
+            await self._send_start()
+
+        chunk = self.stream.compress(body) if body else b""
+        if not more_body:
+            chunk += self.stream.finish()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _send_start(self) -> None:
+        if not self.started:
+            self.started = True
+            await self.send(self.start_message)
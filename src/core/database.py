@@ -1,16 +1,130 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncSession
+import asyncio
+import inspect
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import declarative_base
 
 from src.core.config import settings
+from src.core.slow_queries import SlowQueryLog
+from src.core.sqlite import SerializedSession, apply_pragmas
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def enable_sqlite_savepoints(engine: AsyncEngine) -> None:
+    """Let SQLAlchemy own SQLite transactions so SAVEPOINTs nest correctly.
+
+    The sqlite3 driver opens transactions lazily and would turn the first
+    SAVEPOINT into a transaction of its own, see
+    https://docs.sqlalchemy.org/en/20/dialects/sqlite.html#serializable-isolation-savepoints-transactional-ddl
+    """
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def do_connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def do_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+
+engine_options = {"echo": settings.DATABASE_ECHO}
+if not settings.DATABASE_URL.startswith("sqlite"):
+    # src.serve lowers these per worker to fit DB_MAX_CONNECTIONS
+    engine_options.update(pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW)
+
+engine = create_async_engine(settings.DATABASE_URL, **engine_options)
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.SLOW_QUERY_THRESHOLD_MS,
+    size=settings.SLOW_QUERY_LOG_SIZE,
+    sample_rate=settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE,
+    explain_timeout_ms=settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS,
+    log_parameters=settings.SLOW_QUERY_LOG_PARAMETERS
+)
+if settings.SLOW_QUERY_LOG_ENABLED:
+    slow_query_log.attach(engine)
+
+session_options = {"class_": AsyncSession}
+if engine.dialect.name == "sqlite":
+    enable_sqlite_savepoints(engine)
+    apply_pragmas(engine)
+    if settings.SQLITE_SERIALIZE_WRITES:
+        session_options = {"class_": SerializedSession, "writer_lock": asyncio.Lock()}
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
 async_session = async_sessionmaker(
+    engine,
+    expire_on_commit=False,
+    **session_options
+)
+# Never waits for the SQLite writer lock: for reads, and for writes under a turn already held
+concurrent_session = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False
 )
 Base = declarative_base()
 
-async def get_db():
-    async with async_session() as session:
+async def get_db(request: Request):
+    # Atomic POST /batch runs all of its sub-requests on one shared session
+    batch_session = getattr(request.state, "db_session", None)
+    if batch_session is not None:
+        yield batch_session
+        return
+
+    if request.method in SAFE_METHODS or getattr(request.state, "holds_writer_lock", False):
+        factory = concurrent_session
+    else:
+        factory = async_session
+    async with factory() as session:
         yield session
+
+
+async def run_callbacks(callbacks: list[tuple[Callable, tuple]]) -> None:
+    for callback, args in callbacks:
+        result = callback(*args)
+        if inspect.isawaitable(result):
+            await result
+
+
+async def after_commit(request: Request, callback: Callable, *args) -> None:
+    """Run a side effect of the request's committed changes, e.g. a notification.
+
+    Inside an atomic POST /batch a handler's commit only releases a savepoint,
+    so the callback waits in ``request.state.after_commit`` until the batch
+    commits and is dropped if the batch rolls back.
+    """
+    deferred = getattr(request.state, "after_commit", None)
+    if deferred is not None:
+        deferred.append((callback, args))
+    else:
+        await run_callbacks([(callback, args)])
+
+
+async def invalidate(request: Request, callback: Callable, *args) -> None:
+    """Drop cached data the request changed.
+
+    Runs right away, so later sub-requests of a batch don't read stale
+    entries, and inside an atomic POST /batch again once the batch is over:
+    what those sub-requests cached may be uncommitted changes it rolled back.
+    """
+    await run_callbacks([(callback, args)])
+    deferred = getattr(request.state, "after_batch", None)
+    if deferred is not None:
+        deferred.append((callback, args))
+
+
+async def create_schema() -> None:
+    """Create missing tables for embedded mode, where the Postgres migrations don't apply."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes even for timezone-aware columns
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
@@ -1,8 +1,9 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from src.core.config import settings
 from src.core.database import get_db
 from src.core.security import decode_access_token
 from src.models.user import User
@@ -11,9 +12,15 @@ security = HTTPBearer()
 
 
 async def get_current_user(
+        request: Request,
         credentials: HTTPAuthorizationCredentials = Depends(security),
         db: AsyncSession = Depends(get_db)
 ) -> User:
+    # Sub-requests of POST /batch reuse the user resolved for the whole batch
+    batch_user = getattr(request.state, "batch_user", None)
+    if batch_user is not None:
+        return batch_user
+
     token = credentials.credentials
     payload = decode_access_token(token)
 
@@ -40,3 +47,29 @@ async def get_current_user(
         )
 
     return user
+
+
+def get_id_list(
+        ids: str | None = Query(None, description="Comma separated ids to fetch in one request, e.g. 1,2,3")
+) -> list[int] | None:
+    if ids is None:
+        return None
+
+    try:
+        parsed = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="ids must be a comma separated list of integers"
+        )
+
+    # Keep the requested order, drop repeats
+    parsed = list(dict.fromkeys(parsed))
+
+    if len(parsed) > settings.MAX_LOOKUP_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"At most {settings.MAX_LOOKUP_IDS} ids can be requested at once"
+        )
+
+    return parsed
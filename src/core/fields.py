@@ -0,0 +1,39 @@
+from fastapi import HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+def sparse_fields(model: type[BaseModel]):
+    """Dependency parsing ``?fields=a,b`` against the fields of ``model``.
+
+    Resolves to ``None`` when the parameter is absent, otherwise to the
+    requested field names with ``id`` always first.
+    """
+    allowed = list(model.model_fields)
+
+    def dependency(
+            fields: str | None = Query(
+                None,
+                description=f"Comma separated subset of: {', '.join(allowed)}"
+            )
+    ) -> list[str] | None:
+        if fields is None:
+            return None
+
+        requested = list(dict.fromkeys(part.strip() for part in fields.split(",") if part.strip()))
+        unknown = [field for field in requested if field not in allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+
+        if "id" in allowed:
+            requested = ["id"] + [field for field in requested if field != "id"]
+        return requested
+
+    return dependency
+
+
+def partial_response(content: BaseModel, status_code: int = status.HTTP_200_OK) -> JSONResponse:
+    return JSONResponse(content.model_dump(mode="json", exclude_unset=True), status_code=status_code)
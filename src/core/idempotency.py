@@ -0,0 +1,220 @@
+"""``Idempotency-Key`` support for unsafe endpoints.
+
+The first request with a given key runs the handler; its response is kept
+in a small in-process TTL store and replayed byte for byte to retries
+without touching the handler, the auth dependency or the database.
+Duplicates that arrive while the first request is still running wait for
+it instead of executing concurrently. Compressed variants of a stored body
+are cached next to it, so hot replays are not recompressed on every hit.
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.compression import CompressionPolicy
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+
+
+@dataclass(slots=True)
+class StoredResponse:
+    fingerprint: bytes
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    expires_at: float
+    variants: dict[str, bytes] = field(default_factory=dict)
+
+
+class IdempotencyStore:
+    """Responses by key, evicted by TTL and then by age once ``max_entries`` is reached.
+
+    Every entry lives for the same TTL, so insertion order is expiry order and
+    purging only ever looks at the oldest entries.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._entries: OrderedDict[bytes, StoredResponse] = OrderedDict()
+        self._in_flight: dict[bytes, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _purge(self, now: float) -> None:
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest.expires_at > now and len(self._entries) <= self._max_entries:
+                break
+            self._entries.popitem(last=False)
+
+    def get(self, key: bytes) -> StoredResponse | None:
+        self._purge(time.monotonic())
+        return self._entries.get(key)
+
+    def claim(self, key: bytes) -> asyncio.Future | None:
+        """Claim ``key`` for execution, or return the future of the request that holds it."""
+        waiter = self._in_flight.get(key)
+        if waiter is not None:
+            return waiter
+        self._in_flight[key] = asyncio.get_running_loop().create_future()
+        return None
+
+    def release(self, key: bytes, response: StoredResponse | None) -> None:
+        if response is not None:
+            self._entries[key] = response
+            self._purge(time.monotonic())
+        waiter = self._in_flight.pop(key, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    def make_response(self, fingerprint: bytes, status: int, headers, body: bytes) -> StoredResponse:
+        return StoredResponse(fingerprint, status, headers, body, time.monotonic() + self._ttl)
+
+
+class IdempotencyMiddleware:
+    def __init__(
+            self,
+            app: ASGIApp,
+            store: IdempotencyStore,
+            paths: set[str],
+            compression: CompressionPolicy | None = None
+    ):
+        self.app = app
+        self.store = store
+        self.paths = paths
+        self.compression = compression
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+                scope["type"] != "http"
+                or scope["method"] != "POST"
+                or scope["path"] not in self.paths
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        raw_key = headers.get(IDEMPOTENCY_HEADER)
+        if raw_key is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not raw_key or len(raw_key) > MAX_KEY_LENGTH:
+            await self._send_error(send, 400, b"Invalid Idempotency-Key header")
+            return
+
+        # Keys are scoped to the caller and the endpoint
+        key = hashlib.sha256(
+            b"\0".join([headers.get(b"authorization", b""), scope["path"].encode(), raw_key])
+        ).digest()
+
+        body = await self._read_body(receive)
+        fingerprint = hashlib.sha256(body).digest()
+
+        while True:
+            stored = self.store.get(key)
+            if stored is not None:
+                if stored.fingerprint != fingerprint:
+                    await self._send_error(
+                        send, 422, b"Idempotency-Key was already used with a different request body"
+                    )
+                    return
+                await self._replay(send, stored, headers.get(b"accept-encoding"))
+                return
+
+            waiter = self.store.claim(key)
+            if waiter is None:
+                break
+            await waiter
+
+        response = None
+        try:
+            response = await self._execute(scope, body, send, fingerprint)
+        finally:
+            self.store.release(key, response)
+
+    async def _execute(self, scope: Scope, body: bytes, send: Send, fingerprint: bytes) -> StoredResponse | None:
+        sent = False
+
+        async def receive() -> Message:
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return {"type": "http.disconnect"}
+
+        status = 500
+        response_headers = []
+        chunks = []
+
+        async def capture(message: Message) -> None:
+            nonlocal status, response_headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+        # Server errors are worth retrying for real, everything else is final
+        if status >= 500:
+            return None
+
+        return self.store.make_response(fingerprint, status, response_headers, b"".join(chunks))
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] != "http.request":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        return b"".join(chunks)
+
+    async def _replay(self, send: Send, stored: StoredResponse, accept_encoding: bytes | None) -> None:
+        headers = MutableHeaders(raw=list(stored.headers))
+        headers["Idempotent-Replayed"] = "true"
+        body = stored.body
+
+        if self.compression is not None and self.compression.is_compressible(Headers(raw=stored.headers)):
+            headers.add_vary_header("Accept-Encoding")
+            encoding = self.compression.negotiate(accept_encoding.decode("latin-1") if accept_encoding else None)
+            if encoding is not None and len(body) >= self.compression.min_size:
+                if encoding not in stored.variants:
+                    stored.variants[encoding] = self.compression.compress(body, encoding)
+                body = stored.variants[encoding]
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+
+        await send({
+            "type": "http.response.start",
+            "status": stored.status,
+            "headers": headers.raw
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def _send_error(send: Send, status: int, detail: bytes) -> None:
+        body = b'{"detail":"' + detail + b'"}'
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
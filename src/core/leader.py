@@ -0,0 +1,96 @@
+"""Elects the one worker that runs the background jobs.
+
+Every worker started by ``python -m src.serve`` runs the lifespan, but the
+overdue scan, partition maintenance and archiving, the outbox relay and
+the recommendation rebuild must run once per deployment. They only start
+in the worker holding a Postgres session-level advisory lock. The others
+retry every ``BACKGROUND_JOBS_RETRY_SECONDS``; the lock goes away with the
+leader's connection, so a recycled or crashed leader is replaced. The
+leader checks that connection on the same interval and stops its jobs if
+it is gone. SQLite runs a single worker, which is always elected.
+"""
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+Job = Callable[[], Awaitable[None]]
+
+
+class LeaderElection:
+    def __init__(self, engine: AsyncEngine, lock_id: int, retry_interval: float):
+        self.engine = engine
+        self.lock_id = lock_id
+        self.retry_interval = retry_interval
+        self.leader = False
+
+        self._connection: AsyncConnection | None = None
+
+    async def try_acquire(self) -> bool:
+        if self.engine.dialect.name != "postgresql":
+            self.leader = True
+            return True
+
+        try:
+            connection = await self.engine.connect()
+        except Exception:
+            logger.exception("Could not connect to elect the background jobs leader")
+            return False
+        try:
+            acquired = await connection.scalar(
+                text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": self.lock_id}
+            )
+            # Leave no transaction open on a connection held for hours
+            await connection.commit()
+        except Exception:
+            logger.exception("Could not elect the background jobs leader")
+            await connection.close()
+            return False
+
+        if not acquired:
+            await connection.close()
+            return False
+        self._connection = connection
+        self.leader = True
+        return True
+
+    async def release(self) -> None:
+        self.leader = False
+        if self._connection is not None:
+            # Discarding the connection rather than pooling it releases the lock
+            await self._connection.invalidate()
+            await self._connection.close()
+            self._connection = None
+
+    async def _still_leader(self) -> None:
+        """Returns once the lock can no longer be vouched for."""
+        while True:
+            await asyncio.sleep(self.retry_interval)
+            if self._connection is None:
+                continue
+            try:
+                await self._connection.execute(text("SELECT 1"))
+                await self._connection.commit()
+            except Exception:
+                logger.exception("Lost the connection holding the background jobs lock")
+                return
+
+    async def run(self, jobs: list[Job]) -> None:
+        while True:
+            if not await self.try_acquire():
+                await asyncio.sleep(self.retry_interval)
+                continue
+
+            logger.info("Elected to run %d background jobs", len(jobs))
+            tasks = [asyncio.create_task(job()) for job in jobs]
+            try:
+                await self._still_leader()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                await self.release()
@@ -0,0 +1,79 @@
+"""OpenAPI document generated at build time.
+
+``python -m src.core.openapi`` writes ``app.openapi()`` to
+``OPENAPI_SCHEMA_PATH`` along with a fingerprint of the source tree it was
+generated from. :func:`use_precomputed_openapi` makes ``app.openapi`` load
+that file on first use instead of walking every route and model, so the
+first ``/docs`` hit on a fresh worker costs a JSON read. A missing file, or
+one whose fingerprint doesn't match the running code, is ignored and the
+document is generated as before.
+"""
+import argparse
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+import fastapi
+import pydantic
+from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+SOURCE_ROOT = Path(__file__).resolve().parents[1]
+
+
+def source_fingerprint() -> str:
+    """Digest of every module under ``src`` and the versions that shape the document."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{fastapi.__version__}\0{pydantic.VERSION}\0".encode())
+    for path in sorted(SOURCE_ROOT.rglob("*.py")):
+        digest.update(str(path.relative_to(SOURCE_ROOT)).encode() + b"\0")
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def load_openapi(path: str) -> dict | None:
+    try:
+        with open(path, "rb") as file:
+            stored = json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        logger.warning("Ignoring unreadable OpenAPI schema at %s", path)
+        return None
+
+    if stored.get("fingerprint") != source_fingerprint():
+        logger.warning("OpenAPI schema at %s was built from different sources, regenerating", path)
+        return None
+    return stored["schema"]
+
+
+def write_openapi(app: FastAPI, path: str) -> None:
+    stored = {"fingerprint": source_fingerprint(), "schema": app.openapi()}
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(stored, file, separators=(",", ":"))
+
+
+def use_precomputed_openapi(app: FastAPI, path: str) -> None:
+    generate = app.openapi
+
+    def openapi() -> dict:
+        if app.openapi_schema is None:
+            app.openapi_schema = load_openapi(path) or generate()
+        return app.openapi_schema
+
+    app.openapi = openapi
+
+
+if __name__ == "__main__":
+    from src.core.config import settings
+
+    parser = argparse.ArgumentParser(description="Write the OpenAPI schema served by the API")
+    parser.add_argument("--output", default=settings.OPENAPI_SCHEMA_PATH, help="schema file to write")
+    args = parser.parse_args()
+
+    from src.main import app
+
+    write_openapi(app, args.output)
+    print(f"Wrote {args.output}")
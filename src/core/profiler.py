@@ -0,0 +1,361 @@
+"""On-demand profiling of live requests.
+
+:meth:`Profiler.start` arms the profiler for the next ``requests`` requests,
+optionally only those matching one route. While it is disarmed the
+middleware costs one attribute check per request and nothing else runs.
+
+The default ``sampling`` mode runs a thread that, every ``interval``,
+captures the event loop thread's stack. A sample is kept when it is inside
+a profiled request, and it is rooted at that request. Profiled requests
+that are suspended at the same moment contribute the chain of coroutines
+they are awaiting, ending in an ``[await]`` frame. Time spent waiting on
+the database therefore shows up under the driver, not just CPU time.
+``cprofile`` mode is deterministic and exists where frames can't be
+sampled. It profiles everything that runs on the loop while a profiled
+request is in flight, and reconstructs stacks from each function's
+heaviest caller.
+
+The armed state and the recorded profile belong to the worker process that
+handled the arming request, and only its share of the traffic is
+profiled. With several workers, later status or export requests usually
+reach another worker, so ``POST /admin/profiler/record`` arms, waits and
+returns the profile in one request.
+
+Profiles export as collapsed stacks (``flamegraph.pl``, speedscope,
+Firefox profiler; weights in microseconds) or speedscope JSON. Frames from
+Pydantic, SQLAlchemy, passlib and the database drivers are prefixed with
+their library, and :meth:`Profiler.status` sums the time of each sample
+under the innermost library frame of its stack.
+"""
+import cProfile
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.slow_queries import describe_route
+
+logger = logging.getLogger(__name__)
+
+SAMPLING = "sampling"
+CPROFILE = "cprofile"
+AWAIT_FRAME = "[await]"
+EXCLUDED_PREFIX = "/admin/profiler"
+
+CATEGORIES = {
+    "pydantic": "pydantic",
+    "pydantic_core": "pydantic",
+    "sqlalchemy": "sqlalchemy",
+    "passlib": "passlib",
+    "bcrypt": "passlib",
+    "asyncpg": "driver",
+    "aiosqlite": "driver",
+    "sqlite3": "driver",
+}
+
+_categories_by_file: dict[str, str | None] = {}
+
+
+def category_of(filename: str) -> str | None:
+    category = _categories_by_file.get(filename, "")
+    if category == "":
+        parts = filename.replace("\\", "/").split("/")
+        category = next((CATEGORIES[part] for part in reversed(parts[:-1]) if part in CATEGORIES), None)
+        _categories_by_file[filename] = category
+    return category
+
+
+def frame_label(filename: str, line: int, name: str) -> str:
+    category = category_of(filename)
+    location = f"{os.path.basename(filename)}:{line}"
+    return f"[{category}] {name} ({location})" if category else f"{name} ({location})"
+
+
+# (filename, first line, qualified name) of a function
+FrameKey = tuple[str, int, str]
+
+
+def code_key(code) -> FrameKey:
+    return code.co_filename, code.co_firstlineno, getattr(code, "co_qualname", code.co_name)
+
+
+def stack_category(stack: tuple[FrameKey, ...]) -> str:
+    """Library of the innermost frame that belongs to one, else ``app``."""
+    for filename, _, _ in reversed(stack):
+        category = category_of(filename)
+        if category is not None:
+            return category
+    return "app"
+
+
+def await_chain(coro) -> list[FrameKey]:
+    """Functions a suspended coroutine is awaiting, outermost first."""
+    keys = []
+    awaitable = coro
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            break
+        keys.append(code_key(frame.f_code))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    return keys
+
+
+@dataclass
+class ProfileData:
+    mode: str
+    route: str | None
+    requests: int
+    interval: float
+    started_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    profiled: int = 0
+    # (root label, frames from the request down, awaiting) -> seconds
+    stacks: Counter = field(default_factory=Counter)
+    cprofile: cProfile.Profile | None = None
+
+
+@dataclass(eq=False)
+class ActiveRequest:
+    scope: Scope
+    coro: object
+    data: ProfileData
+
+
+class Profiler:
+    def __init__(self):
+        self.armed = False
+        self.data: ProfileData | None = None
+
+        self._routes: list[BaseRoute] = []
+        self._remaining = 0
+        self._active: dict[int, ActiveRequest] = {}
+        self._lock = threading.Lock()
+        self._sampler: threading.Thread | None = None
+        self._loop_thread = 0
+
+    def start(
+            self,
+            requests: int,
+            routes: list[BaseRoute] | None = None,
+            route: str | None = None,
+            mode: str = SAMPLING,
+            interval: float = 0.005
+    ) -> None:
+        if mode == SAMPLING and not hasattr(sys, "_current_frames"):  # pragma: no cover - not CPython
+            mode = CPROFILE
+        self.data = ProfileData(mode=mode, route=route, requests=requests, interval=interval)
+        if mode == CPROFILE:
+            self.data.cprofile = cProfile.Profile()
+        self._routes = routes or []
+        self._remaining = requests
+        self.armed = True
+
+    def stop(self) -> None:
+        self.armed = False
+        self._remaining = 0
+
+    def claim(self, scope: Scope) -> bool:
+        """Whether to profile this request; uses up one of the armed requests."""
+        if scope["path"].startswith(EXCLUDED_PREFIX):
+            return False
+        if self._routes and not any(route.matches(scope)[0] == Match.FULL for route in self._routes):
+            return False
+
+        self._remaining -= 1
+        if self._remaining <= 0:
+            self.armed = False
+        return True
+
+    async def profile(self, scope: Scope, coro) -> None:
+        data = self.data
+        request = ActiveRequest(scope, coro, data)
+        with self._lock:
+            self._active[id(request)] = request
+            data.profiled += 1
+            if data.cprofile is not None:
+                if not self._profiling_with(data, excluding=request):
+                    try:
+                        data.cprofile.enable()
+                    except ValueError:
+                        # Python 3.12+ allows a single profiling tool per process
+                        logger.warning("Another profiler is active, request not profiled")
+            elif self._sampler is None:
+                self._loop_thread = threading.get_ident()
+                self._sampler = threading.Thread(target=self._sample, args=(data.interval,), daemon=True)
+                self._sampler.start()
+        try:
+            await coro
+        finally:
+            with self._lock:
+                del self._active[id(request)]
+                if data.cprofile is not None and not self._profiling_with(data):
+                    data.cprofile.disable()
+
+    @property
+    def finished(self) -> bool:
+        """Disarmed, and every profiled request has completed."""
+        return not self.armed and not self._active
+
+    def _profiling_with(self, data: ProfileData, excluding: ActiveRequest | None = None) -> bool:
+        return any(request.data is data and request is not excluding for request in self._active.values())
+
+    def _sample(self, interval: float) -> None:
+        last = time.perf_counter()
+        while True:
+            time.sleep(interval)
+            now = time.perf_counter()
+            weight, last = now - last, now
+
+            with self._lock:
+                requests = [request for request in self._active.values() if request.data.cprofile is None]
+                if not requests:
+                    self._sampler = None
+                    return
+
+            chain = []
+            frame = sys._current_frames().get(self._loop_thread)
+            while frame is not None:
+                chain.append(frame)
+                frame = frame.f_back
+            positions = {id(frame): index for index, frame in enumerate(chain)}
+
+            samples = []
+            running = None
+            for request in requests:
+                frame = request.coro.cr_frame
+                if frame is None:
+                    continue
+                index = positions.get(id(frame))
+                if index is None:
+                    samples.append((request, tuple(await_chain(request.coro)), True))
+                elif running is None or index < running[0]:
+                    # The innermost request owns the stack, e.g. a batch sub-request
+                    running = (index, request)
+            if running is not None:
+                index, request = running
+                stack = tuple(code_key(frame.f_code) for frame in reversed(chain[:index + 1]))
+                samples.append((request, stack, False))
+
+            with self._lock:
+                for request, stack, awaiting in samples:
+                    request.data.stacks[(describe_route(request.scope), stack, awaiting)] += weight
+
+    def _cprofile_stacks(self, data: ProfileData) -> Counter:
+        data.cprofile.create_stats()
+        stats = data.cprofile.stats
+        stacks = Counter()
+        for function, (_, _, self_time, _, callers) in stats.items():
+            if self_time <= 0:
+                continue
+            path = [function]
+            seen = {function}
+            while callers:
+                caller = max(callers, key=lambda key: callers[key][3])
+                if caller in seen or caller not in stats:
+                    break
+                path.append(caller)
+                seen.add(caller)
+                callers = stats[caller][4]
+            stack = tuple((filename, line, name) for filename, line, name in reversed(path))
+            stacks[("cProfile", stack, False)] += self_time
+        return stacks
+
+    def stacks(self) -> Counter:
+        data = self.data
+        if data is None:
+            return Counter()
+        if data.cprofile is not None:
+            with self._lock:
+                # Reading the stats stops the profiler, so wait for the requests to finish
+                if self._profiling_with(data):
+                    return Counter()
+                return self._cprofile_stacks(data)
+        with self._lock:
+            return Counter(data.stacks)
+
+    def status(self) -> dict:
+        data = self.data
+        stacks = self.stacks()
+        categories = Counter()
+        for (_, stack, _), seconds in stacks.items():
+            categories[stack_category(stack)] += seconds
+        return {
+            "armed": self.armed,
+            "in_flight": len(self._active),
+            "mode": data.mode if data else None,
+            "route": data.route if data else None,
+            "requests": data.requests if data else 0,
+            "profiled": data.profiled if data else 0,
+            "started_at": data.started_at if data else None,
+            "seconds": sum(stacks.values()),
+            "await_seconds": sum(seconds for (_, _, awaiting), seconds in stacks.items() if awaiting),
+            "categories": dict(categories),
+        }
+
+    def collapsed(self) -> str:
+        lines = []
+        for (root, stack, awaiting), seconds in sorted(self.stacks().items(), key=lambda item: -item[1]):
+            frames = [root] + [frame_label(*key) for key in stack] + ([AWAIT_FRAME] if awaiting else [])
+            lines.append(f"{';'.join(frames)} {max(1, round(seconds * 1e6))}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def speedscope(self) -> dict:
+        frames = []
+        indexes = {}
+
+        def index_of(name: str, filename: str | None = None, line: int | None = None) -> int:
+            key = (name, filename, line)
+            if key not in indexes:
+                indexes[key] = len(frames)
+                frame = {"name": name}
+                if filename is not None:
+                    frame.update(file=filename, line=line)
+                frames.append(frame)
+            return indexes[key]
+
+        samples = []
+        weights = []
+        for (root, stack, awaiting), seconds in self.stacks().items():
+            sample = [index_of(root)] + [index_of(frame_label(*key), key[0], key[1]) for key in stack]
+            if awaiting:
+                sample.append(index_of(AWAIT_FRAME))
+            samples.append(sample)
+            weights.append(seconds)
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "exporter": "library-api",
+            "name": "Library API",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": f"{self.data.mode} profile" if self.data else "profile",
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights
+            }]
+        }
+
+
+class ProfilerMiddleware:
+    def __init__(self, app: ASGIApp, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.profiler.armed or scope["type"] != "http" or not self.profiler.claim(scope):
+            await self.app(scope, receive, send)
+            return
+        await self.profiler.profile(scope, self.app(scope, receive, send))
+
+
+profiler = Profiler()
@@ -0,0 +1,230 @@
+"""In-process pub/sub fan-out with a pluggable cross-worker backend.
+
+Every subscriber gets its own bounded queue. A subscriber that falls
+``queue_size`` messages behind is dropped rather than buffered without
+limit; its stream ends and the client is expected to reconnect.
+
+Backends only move serialized messages between workers: ``InMemoryBackend``
+loops them straight back (single worker, tests), ``PostgresNotifyBackend``
+goes through ``LISTEN/NOTIFY`` so every worker sees every message and
+reconnects on its own when the listening connection is lost.
+"""
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, Protocol
+
+logger = logging.getLogger(__name__)
+
+Deliver = Callable[[str], None]
+
+
+class PubSubBackend(Protocol):
+    async def start(self, deliver: Deliver) -> None: ...
+
+    async def stop(self) -> None: ...
+
+    async def publish(self, payload: str) -> None: ...
+
+
+class InMemoryBackend:
+    def __init__(self):
+        self._deliver: Deliver | None = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+    async def publish(self, payload: str) -> None:
+        if self._deliver is not None:
+            self._deliver(payload)
+
+
+class PostgresNotifyBackend:
+    """``LISTEN/NOTIFY`` on a dedicated connection that is kept alive.
+
+    A supervisor task pings the connection every ``health_interval`` seconds
+    and is woken at once when asyncpg reports it terminated. A lost
+    connection is replaced with exponential backoff between attempts and the
+    listener registered again; messages published meanwhile are dropped.
+    """
+
+    def __init__(
+            self,
+            dsn: str,
+            channel: str,
+            health_interval: float = 30.0,
+            base_backoff: float = 0.5,
+            max_backoff: float = 30.0,
+            connect: Callable[[str], Awaitable] | None = None
+    ):
+        self._dsn = dsn
+        self._channel = channel
+        self._health_interval = health_interval
+        self._base_backoff = base_backoff
+        self._max_backoff = max_backoff
+        self._connect = connect
+        self._connection = None
+        self._lock = asyncio.Lock()
+        self._deliver: Deliver | None = None
+        self._lost = asyncio.Event()
+        self._supervisor: asyncio.Task | None = None
+
+    async def _open(self) -> None:
+        if self._connect is None:
+            import asyncpg
+
+            self._connect = asyncpg.connect
+
+        connection = await self._connect(self._dsn)
+        try:
+            await connection.add_listener(self._channel, self._notified)
+        except BaseException:
+            await connection.close()
+            raise
+        connection.add_termination_listener(self._terminated)
+        self._connection = connection
+        self._lost.clear()
+
+    def _notified(self, connection, pid, channel, payload) -> None:
+        if self._deliver is not None:
+            self._deliver(payload)
+
+    def _terminated(self, connection) -> None:
+        if connection is self._connection:
+            self._connection = None
+            self._lost.set()
+
+    async def _check(self) -> None:
+        connection = self._connection
+        if connection is None:
+            return
+        try:
+            async with self._lock:
+                await asyncio.wait_for(connection.execute("SELECT 1"), self._health_interval)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("LISTEN connection failed its health check: %r", exc)
+            connection.terminate()
+            self._terminated(connection)
+
+    async def _supervise(self) -> None:
+        attempts = 0
+        while True:
+            if self._connection is None:
+                try:
+                    await self._open()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    attempts += 1
+                    delay = min(self._base_backoff * 2 ** (attempts - 1), self._max_backoff)
+                    logger.warning("Reconnecting LISTEN on %s failed, retrying in %.1fs: %r", self._channel, delay, exc)
+                    await asyncio.sleep(delay)
+                    continue
+                logger.info("LISTEN on %s restored", self._channel)
+                attempts = 0
+
+            try:
+                await asyncio.wait_for(self._lost.wait(), self._health_interval)
+            except asyncio.TimeoutError:
+                await self._check()
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        await self._open()
+        self._supervisor = asyncio.create_task(self._supervise())
+
+    async def stop(self) -> None:
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            await asyncio.gather(self._supervisor, return_exceptions=True)
+            self._supervisor = None
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            await connection.close()
+        self._deliver = None
+
+    async def publish(self, payload: str) -> None:
+        connection = self._connection
+        if connection is None:
+            if self._supervisor is not None:
+                logger.warning("LISTEN connection is down, dropping a message on %s", self._channel)
+            return
+        async with self._lock:
+            await connection.execute("SELECT pg_notify($1, $2)", self._channel, payload)
+
+
+class Subscription:
+    def __init__(self, broker: "Broker", queue_size: int):
+        self._broker = broker
+        self._queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+    def offer(self, message: dict) -> bool:
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.dropped = True
+            return False
+        return True
+
+    async def get(self) -> dict | None:
+        """Next message, or ``None`` once the subscriber has been dropped."""
+        if self.dropped:
+            return None
+        return await self._queue.get()
+
+    def close(self) -> None:
+        self._broker.unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class Broker:
+    def __init__(self, backend: PubSubBackend, queue_size: int = 100):
+        self._backend = backend
+        self._queue_size = queue_size
+        self._subscriptions: set[Subscription] = set()
+        self._started = False
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    async def start(self) -> None:
+        await self._backend.start(self._deliver)
+        self._started = True
+
+    async def stop(self) -> None:
+        self._started = False
+        await self._backend.stop()
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self, self._queue_size)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscriptions.discard(subscription)
+
+    async def publish(self, message: dict) -> None:
+        payload = json.dumps(message, separators=(",", ":"))
+        if self._started:
+            await self._backend.publish(payload)
+        else:
+            self._deliver(payload)
+
+    def _deliver(self, payload: str) -> None:
+        message = json.loads(payload)
+        for subscription in list(self._subscriptions):
+            if not subscription.offer(message):
+                logger.warning("Dropping slow subscriber after %s queued messages", self._queue_size)
+                self.unsubscribe(subscription)
@@ -1,22 +1,30 @@
 import logging
 from datetime import datetime, timedelta, UTC
+from functools import cache
 from typing import Optional
 
-from jose import JWTError, jwt
-from passlib.context import CryptContext
-
 from src.core.config import settings
+from src.core.tokens import JWT_BACKENDS, InvalidToken, VerifiedTokenCache
+
+jwt_backend = JWT_BACKENDS[settings.JWT_BACKEND]()
+token_cache = VerifiedTokenCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@cache
+def pwd_context():
+    # passlib is only needed by register/login, not at startup
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def hash_password(password: str) -> str:
     logging.error(f"{password=}")
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -27,13 +35,20 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.now(UTC) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = jwt_backend.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 
 def decode_access_token(token: str) -> Optional[dict]:
+    key = token_cache.key(token)
+    payload = token_cache.get(key)
+    if payload is not None:
+        return dict(payload)
+
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
-    except JWTError:
+        payload = jwt_backend.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except InvalidToken:
         return None
+
+    token_cache.set(key, payload)
+    return dict(payload)
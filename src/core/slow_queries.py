@@ -0,0 +1,196 @@
+"""Slow query log with sampled EXPLAIN plans.
+
+Engine hooks time every statement at the cursor. Those over the threshold
+are kept in a bounded ring buffer, with the route that issued them, and
+logged as one JSON line each. Bound parameters carry emails and password
+hashes, so only their shape is kept unless ``SLOW_QUERY_LOG_PARAMETERS``
+is set. The buffer belongs to the worker process that ran the query. A sample of them
+is explained in a background task, on a connection of its own, so the
+request that ran the query never waits for the plan. Postgres gets
+``EXPLAIN (ANALYZE, BUFFERS)`` in a read-only transaction that is rolled
+back, which only ever runs plain SELECTs a second time; other statements
+get their estimated plan. SQLite gets ``EXPLAIN QUERY PLAN``. At most one
+EXPLAIN runs at a time, so a burst of slow queries can't double the load
+that caused it.
+"""
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import deque
+from collections.abc import Mapping
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+MAX_PARAMETER_LENGTH = 200
+SKIP_OPTION = "skip_slow_query_log"
+
+current_scope: ContextVar[Scope | None] = ContextVar("current_scope", default=None)
+
+
+@dataclass(slots=True)
+class SlowQuery:
+    recorded_at: datetime
+    duration_ms: float
+    statement: str
+    parameters: str
+    route: str | None
+    plan: str | None = None
+    plan_error: str | None = None
+
+
+def describe_route(scope: Scope | None) -> str | None:
+    if scope is None:
+        return None
+    # FastAPI puts the matched route in the scope once routing is done
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+
+
+def redact(parameters):
+    """Same shape, every value replaced by ``?``."""
+    if isinstance(parameters, Mapping):
+        return {key: "?" for key in parameters}
+    if isinstance(parameters, (list, tuple)):
+        return type(parameters)(
+            redact(value) if isinstance(value, (Mapping, list, tuple)) else "?" for value in parameters
+        )
+    return "?"
+
+
+def describe_parameters(parameters, log_values: bool = False) -> str:
+    text = repr(parameters if log_values else redact(parameters))
+    if len(text) > MAX_PARAMETER_LENGTH:
+        text = text[:MAX_PARAMETER_LENGTH] + "..."
+    return text
+
+
+def is_plain_select(statement: str) -> bool:
+    head = statement.lstrip().upper()
+    return head.startswith("SELECT") and "FOR UPDATE" not in head and "FOR SHARE" not in head
+
+
+class SlowQueryLog:
+    def __init__(
+            self,
+            threshold_ms: float,
+            size: int,
+            sample_rate: float,
+            explain_timeout_ms: int,
+            log_parameters: bool = False
+    ):
+        self.threshold_ms = threshold_ms
+        self.log_parameters = log_parameters
+        self.sample_rate = sample_rate
+        self.explain_timeout_ms = explain_timeout_ms
+        self.entries: deque[SlowQuery] = deque(maxlen=size)
+
+        self._engines: dict[Engine, AsyncEngine] = {}
+        self._explaining: asyncio.Task | None = None
+
+    def attach(self, engine: AsyncEngine) -> None:
+        self._engines[engine.sync_engine] = engine
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def detach(self, engine: AsyncEngine) -> None:
+        event.remove(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        self._engines.pop(engine.sync_engine, None)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_started = time.perf_counter()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_started", None)
+        if started is None or context.execution_options.get(SKIP_OPTION):
+            return
+
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+
+        entry = self.record(statement, parameters, duration_ms, describe_route(current_scope.get()))
+        if not executemany and random.random() < self.sample_rate:
+            self._schedule_explain(self._engines.get(conn.engine), entry, statement, parameters)
+
+    def record(self, statement: str, parameters, duration_ms: float, route: str | None) -> SlowQuery:
+        entry = SlowQuery(
+            recorded_at=datetime.now(timezone.utc),
+            duration_ms=round(duration_ms, 3),
+            statement=statement,
+            parameters=describe_parameters(parameters, self.log_parameters),
+            route=route
+        )
+        self.entries.append(entry)
+        logger.warning("slow query %s", json.dumps(asdict(entry), default=str))
+        return entry
+
+    def _schedule_explain(self, engine: AsyncEngine | None, entry: SlowQuery, statement: str, parameters) -> None:
+        if engine is None or (self._explaining is not None and not self._explaining.done()):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Synchronous use of the engine, e.g. from migrations
+            return
+        self._explaining = loop.create_task(self.explain(engine, entry, statement, parameters))
+
+    async def explain(self, engine: AsyncEngine, entry: SlowQuery, statement: str, parameters) -> None:
+        try:
+            async with engine.connect() as conn:
+                conn = await conn.execution_options(**{SKIP_OPTION: True})
+                if engine.dialect.name == "postgresql":
+                    await conn.exec_driver_sql("SET TRANSACTION READ ONLY")
+                    await conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(self.explain_timeout_ms)}")
+                    prefix = "EXPLAIN (ANALYZE, BUFFERS) " if is_plain_select(statement) else "EXPLAIN "
+                    result = await conn.exec_driver_sql(prefix + statement, parameters)
+                    entry.plan = "\n".join(row[0] for row in result)
+                else:
+                    result = await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)
+                    entry.plan = "\n".join(row[-1] for row in result)
+                # Leaving the block rolls back whatever the EXPLAIN ran
+        except Exception as exc:
+            entry.plan_error = f"{type(exc).__name__}: {exc}"
+            logger.warning("Could not explain slow query: %s", entry.plan_error)
+            return
+
+        logger.warning(
+            "slow query plan %s",
+            json.dumps({"statement": entry.statement, "route": entry.route, "plan": entry.plan})
+        )
+
+    async def drain(self) -> None:
+        if self._explaining is not None:
+            await asyncio.gather(self._explaining, return_exceptions=True)
+
+
+class QueryContextMiddleware:
+    """Makes the request visible to the engine hooks of the queries it runs."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = current_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_scope.reset(token)
@@ -0,0 +1,52 @@
+"""Embedded single-node mode on a SQLite file.
+
+Every connection switches the database to WAL, so readers carry on while a
+write transaction is open, and applies the tuning pragmas from settings.
+SQLite still has a single writer, and a deferred transaction that has read
+before another connection committed can't be upgraded to a write: it fails
+with "database is locked" however long ``busy_timeout`` is. Sessions that
+may write therefore take a process-wide FIFO lock before their first
+statement and keep it until they close, while read-only requests use plain
+sessions and run concurrently.
+"""
+import asyncio
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.core.config import settings
+
+
+def apply_pragmas(engine: AsyncEngine) -> None:
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        # NORMAL only syncs at checkpoints under WAL: a power cut may lose the
+        # last commits but never corrupts the file
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+        # Negative values are in KiB rather than pages
+        cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+class SerializedSession(AsyncSession):
+    """Session that holds ``writer_lock`` from ``async with`` entry until exit."""
+
+    def __init__(self, *args, writer_lock: asyncio.Lock, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._writer_lock = writer_lock
+
+    async def __aenter__(self):
+        await self._writer_lock.acquire()
+        return await super().__aenter__()
+
+    async def __aexit__(self, type_, value, traceback):
+        try:
+            await super().__aexit__(type_, value, traceback)
+        finally:
+            self._writer_lock.release()
@@ -0,0 +1,164 @@
+"""JWT backends and the verified-token cache used by ``core.security``.
+
+``NativeHMACBackend`` implements the HS256/384/512 subset of JWT the API
+issues with nothing but ``hmac``/``hashlib``/``json``; ``JoseBackend`` keeps
+python-jose as the reference implementation. Both accept each other's
+tokens.
+
+``VerifiedTokenCache`` remembers payloads of tokens that already passed
+verification, keyed by a digest of the token, until their ``exp`` or until
+they are the least recently used entry of a full cache. Failed tokens are
+never cached.
+"""
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Protocol
+
+
+class InvalidToken(Exception):
+    pass
+
+
+class JWTBackend(Protocol):
+    def encode(self, claims: dict, key: str, algorithm: str) -> str: ...
+
+    def decode(self, token: str, key: str, algorithms: list[str]) -> dict: ...
+
+
+class JoseBackend:
+    # python-jose pulls in cryptography; only import it when this backend is used
+    def encode(self, claims: dict, key: str, algorithm: str) -> str:
+        from jose import jwt
+
+        return jwt.encode(claims, key, algorithm=algorithm)
+
+    def decode(self, token: str, key: str, algorithms: list[str]) -> dict:
+        from jose import JWTError, jwt
+
+        try:
+            return jwt.decode(token, key, algorithms=algorithms)
+        except JWTError as exc:
+            raise InvalidToken(str(exc)) from exc
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b"=" * (-len(data) % 4))
+
+
+def _timestamp(value) -> int:
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return value
+
+
+class NativeHMACBackend:
+    HASHES = {
+        "HS256": hashlib.sha256,
+        "HS384": hashlib.sha384,
+        "HS512": hashlib.sha512
+    }
+
+    def encode(self, claims: dict, key: str, algorithm: str) -> str:
+        claims = {
+            name: _timestamp(value) if name in ("exp", "nbf", "iat") else value
+            for name, value in claims.items()
+        }
+        header = _b64encode(json.dumps({"alg": algorithm, "typ": "JWT"}, separators=(",", ":")).encode())
+        payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        signing_input = header + b"." + payload
+        signature = hmac.new(key.encode(), signing_input, self.HASHES[algorithm]).digest()
+        return (signing_input + b"." + _b64encode(signature)).decode()
+
+    def decode(self, token: str, key: str, algorithms: list[str]) -> dict:
+        try:
+            raw = token.encode("ascii")
+            signing_input, _, signature = raw.rpartition(b".")
+            header_segment, _, payload_segment = signing_input.partition(b".")
+            header = json.loads(_b64decode(header_segment))
+            algorithm = header.get("alg")
+            if algorithm not in algorithms or algorithm not in self.HASHES:
+                raise InvalidToken("The specified alg value is not allowed")
+
+            expected = hmac.new(key.encode(), signing_input, self.HASHES[algorithm]).digest()
+            if not hmac.compare_digest(expected, _b64decode(signature)):
+                raise InvalidToken("Signature verification failed")
+
+            claims = json.loads(_b64decode(payload_segment))
+        except (ValueError, UnicodeError, binascii.Error, AttributeError) as exc:
+            raise InvalidToken("Invalid token") from exc
+
+        if not isinstance(claims, dict):
+            raise InvalidToken("Invalid payload")
+        self._validate_claims(claims)
+        return claims
+
+    @staticmethod
+    def _validate_claims(claims: dict) -> None:
+        now = time.time()
+        for name in ("exp", "nbf", "iat"):
+            if name in claims and (isinstance(claims[name], bool) or not isinstance(claims[name], (int, float))):
+                raise InvalidToken(f"Invalid {name} claim")
+
+        if "exp" in claims and claims["exp"] < now:
+            raise InvalidToken("Signature has expired")
+        if "nbf" in claims and claims["nbf"] > now:
+            raise InvalidToken("The token is not yet valid")
+        # Like python-jose without an expected audience
+        if "aud" in claims:
+            raise InvalidToken("Invalid audience")
+
+
+JWT_BACKENDS = {
+    "jose": JoseBackend,
+    "native": NativeHMACBackend
+}
+
+
+class VerifiedTokenCache:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=20).digest()
+
+    def get(self, key: bytes) -> dict | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return payload
+
+    def set(self, key: bytes, payload: dict) -> None:
+        # Tokens without an expiry are never cached
+        expires_at = payload.get("exp")
+        if self.maxsize <= 0 or not isinstance(expires_at, (int, float)):
+            return
+
+        self._entries[key] = (expires_at, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -1,13 +1,130 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse
+
+from src.api import admin, auth, books, branches, holds, items, readers, borrowing, analytics, audit, outbox, batch
+from src.core.compression import CompressionMiddleware, CompressionPolicy
+from src.core.config import settings
+from src.core.database import create_schema, engine
+from src.core.idempotency import IdempotencyMiddleware, IdempotencyStore
+from src.core.leader import LeaderElection
+from src.core.openapi import use_precomputed_openapi
+from src.core.profiler import ProfilerMiddleware, profiler
+from src.core.slow_queries import QueryContextMiddleware
+from src.services.archive import borrowing_archiver
+from src.services.audit import audit_buffer
+from src.services.availability import availability_broker
+from src.services.book_totals import book_totals_folder
+from src.services.inventory import BarcodeConflict
+from src.services.outbox import outbox_relay
+from src.services.overdue import overdue_scheduler
+from src.services.partitions import partition_maintainer
+
+background_jobs = LeaderElection(
+    engine,
+    lock_id=settings.BACKGROUND_JOBS_LOCK_ID,
+    retry_interval=settings.BACKGROUND_JOBS_RETRY_SECONDS
+)
+
+
+def scheduled_jobs(dialect: str) -> list:
+    """Jobs that must run once per deployment, in the elected worker."""
+    # The stored book totals only change when this folds them in
+    jobs = [book_totals_folder.run]
+    if settings.OVERDUE_SCHEDULER_ENABLED:
+        jobs.append(overdue_scheduler.run)
+    if dialect == "postgresql":
+        # Creates the coming monthly partitions, which every borrow needs, even
+        # with archiving off; retires whole partitions only when it is on
+        jobs.append(partition_maintainer.run)
+    elif settings.ARCHIVE_ENABLED:
+        # Elsewhere old rows are moved in batches
+        jobs.append(borrowing_archiver.run)
+    if settings.RECOMMENDATIONS_ENABLED:
+        # numpy/scipy are only imported by workers that run the job
+        from src.services.recommendations import recommendation_job
+
+        jobs.append(recommendation_job.run)
+    if settings.OUTBOX_RELAY_ENABLED:
+        jobs.append(outbox_relay.run)
+    return jobs
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if engine.dialect.name == "sqlite":
+        await create_schema()
+    await availability_broker.start()
+
+    jobs = scheduled_jobs(engine.dialect.name)
+    tasks = []
+    if jobs:
+        tasks.append(asyncio.create_task(background_jobs.run(jobs)))
+    if settings.AUDIT_ENABLED:
+        # Every worker flushes the events it buffered itself
+        tasks.append(asyncio.create_task(audit_buffer.run()))
+
+    yield
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    # Requests have drained by now; write whatever is still buffered
+    await audit_buffer.stop()
+    await availability_broker.stop()
 
-from src.api import auth, books, readers, borrowing
 
 app = FastAPI(
     title="Library API",
-    description="API for library management"
+    description="API for library management",
+    lifespan=lifespan
 )
+use_precomputed_openapi(app, settings.OPENAPI_SCHEMA_PATH)
+
+
+@app.exception_handler(BarcodeConflict)
+async def barcode_conflict(request: Request, exc: BarcodeConflict) -> JSONResponse:
+    # Raised wherever copies are added: book create/update, branch inventory, returns
+    return JSONResponse(status_code=status.HTTP_409_CONFLICT, content={"detail": str(exc)})
+
+
+compression_policy = CompressionPolicy(
+    min_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    zstd_level=settings.COMPRESSION_ZSTD_LEVEL
+)
+
+if settings.SLOW_QUERY_LOG_ENABLED:
+    app.add_middleware(QueryContextMiddleware)
+if settings.IDEMPOTENCY_ENABLED:
+    app.add_middleware(
+        IdempotencyMiddleware,
+        store=IdempotencyStore(
+            ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+            max_entries=settings.IDEMPOTENCY_MAX_ENTRIES
+        ),
+        paths={"/books/", "/readers/", "/borrowing/borrow", "/borrowing/return"},
+        compression=compression_policy
+    )
+# Added after idempotency, so outside it: idempotent replays arrive already encoded and pass through
+app.add_middleware(CompressionMiddleware, policy=compression_policy)
+if settings.PROFILER_ENABLED:
+    # Outside everything else, so profiles include the middleware stack
+    app.add_middleware(ProfilerMiddleware, profiler=profiler)
 
 app.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 app.include_router(books.router, prefix="/books", tags=["Books"])
+app.include_router(holds.router, prefix="/books", tags=["Holds"])
+app.include_router(items.router, prefix="/books", tags=["Items"])
+app.include_router(branches.router, prefix="/branches", tags=["Branches"])
 app.include_router(readers.router, prefix="/readers", tags=["Readers"])
-app.include_router(borrowing.router, prefix="/borrowing", tags=["Borrowing"])
\ No newline at end of file
+app.include_router(borrowing.router, prefix="/borrowing", tags=["Borrowing"])
+app.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
+app.include_router(audit.router, prefix="/audit", tags=["Audit"])
+app.include_router(outbox.router, prefix="/outbox", tags=["Outbox"])
+app.include_router(batch.router, tags=["Batch"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
\ No newline at end of file
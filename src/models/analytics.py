@@ -0,0 +1,27 @@
+from datetime import date
+
+from sqlalchemy import BigInteger, Date, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.database import Base
+
+
+class DailyBookStats(Base):
+    __tablename__ = "daily_book_stats"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    book_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    checkouts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    returns: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    loan_seconds: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+
+class DailyReaderStats(Base):
+    __tablename__ = "daily_reader_stats"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    reader_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    checkouts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    returns: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
@@ -0,0 +1,28 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Integer, String, DateTime, JSON, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.database import Base
+
+
+class AuditEvent(Base):
+    """Append-only trail of mutations, written in batches by ``services.audit``."""
+    __tablename__ = "audit_log"
+
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    user_email: Mapped[str] = mapped_column(String, nullable=False)
+
+    action: Mapped[str] = mapped_column(String, nullable=False)
+    entity: Mapped[str] = mapped_column(String, nullable=False)
+    entity_id: Mapped[int] = mapped_column(Integer, nullable=True)
+    details: Mapped[dict] = mapped_column(JSON, nullable=True)
+
+    # Keyset pagination runs backwards over id within each filter
+    __table_args__ = (
+        Index("ix_audit_log_entity", "entity", "entity_id", "id"),
+        Index("ix_audit_log_user", "user_id", "id"),
+    )
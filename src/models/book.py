@@ -1,4 +1,6 @@
-from sqlalchemy import Integer, String, Text
+from datetime import datetime
+
+from sqlalchemy import Integer, String, Text, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 from src.core.database import Base
@@ -9,11 +11,39 @@ class Book(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
-    title: Mapped[str] = mapped_column(String, nullable=False)
+    title: Mapped[str] = mapped_column(String, nullable=False, index=True)
     description: Mapped[str] = mapped_column(Text, nullable=True, default="")
     author: Mapped[str] = mapped_column(String, nullable=False)
 
-    year: Mapped[int] = mapped_column(Integer, nullable=False)
-    isbn: Mapped[str] = mapped_column(String, unique=True, nullable=False, index=True)
+    year: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    isbn: Mapped[str] = mapped_column(String, nullable=False)
 
+    # Total over the branches, folded in by services.book_totals a moment
+    # after each change, so loans and returns never write the book row
     copies_available: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    deleted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_books_author_year", "author", "year"),
+        Index(
+            "ix_books_available",
+            "id",
+            postgresql_where=(copies_available > 0) & deleted_at.is_(None),
+            sqlite_where=(copies_available > 0) & deleted_at.is_(None)
+        ),
+        # A deleted book frees its ISBN for a new record
+        Index(
+            "ux_books_isbn_live",
+            "isbn",
+            unique=True,
+            postgresql_where=deleted_at.is_(None),
+            sqlite_where=deleted_at.is_(None)
+        ),
+        Index(
+            "ix_books_live",
+            "id",
+            postgresql_where=deleted_at.is_(None),
+            sqlite_where=deleted_at.is_(None)
+        ),
+    )
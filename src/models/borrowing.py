@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Integer, ForeignKey, DateTime
+from sqlalchemy import Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import mapped_column, Mapped, relationship
 from sqlalchemy.sql import func
 
@@ -8,14 +8,69 @@ from src.core.database import Base
 
 
 class BorrowedBook(Base):
+    """On Postgres the table is range-partitioned by month on ``borrow_date``.
+
+    Partitioning is owned by the migrations: the database primary key is
+    ``(id, borrow_date)`` while ids stay unique through their sequence.
+    """
     __tablename__ = "borrowed_books"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    book_id: Mapped[int] = mapped_column(Integer, ForeignKey("books.id", ondelete="CASCADE"), nullable=False)
-    reader_id: Mapped[int] = mapped_column(Integer, ForeignKey("readers.id", ondelete="CASCADE"), nullable=False)
+    book_id: Mapped[int] = mapped_column(Integer, ForeignKey("books.id"), nullable=False)
+    reader_id: Mapped[int] = mapped_column(Integer, ForeignKey("readers.id"), nullable=False)
+    branch_id: Mapped[int] = mapped_column(Integer, ForeignKey("branches.id"), server_default="1", nullable=False)
+    item_id: Mapped[int] = mapped_column(Integer, ForeignKey("items.id"), nullable=True)
 
     borrow_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    due_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     return_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    overdue_notified_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
 
     book: Mapped["Book"] = relationship("Book", lazy="selectin")
     reader: Mapped["Reader"] = relationship("Reader", lazy="selectin")
+
+    __table_args__ = (
+        Index(
+            "ix_borrowed_books_active_due_date",
+            "due_date",
+            postgresql_where=return_date.is_(None),
+            sqlite_where=return_date.is_(None)
+        ),
+        # Lower bound for partition pruning on active loans, see services.partitions
+        Index(
+            "ix_borrowed_books_active_borrow_date",
+            "borrow_date",
+            postgresql_where=return_date.is_(None),
+            sqlite_where=return_date.is_(None)
+        ),
+        # Check-in by barcode finds the open loan of an item
+        Index(
+            "ix_borrowed_books_active_item",
+            "item_id",
+            postgresql_where=return_date.is_(None),
+            sqlite_where=return_date.is_(None)
+        ),
+        Index(
+            "ix_borrowed_books_returned",
+            "return_date",
+            postgresql_where=return_date.is_not(None),
+            sqlite_where=return_date.is_not(None)
+        ),
+    )
+
+
+class ArchivedBorrowing(Base):
+    """Returned borrowings moved out of ``borrowed_books`` by the archiver."""
+    __tablename__ = "borrowed_books_archive"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    book_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    reader_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    branch_id: Mapped[int] = mapped_column(Integer, server_default="1", nullable=False)
+    item_id: Mapped[int] = mapped_column(Integer, nullable=True)
+
+    borrow_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    due_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    return_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    overdue_notified_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,54 @@
+from sqlalchemy import BigInteger, Integer, String, ForeignKey, CheckConstraint, Index, DDL, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.database import Base
+
+
+class Branch(Base):
+    __tablename__ = "branches"
+
+    # Created with the table; requests that don't name a branch use it
+    DEFAULT_ID = 1
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    code: Mapped[str] = mapped_column(String, nullable=False, unique=True)
+    name: Mapped[str] = mapped_column(String, nullable=False)
+
+
+class BranchInventory(Base):
+    """Free copies of a book at one branch.
+
+    Loans and returns only write this row, so concurrent borrows of the
+    same book at different branches never wait on each other.
+    ``Book.copies_available`` is the sum over the branches of a book, kept
+    up to date through :class:`BookStockChange`.
+    """
+    __tablename__ = "branch_inventory"
+
+    book_id: Mapped[int] = mapped_column(Integer, ForeignKey("books.id"), primary_key=True)
+    branch_id: Mapped[int] = mapped_column(Integer, ForeignKey("branches.id"), primary_key=True)
+    copies_available: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("copies_available >= 0", name="ck_branch_inventory_copies"),
+        Index("ix_branch_inventory_branch", "branch_id", "book_id"),
+    )
+
+
+class BookStockChange(Base):
+    """A book whose branch stock changed since its total was last folded.
+
+    Written next to every ``BranchInventory`` change. Inserts never wait on
+    each other, unlike updates of the book row.
+    """
+    __tablename__ = "book_stock_changes"
+
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    book_id: Mapped[int] = mapped_column(Integer, ForeignKey("books.id"), nullable=False)
+
+
+event.listen(
+    Branch.__table__,
+    "after_create",
+    DDL("INSERT INTO branches (code, name) VALUES ('main', 'Main branch')")
+)
@@ -0,0 +1,41 @@
+from datetime import datetime
+
+from sqlalchemy import Integer, String, ForeignKey, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from src.core.database import Base
+
+
+class Hold(Base):
+    __tablename__ = "holds"
+
+    WAITING = "waiting"
+    FULFILLED = "fulfilled"
+    CANCELLED = "cancelled"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    book_id: Mapped[int] = mapped_column(Integer, ForeignKey("books.id", ondelete="CASCADE"), nullable=False)
+    reader_id: Mapped[int] = mapped_column(Integer, ForeignKey("readers.id", ondelete="CASCADE"), nullable=False)
+
+    status: Mapped[str] = mapped_column(String, default=WAITING, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    fulfilled_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    borrowing_id: Mapped[int] = mapped_column(Integer, nullable=True)
+
+    __table_args__ = (
+        # FIFO queue per book: the position of a hold is a range count on this index
+        Index(
+            "ix_holds_waiting_queue",
+            "book_id", "id",
+            postgresql_where=status == WAITING,
+            sqlite_where=status == WAITING
+        ),
+        Index(
+            "ux_holds_waiting_reader",
+            "book_id", "reader_id",
+            unique=True,
+            postgresql_where=status == WAITING,
+            sqlite_where=status == WAITING
+        ),
+    )
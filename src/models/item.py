@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from sqlalchemy import Integer, String, ForeignKey, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from src.core.database import Base
+
+
+class Item(Base):
+    """One physical copy of a book.
+
+    Item status is the source of truth for what is on the shelf;
+    ``BranchInventory.copies_available`` is a counter maintained alongside
+    every status change by ``services.inventory``, and ``Book.copies_available``
+    its total, folded in by ``services.book_totals``.
+    """
+    __tablename__ = "items"
+
+    AVAILABLE = "available"
+    ON_LOAN = "on_loan"
+    WITHDRAWN = "withdrawn"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    book_id: Mapped[int] = mapped_column(Integer, ForeignKey("books.id"), nullable=False)
+    branch_id: Mapped[int] = mapped_column(Integer, ForeignKey("branches.id"), nullable=False)
+    copy_number: Mapped[int] = mapped_column(Integer, nullable=False)
+    barcode: Mapped[str] = mapped_column(String, nullable=False)
+
+    status: Mapped[str] = mapped_column(String, default=AVAILABLE, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ux_items_barcode", "barcode", unique=True),
+        Index("ux_items_copy", "book_id", "copy_number", unique=True),
+        # Lending without a scan takes the lowest free copy at the branch
+        Index(
+            "ix_items_available",
+            "book_id", "branch_id", "id",
+            postgresql_where=status == AVAILABLE,
+            sqlite_where=status == AVAILABLE
+        ),
+    )
+
+    @staticmethod
+    def default_barcode(book_id: int, copy_number: int) -> str:
+        return f"{book_id:07d}{copy_number:05d}"
@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Integer, String, DateTime, JSON, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.database import Base
+
+
+class OutboxEvent(Base):
+    """Domain events written in the transaction that caused them, relayed by ``services.outbox``."""
+    __tablename__ = "outbox"
+
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    event_type: Mapped[str] = mapped_column(String, nullable=False)
+    aggregate: Mapped[str] = mapped_column(String, nullable=False)
+    aggregate_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    delivered_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[str] = mapped_column(String, nullable=True)
+
+    __table_args__ = (
+        # The relay only ever scans undelivered events
+        Index(
+            "ix_outbox_pending",
+            "available_at", "id",
+            postgresql_where=delivered_at.is_(None),
+            sqlite_where=delivered_at.is_(None)
+        ),
+        # Retention deletes delivered events oldest first
+        Index(
+            "ix_outbox_delivered",
+            "delivered_at",
+            postgresql_where=delivered_at.is_not(None),
+            sqlite_where=delivered_at.is_not(None)
+        ),
+    )
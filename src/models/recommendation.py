@@ -0,0 +1,19 @@
+from sqlalchemy import Integer, SmallInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.database import Base
+
+
+class BookNeighbour(Base):
+    """Top-k "readers also borrowed" neighbours of a book, best first.
+
+    Rebuilt by ``services.recommendations``; the primary key makes serving a
+    single range scan over ``(book_id, rank)``.
+    """
+    __tablename__ = "book_neighbours"
+
+    book_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    rank: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+
+    neighbour_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    score: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,44 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class SlowQueryResponse(BaseModel):
+    recorded_at: datetime
+    duration_ms: float
+    statement: str
+    parameters: str
+    route: str | None
+    plan: str | None
+    plan_error: str | None
+
+
+class SlowQueryList(BaseModel):
+    threshold_ms: float
+    queries: list[SlowQueryResponse]
+
+
+class ProfilerStart(BaseModel):
+    requests: int = Field(10, gt=0, description="Number of requests to profile")
+    route: str | None = Field(None, description="Only profile requests to this route path, e.g. /books/{book_id}")
+    mode: Literal["sampling", "cprofile"] = "sampling"
+    interval_ms: float = Field(5.0, ge=1.0, le=100.0, description="Sampling interval")
+
+
+class ProfilerRecord(ProfilerStart):
+    wait_seconds: float = Field(60.0, gt=0, le=300.0, description="Stop waiting for requests after this long")
+    format: Literal["collapsed", "speedscope"] = "collapsed"
+
+
+class ProfilerStatus(BaseModel):
+    armed: bool
+    in_flight: int
+    mode: str | None
+    route: str | None
+    requests: int
+    profiled: int
+    started_at: datetime | None
+    seconds: float
+    await_seconds: float
+    categories: dict[str, float]
@@ -0,0 +1,28 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+
+class TopBook(BaseModel):
+    book_id: int
+    title: str | None
+    checkouts: int
+
+
+class TopReader(BaseModel):
+    reader_id: int
+    name: str | None
+    checkouts: int
+
+
+class LoanDuration(BaseModel):
+    since: date
+    returns: int
+    average_seconds: float | None
+    average_days: float | None
+
+
+class DailyCheckouts(BaseModel):
+    day: date
+    checkouts: int
+    returns: int
@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
+
+
+class AuditEventResponse(BaseModel):
+    id: int
+    occurred_at: datetime
+    user_id: int
+    user_email: str
+    action: str
+    entity: str
+    entity_id: int | None
+    details: dict | None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AuditEventList(BaseModel):
+    events: list[AuditEventResponse]
+    next_cursor: int | None
+
+
+class AuditMetricsResponse(BaseModel):
+    depth: int
+    recorded: int
+    flushed: int
+    dropped: int
+    failed_flushes: int
+    last_flush_at: datetime | None
+    last_flush_seconds: float | None
+
+    model_config = ConfigDict(from_attributes=True)
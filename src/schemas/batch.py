@@ -0,0 +1,37 @@
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field, field_validator
+
+from src.core.config import settings
+
+
+class BatchOperation(BaseModel):
+    id: str | None = Field(None, description="Client reference echoed back in the response")
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"]
+    path: str = Field(..., min_length=1, max_length=2048)
+    body: Any = None
+
+    @field_validator("path")
+    @classmethod
+    def validate_path(cls, value: str) -> str:
+        if not value.startswith("/"):
+            raise ValueError("path must start with '/'")
+        if value.split("?", 1)[0].rstrip("/") == "/batch":
+            raise ValueError("batch requests cannot be nested")
+        return value
+
+
+class BatchRequest(BaseModel):
+    operations: list[BatchOperation] = Field(..., min_length=1, max_length=settings.MAX_BATCH_OPERATIONS)
+    atomic: bool = Field(False, description="Run every operation in one transaction, all or nothing")
+
+
+class BatchItemResponse(BaseModel):
+    id: str | None
+    status: int
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    responses: list[BatchItemResponse]
+    committed: bool
@@ -1,5 +1,9 @@
+from typing import Literal
+
 from pydantic import BaseModel, ConfigDict, Field
 
+from src.schemas.partial import partial_model
+
 
 class BookBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=255)
@@ -32,3 +36,65 @@ class BookResponse(BookBase):
 class BookList(BaseModel):
     books: list[BookResponse]
     total: int
+    missing: list[int] = Field(default_factory=list)
+
+
+class RelatedBook(BookResponse):
+    score: int = Field(..., description="Readers who borrowed both books")
+
+
+class RelatedBookList(BaseModel):
+    books: list[RelatedBook]
+    total: int
+
+
+class BranchAvailability(BaseModel):
+    branch_id: int
+    code: str
+    name: str
+    copies_available: int
+
+
+class BookAvailability(BaseModel):
+    book_id: int
+    copies_available: int = Field(..., description="Total over all branches")
+    branches: list[BranchAvailability]
+
+
+BookPartial = partial_model(BookResponse)
+
+
+class BookPartialList(BaseModel):
+    books: list[BookPartial]
+    total: int
+    missing: list[int] = Field(default_factory=list)
+
+
+class BookFilter(BaseModel):
+    author: list[str] | None = Field(None, description="Exact author name, repeat for several")
+    year_from: int | None = Field(None, ge=1000, le=9999)
+    year_to: int | None = Field(None, ge=1000, le=9999)
+    available: bool | None = Field(None, description="Only books with (true) or without (false) free copies")
+    sort: Literal["id", "title", "-title", "year", "-year"] = "id"
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class DecadeCount(BaseModel):
+    decade: int
+    count: int
+
+
+class AvailabilityCount(BaseModel):
+    available: int
+    unavailable: int
+
+
+class BookFacets(BaseModel):
+    authors: list[FacetCount]
+    decades: list[DecadeCount]
+    availability: AvailabilityCount
+    total: int
@@ -2,6 +2,7 @@ from datetime import datetime
 from pydantic import BaseModel, ConfigDict, Field
 
 from src.schemas.book import BookResponse
+from src.schemas.partial import partial_model
 from src.schemas.reader import ReaderResponse
 
 
@@ -11,17 +12,31 @@ class BorrowingBase(BaseModel):
 
 
 class BorrowingCreate(BorrowingBase):
-    pass
+    branch_id: int | None = Field(None, gt=0, description="Lending branch, the default branch when omitted")
 
 
 class BorrowingReturn(BaseModel):
     book_id: int = Field(..., gt=0)
     reader_id: int = Field(..., gt=0)
+    branch_id: int | None = Field(None, gt=0, description="Receiving branch, the lending branch when omitted")
+
+
+class ItemCheckout(BaseModel):
+    barcode: str = Field(..., min_length=1, max_length=64)
+    reader_id: int = Field(..., gt=0)
+
+
+class ItemCheckin(BaseModel):
+    barcode: str = Field(..., min_length=1, max_length=64)
+    branch_id: int | None = Field(None, gt=0, description="Receiving branch, the lending branch when omitted")
 
 
 class BorrowingResponse(BorrowingBase):
     id: int
+    branch_id: int
+    item_id: int | None
     borrow_date: datetime
+    due_date: datetime
     return_date: datetime | None
 
     model_config = ConfigDict(from_attributes=True)
@@ -32,6 +47,7 @@ class BorrowingDetailResponse(BaseModel):
     book: BookResponse
     reader: ReaderResponse
     borrow_date: datetime
+    due_date: datetime
     return_date: datetime | None
 
     model_config = ConfigDict(from_attributes=True)
@@ -45,5 +61,14 @@ class BorrowingList(BaseModel):
 class ActiveBorrowingResponse(BaseModel):
     book: BookResponse
     borrow_date: datetime
+    due_date: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+
+BorrowingDetailPartial = partial_model(BorrowingDetailResponse)
+
+
+class BorrowingPartialList(BaseModel):
+    borrowings: list[BorrowingDetailPartial]
+    total: int
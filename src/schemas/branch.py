@@ -0,0 +1,28 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class BranchCreate(BaseModel):
+    code: str = Field(..., min_length=1, max_length=32)
+    name: str = Field(..., min_length=1, max_length=255)
+
+
+class BranchResponse(BranchCreate):
+    id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BranchList(BaseModel):
+    branches: list[BranchResponse]
+    total: int
+
+
+class InventoryUpdate(BaseModel):
+    copies_available: int = Field(..., ge=0)
+
+
+class InventoryResponse(BaseModel):
+    branch_id: int
+    book_id: int
+    copies_available: int
+    book_copies_available: int = Field(..., description="Total over all branches")
@@ -0,0 +1,24 @@
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class HoldCreate(BaseModel):
+    reader_id: int = Field(..., gt=0)
+
+
+class HoldResponse(BaseModel):
+    id: int
+    book_id: int
+    reader_id: int
+    status: str
+    created_at: datetime
+    fulfilled_at: datetime | None
+    borrowing_id: int | None
+    position: int | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class HoldList(BaseModel):
+    holds: list[HoldResponse]
+    total: int
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class ItemCreate(BaseModel):
+    barcodes: list[str] = Field(..., min_length=1, max_length=500)
+    branch_id: int | None = Field(None, gt=0, description="Shelving branch, the default branch when omitted")
+
+
+class ItemResponse(BaseModel):
+    id: int
+    book_id: int
+    branch_id: int
+    copy_number: int
+    barcode: str
+    status: str
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ItemList(BaseModel):
+    items: list[ItemResponse]
+    total: int
@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class OutboxMetricsResponse(BaseModel):
+    pending: int
+    oldest_pending_at: datetime | None
+    delivered: int
+    failed_batches: int
+    last_batch_size: int
+    last_batch_seconds: float | None
+    events_per_second: float
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, ConfigDict, create_model
+
+
+def partial_model(model: type[BaseModel], name: str | None = None) -> type[BaseModel]:
+    """Copy of ``model`` where every field is optional.
+
+    Used for sparse fieldsets: build it from just the projected columns and
+    dump with ``exclude_unset=True`` to emit only the requested keys.
+    """
+    fields = {
+        field_name: (info.annotation | None, None)
+        for field_name, info in model.model_fields.items()
+    }
+    return create_model(
+        name or f"Partial{model.__name__}",
+        __config__=ConfigDict(from_attributes=True),
+        **fields
+    )
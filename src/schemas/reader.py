@@ -1,5 +1,9 @@
+from datetime import datetime
 from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
+from src.schemas.book import BookResponse
+from src.schemas.partial import partial_model
+
 
 class ReaderBase(BaseModel):
     """Base schema for Reader with common fields"""
@@ -25,3 +29,46 @@ class ReaderResponse(ReaderBase):
 class ReaderList(BaseModel):
     readers: list[ReaderResponse]
     total: int
+    missing: list[int] = Field(default_factory=list)
+
+
+class ReaderMatch(ReaderResponse):
+    score: float
+
+
+class ReaderSearchList(BaseModel):
+    readers: list[ReaderMatch]
+    total: int
+
+
+class ReaderLoan(BaseModel):
+    id: int
+    book: BookResponse
+    borrow_date: datetime
+    due_date: datetime
+    overdue: bool
+
+
+class ReaderReturn(BaseModel):
+    id: int
+    book: BookResponse
+    borrow_date: datetime
+    due_date: datetime
+    return_date: datetime
+
+
+class ReaderSummary(BaseModel):
+    reader: ReaderResponse
+    active_loans: list[ReaderLoan]
+    overdue_count: int
+    past_loans_count: int
+    recent_returns: list[ReaderReturn]
+
+
+ReaderPartial = partial_model(ReaderResponse)
+
+
+class ReaderPartialList(BaseModel):
+    readers: list[ReaderPartial]
+    total: int
+    missing: list[int] = Field(default_factory=list)
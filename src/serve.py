@@ -0,0 +1,140 @@
+"""Production entry point: ``python -m src.serve``.
+
+Runs the app under uvicorn's multi-process supervisor with uvloop and
+httptools when they are installed (the ``server`` extra), one worker per
+available CPU unless ``SERVER_WORKERS`` says otherwise. Each worker's
+connection pool is cut down so that all of them together stay within
+``DB_MAX_CONNECTIONS``, and workers are recycled after roughly
+``SERVER_MAX_REQUESTS`` requests, finishing their in-flight requests
+while the supervisor starts a replacement. Embedded SQLite deployments
+always run a single worker.
+
+Idempotency keys and reader summary invalidations only live in the
+process that handled the request, so several workers need both turned
+off. Until they are, the default is a single worker, and an explicit
+``SERVER_WORKERS`` above one is refused. Background jobs run in one elected
+worker, see :mod:`src.core.leader`.
+"""
+import importlib.util
+import inspect
+import logging
+import math
+import os
+from pathlib import Path
+
+import uvicorn
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CGROUP_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on, capped by a cgroup v2 quota when there is one."""
+    if hasattr(os, "sched_getaffinity"):
+        count = len(os.sched_getaffinity(0))
+    else:  # pragma: no cover - macOS and Windows
+        count = os.cpu_count() or 1
+
+    try:
+        quota, period = CGROUP_CPU_MAX.read_text().split()
+        if quota != "max":
+            count = min(count, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return count
+
+
+def process_local_state() -> list[str]:
+    """Enabled features whose state a second worker would not see."""
+    features = []
+    if settings.IDEMPOTENCY_ENABLED:
+        features.append("IDEMPOTENCY_ENABLED, a retry reaching another worker would run again")
+    if settings.READER_SUMMARY_CACHE_TTL_SECONDS > 0:
+        features.append("READER_SUMMARY_CACHE_TTL_SECONDS, other workers would serve stale summaries")
+    return features
+
+
+def worker_count() -> int:
+    if settings.DATABASE_URL.startswith("sqlite"):
+        # The writer lock that keeps SQLite writes from colliding is per process
+        if settings.SERVER_WORKERS > 1:
+            logger.warning("Embedded SQLite mode runs a single worker, ignoring SERVER_WORKERS")
+        return 1
+
+    features = process_local_state()
+    if not features:
+        return settings.SERVER_WORKERS or available_cpus()
+    if settings.SERVER_WORKERS > 1:
+        raise SystemExit(
+            f"SERVER_WORKERS={settings.SERVER_WORKERS} needs these turned off: " + "; ".join(features)
+        )
+    if not settings.SERVER_WORKERS and available_cpus() > 1:
+        logger.warning("Running a single worker because of %s", "; ".join(features))
+    return 1
+
+
+def pool_limits(workers: int) -> tuple[int, int]:
+    """``pool_size`` and ``max_overflow`` per worker within the shared connection budget."""
+    per_worker = (settings.DB_MAX_CONNECTIONS - settings.DB_RESERVED_CONNECTIONS) // workers
+    if settings.AVAILABILITY_BACKEND == "postgres":
+        # The LISTEN connection is opened outside the pool
+        per_worker -= 1
+    if per_worker < 1:
+        raise SystemExit(
+            f"{workers} workers don't fit in DB_MAX_CONNECTIONS={settings.DB_MAX_CONNECTIONS}; "
+            "lower SERVER_WORKERS or raise the connection budget"
+        )
+
+    pool_size = min(settings.DB_POOL_SIZE, per_worker)
+    return pool_size, min(settings.DB_MAX_OVERFLOW, per_worker - pool_size)
+
+
+def pick_implementation(setting: str, module: str, fast: str, fallback: str) -> str:
+    if setting != "auto":
+        return setting
+    return fast if importlib.util.find_spec(module) is not None else fallback
+
+
+def server_options(workers: int) -> dict:
+    options = {
+        "host": settings.SERVER_HOST,
+        "port": settings.SERVER_PORT,
+        "workers": workers,
+        "loop": pick_implementation(settings.SERVER_LOOP, "uvloop", "uvloop", "asyncio"),
+        "http": pick_implementation(settings.SERVER_HTTP, "httptools", "httptools", "h11"),
+        "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+    }
+
+    # A single worker runs without the supervisor, so nothing would replace it
+    if workers > 1 and settings.SERVER_MAX_REQUESTS:
+        options["limit_max_requests"] = settings.SERVER_MAX_REQUESTS
+        # Spreads restarts out so workers started together don't all recycle at once
+        if "limit_max_requests_jitter" in inspect.signature(uvicorn.Config).parameters:
+            options["limit_max_requests_jitter"] = settings.SERVER_MAX_REQUESTS_JITTER
+    return options
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+
+    workers = worker_count()
+    pool_size, max_overflow = pool_limits(workers)
+    # Workers are fresh interpreters that read their settings from the environment
+    os.environ["DB_POOL_SIZE"] = str(pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(max_overflow)
+
+    options = server_options(workers)
+    if workers > 1 and settings.AVAILABILITY_BACKEND == "memory":
+        logger.warning("AVAILABILITY_BACKEND=memory only reaches subscribers on the same worker")
+    logger.info(
+        "Starting %d workers (loop=%s, http=%s, pool %d+%d connections each)",
+        workers, options["loop"], options["http"], pool_size, max_overflow
+    )
+    uvicorn.run("src.main:app", **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Incrementally maintained circulation rollups.
+
+Each borrow/return bumps one row per day in ``daily_book_stats`` and
+``daily_reader_stats`` inside the caller's transaction, so the analytics
+endpoints only ever read O(days) rows instead of the whole loan history.
+"""
+from datetime import date, datetime, timezone
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.database import as_utc
+from src.models.analytics import DailyBookStats, DailyReaderStats
+
+
+async def _increment(db: AsyncSession, model, keys: dict, counters: dict) -> None:
+    dialect = db.bind.dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+
+    stmt = insert(model).values(**keys, **counters)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={
+            name: getattr(model, name) + getattr(stmt.excluded, name)
+            for name in counters
+        }
+    )
+    await db.execute(stmt)
+
+
+async def record_checkout(
+        db: AsyncSession,
+        book_id: int,
+        reader_id: int,
+        borrowed_at: datetime
+) -> None:
+    day = as_utc(borrowed_at).date()
+    await _increment(
+        db, DailyBookStats,
+        {"day": day, "book_id": book_id},
+        {"checkouts": 1, "returns": 0, "loan_seconds": 0}
+    )
+    await _increment(
+        db, DailyReaderStats,
+        {"day": day, "reader_id": reader_id},
+        {"checkouts": 1, "returns": 0}
+    )
+
+
+async def record_return(
+        db: AsyncSession,
+        book_id: int,
+        reader_id: int,
+        borrowed_at: datetime,
+        returned_at: datetime
+) -> None:
+    returned_at = as_utc(returned_at)
+    loan_seconds = max(int((returned_at - as_utc(borrowed_at)).total_seconds()), 0)
+    day = returned_at.date()
+    await _increment(
+        db, DailyBookStats,
+        {"day": day, "book_id": book_id},
+        {"checkouts": 0, "returns": 1, "loan_seconds": loan_seconds}
+    )
+    await _increment(
+        db, DailyReaderStats,
+        {"day": day, "reader_id": reader_id},
+        {"checkouts": 0, "returns": 1}
+    )
+
+
+def period_start(days: int, today: date | None = None) -> date:
+    today = today or datetime.now(timezone.utc).date()
+    return date.fromordinal(today.toordinal() - days + 1)
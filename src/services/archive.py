@@ -0,0 +1,108 @@
+"""Moves old returned borrowings to ``borrowed_books_archive``.
+
+Only loans returned more than ``ARCHIVE_AFTER_DAYS`` ago are moved, oldest
+first, in batches of ``ARCHIVE_BATCH_SIZE``. Every batch is copied and
+deleted in its own short transaction, so the hot table is never locked for
+long and an interrupted run simply resumes on the next pass.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, insert, delete, and_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import async_session
+from src.models.borrowing import BorrowedBook, ArchivedBorrowing
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_COLUMNS = (
+    "id",
+    "book_id",
+    "reader_id",
+    "branch_id",
+    "item_id",
+    "borrow_date",
+    "due_date",
+    "return_date",
+    "overdue_notified_at"
+)
+
+
+class BorrowingArchiver:
+    def __init__(
+            self,
+            session_factory: async_sessionmaker[AsyncSession],
+            retention: timedelta = timedelta(days=settings.ARCHIVE_AFTER_DAYS),
+            batch_size: int = settings.ARCHIVE_BATCH_SIZE,
+            interval: float = settings.ARCHIVE_INTERVAL_SECONDS
+    ):
+        self._session_factory = session_factory
+        self._retention = retention
+        self._batch_size = batch_size
+        self._interval = interval
+
+    async def _archive_batch(self, db: AsyncSession, cutoff: datetime) -> int:
+        # Walks ix_borrowed_books_returned; the ids are locked until commit
+        result = await db.execute(
+            select(BorrowedBook.id)
+            .where(
+                and_(
+                    BorrowedBook.return_date.is_not(None),
+                    BorrowedBook.return_date < cutoff
+                )
+            )
+            .order_by(BorrowedBook.return_date)
+            .limit(self._batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        ids = list(result.scalars())
+        if not ids:
+            return 0
+
+        await db.execute(
+            insert(ArchivedBorrowing).from_select(
+                ARCHIVED_COLUMNS,
+                select(*(getattr(BorrowedBook, column) for column in ARCHIVED_COLUMNS))
+                .where(BorrowedBook.id.in_(ids))
+            )
+        )
+        await db.execute(
+            delete(BorrowedBook)
+            .where(BorrowedBook.id.in_(ids))
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return len(ids)
+
+    async def run_once(self, now: datetime | None = None) -> int:
+        """Archive everything that is due; returns the number of moved rows."""
+        cutoff = (now or datetime.now(timezone.utc)) - self._retention
+        archived = 0
+
+        while True:
+            # A session per batch: in embedded mode it holds the writer lock
+            async with self._session_factory() as db:
+                moved = await self._archive_batch(db, cutoff)
+            archived += moved
+            if moved < self._batch_size:
+                break
+
+        if archived:
+            logger.info("Archived %s returned borrowings", archived)
+        return archived
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Borrowing archival failed")
+            await asyncio.sleep(self._interval)
+
+
+borrowing_archiver = BorrowingArchiver(async_session)
@@ -0,0 +1,169 @@
+"""Buffered, append-only audit trail.
+
+Handlers stage events on a request-scoped :class:`AuditTrail`; they are
+handed to the process-wide :class:`AuditBuffer` only once the handler has
+returned successfully, and for sub-requests of an atomic POST /batch only
+once the whole batch has committed. The buffer writes them with multi-row INSERTs when
+``AUDIT_BATCH_SIZE`` events are waiting or every
+``AUDIT_FLUSH_INTERVAL_SECONDS``, and is flushed one last time on shutdown.
+
+If the database is unavailable events are kept and retried; beyond
+``AUDIT_MAX_PENDING`` the oldest ones are dropped and counted.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from fastapi import Depends, Request
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import after_commit, async_session
+from src.core.dependencies import get_current_user
+from src.models.audit import AuditEvent
+from src.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT statement; keeps bind parameters under every driver's limit
+ROWS_PER_STATEMENT = 1000
+
+
+@dataclass
+class AuditMetrics:
+    depth: int
+    recorded: int
+    flushed: int
+    dropped: int
+    failed_flushes: int
+    last_flush_at: datetime | None
+    last_flush_seconds: float | None
+
+
+class AuditBuffer:
+    def __init__(
+            self,
+            session_factory: async_sessionmaker[AsyncSession],
+            batch_size: int = settings.AUDIT_BATCH_SIZE,
+            flush_interval: float = settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+            max_pending: int = settings.AUDIT_MAX_PENDING
+    ):
+        self.session_factory = session_factory
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_pending = max_pending
+
+        self._events: list[dict] = []
+        self._lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+
+        self._recorded = 0
+        self._flushed = 0
+        self._dropped = 0
+        self._failed_flushes = 0
+        self._last_flush_at: datetime | None = None
+        self._last_flush_seconds: float | None = None
+
+    @property
+    def depth(self) -> int:
+        return len(self._events)
+
+    def metrics(self) -> AuditMetrics:
+        return AuditMetrics(
+            depth=self.depth,
+            recorded=self._recorded,
+            flushed=self._flushed,
+            dropped=self._dropped,
+            failed_flushes=self._failed_flushes,
+            last_flush_at=self._last_flush_at,
+            last_flush_seconds=self._last_flush_seconds
+        )
+
+    def extend(self, events: list[dict]) -> None:
+        if not events:
+            return
+
+        self._events.extend(events)
+        self._recorded += len(events)
+        self._trim()
+
+        if len(self._events) >= self._batch_size and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.get_running_loop().create_task(self.flush())
+
+    def _trim(self) -> None:
+        overflow = len(self._events) - self._max_pending
+        if overflow > 0:
+            del self._events[:overflow]
+            self._dropped += overflow
+            logger.error("Audit buffer full, dropped %s oldest events", overflow)
+
+    async def flush(self) -> int:
+        async with self._lock:
+            events, self._events = self._events, []
+            if not events:
+                return 0
+
+            started = time.perf_counter()
+            try:
+                async with self.session_factory() as db:
+                    for start in range(0, len(events), ROWS_PER_STATEMENT):
+                        await db.execute(insert(AuditEvent).values(events[start:start + ROWS_PER_STATEMENT]))
+                    await db.commit()
+            except Exception:
+                # Keep the events, ahead of anything recorded meanwhile
+                self._events[:0] = events
+                self._trim()
+                self._failed_flushes += 1
+                logger.exception("Failed to flush %s audit events", len(events))
+                return 0
+
+            self._flushed += len(events)
+            self._last_flush_at = datetime.now(timezone.utc)
+            self._last_flush_seconds = time.perf_counter() - started
+            return len(events)
+
+    def clear(self) -> None:
+        self._events.clear()
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
+
+    async def stop(self) -> None:
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+        await self.flush()
+
+
+audit_buffer = AuditBuffer(async_session)
+
+
+class AuditTrail:
+    """Events of one request, attributed to the authenticated user."""
+
+    def __init__(self, user: User):
+        self.user = user
+        self.events: list[dict] = []
+
+    def record(self, action: str, entity: str, entity_id: int | None = None, **details) -> None:
+        self.events.append({
+            "occurred_at": datetime.now(timezone.utc),
+            "user_id": self.user.id,
+            "user_email": self.user.email,
+            "action": action,
+            "entity": entity,
+            "entity_id": entity_id,
+            "details": details or None
+        })
+
+
+async def audit_trail(request: Request, current_user: User = Depends(get_current_user)):
+    trail = AuditTrail(current_user)
+    # Not reached when the handler raises, so failed requests leave no trace
+    yield trail
+    if settings.AUDIT_ENABLED:
+        await after_commit(request, audit_buffer.extend, trail.events)
@@ -0,0 +1,39 @@
+import logging
+
+from src.core.config import settings
+from src.core.pubsub import Broker, InMemoryBackend, PostgresNotifyBackend
+
+logger = logging.getLogger(__name__)
+
+
+def _make_backend():
+    if settings.AVAILABILITY_BACKEND == "postgres":
+        dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+        return PostgresNotifyBackend(
+            dsn,
+            "book_availability",
+            health_interval=settings.AVAILABILITY_LISTEN_HEALTH_SECONDS,
+            base_backoff=settings.AVAILABILITY_RECONNECT_BASE_SECONDS,
+            max_backoff=settings.AVAILABILITY_RECONNECT_MAX_SECONDS
+        )
+    return InMemoryBackend()
+
+
+availability_broker = Broker(_make_backend(), queue_size=settings.AVAILABILITY_QUEUE_SIZE)
+
+
+async def publish_availability(book_id: int, copies_available: int, delta: int) -> None:
+    """Announce a committed change of ``copies_available``.
+
+    Called after commit; a failed notification must never fail the request.
+    """
+    if delta == 0:
+        return
+    try:
+        await availability_broker.publish({
+            "book_id": book_id,
+            "copies_available": copies_available,
+            "delta": delta
+        })
+    except Exception:
+        logger.exception("Failed to publish availability change for book %s", book_id)
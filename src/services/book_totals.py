@@ -0,0 +1,92 @@
+"""Folds branch stock changes into the stored ``Book.copies_available``.
+
+Loans and returns only write their branch row and insert a
+:class:`BookStockChange`, so they never queue on the book row. Every
+``BOOK_TOTALS_INTERVAL_SECONDS`` :class:`BookTotalsFolder` claims a batch of
+changes, recomputes the total of each book they name from its branch rows
+in one UPDATE, and deletes the changes in the same short transaction. A
+hot book is written once per batch however many loans it had.
+
+Recomputing rather than adding deltas makes a fold idempotent: a change
+that commits while a batch is folded is simply picked up by the next one.
+The catalog, its availability filter on ``ix_books_available`` and the
+facets read the stored total and may lag a fold behind.
+"""
+import asyncio
+import logging
+
+from sqlalchemy import select, update, delete
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import async_session
+from src.models.book import Book
+from src.models.branch import BookStockChange
+from src.services.inventory import total_copies
+
+logger = logging.getLogger(__name__)
+
+
+async def fold_stock_changes(db: AsyncSession, batch_size: int = settings.BOOK_TOTALS_BATCH_SIZE) -> int:
+    """Fold one batch of changes and commit; returns the number of changes folded."""
+    result = await db.execute(
+        select(BookStockChange.id, BookStockChange.book_id)
+        .order_by(BookStockChange.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    changes = result.all()
+    if not changes:
+        return 0
+
+    # Sorted, so concurrent folds lock book rows in the same order
+    book_ids = sorted({book_id for _, book_id in changes})
+    await db.execute(
+        update(Book)
+        .where(Book.id.in_(book_ids))
+        .values(copies_available=total_copies(Book.id))
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        delete(BookStockChange)
+        .where(BookStockChange.id.in_([change_id for change_id, _ in changes]))
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return len(changes)
+
+
+class BookTotalsFolder:
+    def __init__(
+            self,
+            session_factory: async_sessionmaker[AsyncSession],
+            batch_size: int = settings.BOOK_TOTALS_BATCH_SIZE,
+            interval: float = settings.BOOK_TOTALS_INTERVAL_SECONDS
+    ):
+        self._session_factory = session_factory
+        self._batch_size = batch_size
+        self._interval = interval
+
+    async def run_once(self) -> int:
+        """Fold every pending change; returns the number folded."""
+        folded = 0
+        while True:
+            # A session per batch: in embedded mode it holds the writer lock
+            async with self._session_factory() as db:
+                count = await fold_stock_changes(db, self._batch_size)
+            folded += count
+            if count < self._batch_size:
+                return folded
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Folding book totals failed")
+            await asyncio.sleep(self._interval)
+
+
+book_totals_folder = BookTotalsFolder(async_session)
@@ -0,0 +1,121 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import select, func, and_, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.models.book import Book
+from src.models.borrowing import BorrowedBook
+from src.models.branch import Branch
+from src.models.hold import Hold
+from src.models.item import Item
+from src.services import analytics
+from src.services.inventory import take_copy
+from src.services.loans import resolve_loan_policy
+from src.services.outbox import add_event
+from src.services.partitions import active_loan_conditions
+
+
+async def open_loan(
+        db: AsyncSession,
+        book: Book,
+        reader_id: int,
+        branch_id: int = Branch.DEFAULT_ID,
+        item: Item | None = None
+) -> BorrowedBook | None:
+    """Lend a copy of ``book`` within the caller's transaction.
+
+    A scanned ``item`` is lent from wherever it is shelved, otherwise the
+    branch's lowest free copy. Returns ``None`` when that copy isn't free.
+    """
+    item = await take_copy(db, book, branch_id, item)
+    if item is None:
+        return None
+    branch_id = item.branch_id
+
+    borrowed_at = datetime.now(timezone.utc)
+    policy = resolve_loan_policy(book, borrowed_at)
+    borrowing = BorrowedBook(
+        book_id=book.id,
+        reader_id=reader_id,
+        branch_id=branch_id,
+        item_id=item.id,
+        borrow_date=borrowed_at,
+        due_date=policy.due_date(borrowed_at)
+    )
+
+    db.add(borrowing)
+    await db.flush()
+    await analytics.record_checkout(db, book.id, reader_id, borrowed_at)
+    add_event(
+        db, "book.borrowed", "borrowing", borrowing.id,
+        book_id=book.id,
+        reader_id=reader_id,
+        branch_id=branch_id,
+        barcode=item.barcode,
+        due_date=borrowing.due_date.isoformat()
+    )
+
+    return borrowing
+
+
+async def _can_borrow(db: AsyncSession, book_id: int, reader_id: int) -> bool:
+    result = await db.execute(
+        select(
+            func.count(BorrowedBook.id),
+            func.coalesce(func.sum(case((BorrowedBook.book_id == book_id, 1), else_=0)), 0)
+        )
+        .where(
+            and_(
+                BorrowedBook.reader_id == reader_id,
+                *await active_loan_conditions(db)
+            )
+        )
+    )
+    active_count, same_book = result.one()
+    return active_count < settings.MAX_ACTIVE_BORROWINGS and not same_book
+
+
+async def assign_holds(
+        db: AsyncSession,
+        book: Book,
+        branch_id: int = Branch.DEFAULT_ID,
+        scan_limit: int = 20
+) -> list[Hold]:
+    """Hand copies of ``book`` available at a branch to the head of its hold queue.
+
+    Readers that are at their loan limit (or already have the book) keep their
+    place and are skipped. Runs inside the caller's transaction, so a returned
+    copy goes straight to the next reader without ever becoming borrowable.
+    """
+    if book.copies_available <= 0:
+        return []
+
+    result = await db.execute(
+        select(Hold)
+        .where(
+            and_(
+                Hold.book_id == book.id,
+                Hold.status == Hold.WAITING
+            )
+        )
+        .order_by(Hold.id)
+        .limit(scan_limit)
+        .with_for_update(skip_locked=True)
+    )
+
+    fulfilled = []
+    for hold in result.scalars():
+        if not await _can_borrow(db, book.id, hold.reader_id):
+            continue
+
+        borrowing = await open_loan(db, book, hold.reader_id, branch_id)
+        if borrowing is None:
+            break
+
+        hold.status = Hold.FULFILLED
+        hold.fulfilled_at = borrowing.borrow_date
+        hold.borrowing_id = borrowing.id
+        fulfilled.append(hold)
+
+    return fulfilled
@@ -0,0 +1,238 @@
+"""Physical copies and the counters maintained from them.
+
+An :class:`Item` row per copy is the source of truth. Each status change
+is a conditional UPDATE of the item, followed in the same transaction by a
+relative update of ``BranchInventory.copies_available``. The counter is
+never read, modified and written back, so concurrent loans can't lose
+updates. A loan only locks its item and its branch row, so loans of one
+book at different branches don't queue on each other.
+
+The stored ``Book.copies_available`` total is not written here. Each change
+inserts a :class:`BookStockChange` instead, and ``services.book_totals``
+folds those into the book row in the background. Reads of the catalog lag
+by a moment; handlers that decide on the total, or report it, read the live
+sum with :func:`refresh_copies`. Nothing counts items per request.
+"""
+from sqlalchemy import select, update, func, and_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+
+from src.models.book import Book
+from src.models.branch import BranchInventory, BookStockChange
+from src.models.item import Item
+
+
+class BarcodeConflict(Exception):
+    """New copies would reuse barcodes of existing ones; answered with 409 by ``src.main``."""
+
+    def __init__(self, barcodes: list[str]):
+        super().__init__(f"Barcodes already in use: {', '.join(barcodes)}")
+        self.barcodes = barcodes
+
+
+async def _adjust_counters(db: AsyncSession, book: Book, branch_id: int, delta: int) -> None:
+    if delta < 0:
+        # Copies are only ever taken where they were counted, so the row exists
+        await db.execute(
+            update(BranchInventory)
+            .where(
+                and_(
+                    BranchInventory.book_id == book.id,
+                    BranchInventory.branch_id == branch_id
+                )
+            )
+            .values(copies_available=BranchInventory.copies_available + delta)
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+        stmt = insert(BranchInventory).values(book_id=book.id, branch_id=branch_id, copies_available=delta)
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["book_id", "branch_id"],
+                set_={"copies_available": BranchInventory.copies_available + stmt.excluded.copies_available}
+            )
+        )
+
+    db.add(BookStockChange(book_id=book.id))
+    await refresh_copies(db, book)
+
+
+def total_copies(book_id):
+    """Sum of the branch rows of a book; ``book_id`` may be a column to correlate with."""
+    return (
+        select(func.coalesce(func.sum(BranchInventory.copies_available), 0))
+        .where(BranchInventory.book_id == book_id)
+        .scalar_subquery()
+    )
+
+
+async def refresh_copies(db: AsyncSession, book: Book) -> int:
+    """Load the live total of ``book`` from its branch rows, ahead of the stored one."""
+    # A plain read, other branches' loans don't wait for this transaction
+    result = await db.execute(select(total_copies(book.id)))
+    copies = result.scalar_one()
+    # Keep the caller's instance in step without expiring its other attributes
+    set_committed_value(book, "copies_available", copies)
+    return copies
+
+
+async def add_copies(
+        db: AsyncSession,
+        book: Book,
+        branch_id: int,
+        count: int,
+        barcodes: list[str] | None = None
+) -> list[Item]:
+    """Register ``count`` new copies of ``book`` at a branch.
+
+    Copies without a pre-printed barcode get one derived from the book id
+    and copy number. A pre-printed barcode registered for another book can
+    already hold it, which raises :class:`BarcodeConflict`.
+    """
+    if count <= 0:
+        return []
+
+    # The book row lock serialises copy numbering
+    await db.execute(select(Book.id).where(Book.id == book.id).with_for_update())
+    result = await db.execute(
+        select(func.coalesce(func.max(Item.copy_number), 0)).where(Item.book_id == book.id)
+    )
+    last_copy = result.scalar_one()
+
+    items = []
+    for offset in range(count):
+        copy_number = last_copy + offset + 1
+        barcode = barcodes[offset] if barcodes else Item.default_barcode(book.id, copy_number)
+        items.append(Item(book_id=book.id, branch_id=branch_id, copy_number=copy_number, barcode=barcode))
+
+    # Anything else pending is flushed first, so only the items can conflict
+    await db.flush()
+    try:
+        async with db.begin_nested():
+            db.add_all(items)
+    except IntegrityError:
+        result = await db.execute(
+            select(Item.barcode).where(Item.barcode.in_([item.barcode for item in items]))
+        )
+        raise BarcodeConflict(sorted(result.scalars()))
+    await _adjust_counters(db, book, branch_id, count)
+    return items
+
+
+async def withdraw_copies(db: AsyncSession, book: Book, branch_id: int, count: int) -> bool:
+    """Withdraw ``count`` free copies at a branch, or nothing if there are fewer."""
+    result = await db.execute(
+        select(Item.id)
+        .where(
+            and_(
+                Item.book_id == book.id,
+                Item.branch_id == branch_id,
+                Item.status == Item.AVAILABLE
+            )
+        )
+        .order_by(Item.id.desc())
+        .limit(count)
+        .with_for_update(skip_locked=True)
+    )
+    item_ids = list(result.scalars())
+    if len(item_ids) < count:
+        return False
+
+    await db.execute(
+        update(Item)
+        .where(Item.id.in_(item_ids))
+        .values(status=Item.WITHDRAWN)
+        .execution_options(synchronize_session=False)
+    )
+    await _adjust_counters(db, book, branch_id, -count)
+    return True
+
+
+async def adjust_copies(db: AsyncSession, book: Book, branch_id: int, delta: int) -> bool:
+    """Add or withdraw copies at a branch; ``False`` if too few are free to withdraw."""
+    if delta > 0:
+        await add_copies(db, book, branch_id, delta)
+    elif delta < 0:
+        return await withdraw_copies(db, book, branch_id, -delta)
+    return True
+
+
+async def set_copies(db: AsyncSession, book: Book, branch_id: int, copies: int) -> int | None:
+    """Set the free copies of ``book`` at a branch; returns the change.
+
+    ``None`` means copies were lent out concurrently and nothing was changed.
+    """
+    delta = copies - await branch_copies(db, book.id, branch_id)
+    if not await adjust_copies(db, book, branch_id, delta):
+        return None
+    return delta
+
+
+async def take_copy(db: AsyncSession, book: Book, branch_id: int, item: Item | None = None) -> Item | None:
+    """Mark a free copy as lent: ``item`` when scanned, else the lowest free one at the branch."""
+    if item is None:
+        result = await db.execute(
+            select(Item)
+            .where(
+                and_(
+                    Item.book_id == book.id,
+                    Item.branch_id == branch_id,
+                    Item.status == Item.AVAILABLE
+                )
+            )
+            .order_by(Item.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        item = result.scalar_one_or_none()
+        if item is None:
+            return None
+
+    result = await db.execute(
+        update(Item)
+        .where(Item.id == item.id, Item.status == Item.AVAILABLE)
+        .values(status=Item.ON_LOAN)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        return None
+    set_committed_value(item, "status", Item.ON_LOAN)
+
+    await _adjust_counters(db, book, item.branch_id, -1)
+    return item
+
+
+async def return_copy(db: AsyncSession, book: Book, item_id: int | None, branch_id: int) -> bool:
+    """Shelve a returned copy at the receiving branch; ``False`` if it was not on loan."""
+    if item_id is None:
+        # Loans opened before copies were tracked bring their copy into the catalog
+        await add_copies(db, book, branch_id, 1)
+        return True
+
+    result = await db.execute(
+        update(Item)
+        .where(Item.id == item_id, Item.status == Item.ON_LOAN)
+        .values(status=Item.AVAILABLE, branch_id=branch_id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        return False
+
+    await _adjust_counters(db, book, branch_id, 1)
+    return True
+
+
+async def branch_copies(db: AsyncSession, book_id: int, branch_id: int) -> int:
+    result = await db.execute(
+        select(BranchInventory.copies_available)
+        .where(
+            and_(
+                BranchInventory.book_id == book_id,
+                BranchInventory.branch_id == branch_id
+            )
+        )
+    )
+    return result.scalar_one_or_none() or 0
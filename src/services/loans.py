@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from src.core.config import settings
+from src.models.book import Book
+
+
+@dataclass(frozen=True)
+class LoanPolicy:
+    name: str
+    loan_days: int
+
+    def due_date(self, borrowed_at: datetime) -> datetime:
+        return borrowed_at + timedelta(days=self.loan_days)
+
+
+def resolve_loan_policy(book: Book, borrowed_at: datetime) -> LoanPolicy:
+    """Pick the loan policy for a book at borrow time.
+
+    Recent publications get the shorter ``NEW_RELEASE_LOAN_DAYS`` period
+    when it is configured, everything else gets ``LOAN_PERIOD_DAYS``.
+    """
+    if (
+            settings.NEW_RELEASE_LOAN_DAYS is not None
+            and book.year >= borrowed_at.year - settings.NEW_RELEASE_YEARS
+    ):
+        return LoanPolicy("new_release", settings.NEW_RELEASE_LOAN_DAYS)
+
+    return LoanPolicy("default", settings.LOAN_PERIOD_DAYS)
@@ -0,0 +1,239 @@
+"""Transactional outbox for circulation events.
+
+Handlers call :func:`add_event` before committing, so an event exists if
+and only if its change was committed. :class:`OutboxRelay` claims due
+events with ``FOR UPDATE SKIP LOCKED`` (several relays never share a
+batch), hands them to a sink and marks them delivered in the same
+transaction. A crash between delivery and commit redelivers the batch, so
+delivery is at least once and consumers dedupe on the event ``id``. A
+failing sink backs the batch off exponentially up to ``OUTBOX_MAX_BACKOFF_SECONDS``.
+Delivered events are deleted in batches once they are older than
+``OUTBOX_RETENTION_HOURS``.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Protocol
+
+from sqlalchemy import select, delete, and_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import async_session
+from src.models.outbox import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+
+def add_event(db: AsyncSession, event_type: str, aggregate: str, aggregate_id: int, **payload) -> None:
+    """Stage an event in the caller's transaction."""
+    now = datetime.now(timezone.utc)
+    db.add(OutboxEvent(
+        event_type=event_type,
+        aggregate=aggregate,
+        aggregate_id=aggregate_id,
+        payload=payload,
+        created_at=now,
+        available_at=now
+    ))
+
+
+def serialize(event: OutboxEvent) -> dict:
+    return {
+        "id": event.id,
+        "type": event.event_type,
+        "aggregate": event.aggregate,
+        "aggregate_id": event.aggregate_id,
+        "occurred_at": event.created_at.isoformat(),
+        "payload": event.payload
+    }
+
+
+class OutboxSink(Protocol):
+    async def deliver(self, events: list[dict]) -> None: ...
+
+
+class MemorySink:
+    def __init__(self):
+        self.events: list[dict] = []
+
+    async def deliver(self, events: list[dict]) -> None:
+        self.events.extend(events)
+
+
+class FileSink:
+    """Appends events as JSON lines; a batch counts as delivered once fsynced."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _write(self, lines: str) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(lines)
+            file.flush()
+            os.fsync(file.fileno())
+
+    async def deliver(self, events: list[dict]) -> None:
+        lines = "".join(json.dumps(event, separators=(",", ":")) + "\n" for event in events)
+        await asyncio.to_thread(self._write, lines)
+
+
+def make_sink(name: str = settings.OUTBOX_SINK) -> OutboxSink:
+    if name == "file":
+        return FileSink(settings.OUTBOX_FILE_PATH)
+    if name == "memory":
+        return MemorySink()
+    # Falling back to a sink nobody reads would mark every event delivered
+    raise ValueError(f"Unknown outbox sink {name!r}")
+
+
+@dataclass
+class RelayMetrics:
+    delivered: int
+    failed_batches: int
+    last_batch_size: int
+    last_batch_seconds: float | None
+    events_per_second: float
+
+
+class OutboxRelay:
+    def __init__(
+            self,
+            session_factory: async_sessionmaker[AsyncSession],
+            sink: OutboxSink,
+            batch_size: int = settings.OUTBOX_BATCH_SIZE,
+            interval: float = settings.OUTBOX_POLL_INTERVAL_SECONDS,
+            base_backoff: float = settings.OUTBOX_BASE_BACKOFF_SECONDS,
+            max_backoff: float = settings.OUTBOX_MAX_BACKOFF_SECONDS,
+            retention: timedelta = timedelta(hours=settings.OUTBOX_RETENTION_HOURS),
+            purge_interval: float = settings.OUTBOX_PURGE_INTERVAL_SECONDS
+    ):
+        self._session_factory = session_factory
+        self.sink = sink
+        self._batch_size = batch_size
+        self._interval = interval
+        self._base_backoff = base_backoff
+        self._max_backoff = max_backoff
+        self._retention = retention
+        self._purge_interval = purge_interval
+        self._next_purge = 0.0
+
+        self._delivered = 0
+        self._failed_batches = 0
+        self._last_batch_size = 0
+        self._last_batch_seconds: float | None = None
+        self._busy_seconds = 0.0
+
+    def metrics(self) -> RelayMetrics:
+        return RelayMetrics(
+            delivered=self._delivered,
+            failed_batches=self._failed_batches,
+            last_batch_size=self._last_batch_size,
+            last_batch_seconds=self._last_batch_seconds,
+            events_per_second=self._delivered / self._busy_seconds if self._busy_seconds else 0.0
+        )
+
+    def backoff(self, attempts: int) -> timedelta:
+        return timedelta(seconds=min(self._base_backoff * 2 ** (attempts - 1), self._max_backoff))
+
+    async def relay_once(self, now: datetime | None = None) -> int:
+        """Deliver one batch of due events; returns how many were delivered."""
+        now = now or datetime.now(timezone.utc)
+        started = time.perf_counter()
+
+        async with self._session_factory() as db:
+            result = await db.execute(
+                select(OutboxEvent)
+                .where(
+                    and_(
+                        OutboxEvent.delivered_at.is_(None),
+                        OutboxEvent.available_at <= now
+                    )
+                )
+                .order_by(OutboxEvent.id)
+                .limit(self._batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            events = list(result.scalars())
+            if not events:
+                return 0
+
+            try:
+                await self.sink.deliver([serialize(event) for event in events])
+            except Exception as exc:
+                for event in events:
+                    event.attempts += 1
+                    event.available_at = now + self.backoff(event.attempts)
+                    event.last_error = repr(exc)[:500]
+                await db.commit()
+                self._failed_batches += 1
+                logger.warning("Outbox delivery of %s events failed: %r", len(events), exc)
+                return 0
+
+            for event in events:
+                event.delivered_at = now
+            await db.commit()
+
+        elapsed = time.perf_counter() - started
+        self._delivered += len(events)
+        self._last_batch_size = len(events)
+        self._last_batch_seconds = elapsed
+        self._busy_seconds += elapsed
+        return len(events)
+
+    async def purge(self, now: datetime | None = None) -> int:
+        """Delete delivered events past the retention; returns how many were deleted."""
+        cutoff = (now or datetime.now(timezone.utc)) - self._retention
+        purged = 0
+
+        # Walks ix_outbox_delivered, one short transaction per batch
+        ids = select(OutboxEvent.id).where(
+            and_(
+                OutboxEvent.delivered_at.is_not(None),
+                OutboxEvent.delivered_at < cutoff
+            )
+        ).order_by(OutboxEvent.delivered_at).limit(self._batch_size)
+        while True:
+            # A session per batch: in embedded mode it holds the writer lock
+            async with self._session_factory() as db:
+                result = await db.execute(
+                    delete(OutboxEvent)
+                    .where(OutboxEvent.id.in_(ids.scalar_subquery()))
+                    .execution_options(synchronize_session=False)
+                )
+                await db.commit()
+            purged += result.rowcount
+            if result.rowcount < self._batch_size:
+                break
+
+        if purged:
+            logger.info("Deleted %s delivered outbox events", purged)
+        return purged
+
+    async def run(self) -> None:
+        while True:
+            if time.monotonic() >= self._next_purge:
+                self._next_purge = time.monotonic() + self._purge_interval
+                try:
+                    await self.purge()
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception("Outbox purge failed")
+            try:
+                delivered = await self.relay_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Outbox relay failed")
+                delivered = 0
+            # A full batch means there is probably more waiting
+            if delivered < self._batch_size:
+                await asyncio.sleep(self._interval)
+
+
+outbox_relay = OutboxRelay(async_session, make_sink())
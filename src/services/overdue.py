@@ -0,0 +1,187 @@
+"""Background detection of newly overdue loans.
+
+Instead of rescanning every active borrowing, the scheduler walks the
+``ix_borrowed_books_active_due_date`` index forward in keyset batches,
+keeping only loans that fall due within a short horizon in a min-heap.
+Each tick pops the entries whose due date has passed, re-checks them in one
+query and emits an :class:`OverdueEvent` for every loan still out. When the
+tick fails before committing, the popped entries go back on the heap for
+the next one.
+"""
+import asyncio
+import heapq
+import inspect
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable
+
+from sqlalchemy import select, update, and_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import as_utc, async_session
+from src.models.borrowing import BorrowedBook
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OverdueEvent:
+    borrowing_id: int
+    book_id: int
+    reader_id: int
+    due_date: datetime
+
+
+OverdueListener = Callable[[OverdueEvent], None | Awaitable[None]]
+
+
+class OverdueScheduler:
+    def __init__(
+            self,
+            session_factory: async_sessionmaker[AsyncSession],
+            horizon: timedelta = timedelta(minutes=settings.OVERDUE_HORIZON_MINUTES),
+            batch_size: int = settings.OVERDUE_BATCH_SIZE,
+            interval: float = settings.OVERDUE_SCAN_INTERVAL_SECONDS
+    ):
+        self._session_factory = session_factory
+        self._horizon = horizon
+        self._batch_size = batch_size
+        self._interval = interval
+
+        self._heap: list[tuple[datetime, int]] = []
+        self._scheduled: set[int] = set()
+        self._loaded_until: datetime | None = None
+        self._listeners: list[OverdueListener] = []
+
+    def subscribe(self, listener: OverdueListener) -> None:
+        self._listeners.append(listener)
+
+    @property
+    def pending(self) -> int:
+        return len(self._heap)
+
+    async def _load_window(self, db: AsyncSession, until: datetime) -> None:
+        # Loans are only ever created with a due date far beyond the horizon,
+        # so everything at or before ``_loaded_until`` is already in the heap
+        conditions = [
+            BorrowedBook.return_date.is_(None),
+            BorrowedBook.overdue_notified_at.is_(None),
+            BorrowedBook.due_date <= until
+        ]
+        if self._loaded_until is not None:
+            conditions.append(BorrowedBook.due_date > self._loaded_until)
+
+        last_key = None
+        while True:
+            query = select(BorrowedBook.due_date, BorrowedBook.id).where(and_(*conditions))
+            if last_key is not None:
+                query = query.where(tuple_(BorrowedBook.due_date, BorrowedBook.id) > last_key)
+            result = await db.execute(
+                query.order_by(BorrowedBook.due_date, BorrowedBook.id).limit(self._batch_size)
+            )
+            rows = result.all()
+
+            for due_date, borrowing_id in rows:
+                if borrowing_id not in self._scheduled:
+                    self._scheduled.add(borrowing_id)
+                    heapq.heappush(self._heap, (as_utc(due_date), borrowing_id))
+
+            if len(rows) < self._batch_size:
+                break
+            last_key = tuple(rows[-1])
+
+        self._loaded_until = until
+
+    def _pop_due(self, now: datetime) -> list[tuple[datetime, int]]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+            self._scheduled.discard(entry[1])
+            due.append(entry)
+        return due
+
+    def _requeue(self, entries: list[tuple[datetime, int]]) -> None:
+        for entry in entries:
+            if entry[1] not in self._scheduled:
+                self._scheduled.add(entry[1])
+                heapq.heappush(self._heap, entry)
+
+    async def tick(self, now: datetime | None = None) -> list[OverdueEvent]:
+        now = now or datetime.now(timezone.utc)
+        events = []
+
+        async with self._session_factory() as db:
+            await self._load_window(db, now + self._horizon)
+
+            due = self._pop_due(now)
+            due_ids = [borrowing_id for _, borrowing_id in due]
+            try:
+                for start in range(0, len(due_ids), self._batch_size):
+                    batch = due_ids[start:start + self._batch_size]
+                    result = await db.execute(
+                        update(BorrowedBook)
+                        .where(
+                            and_(
+                                BorrowedBook.id.in_(batch),
+                                BorrowedBook.return_date.is_(None),
+                                BorrowedBook.overdue_notified_at.is_(None)
+                            )
+                        )
+                        .values(overdue_notified_at=now)
+                        .returning(
+                            BorrowedBook.id,
+                            BorrowedBook.book_id,
+                            BorrowedBook.reader_id,
+                            BorrowedBook.due_date
+                        )
+                        .execution_options(synchronize_session=False)
+                    )
+                    events.extend(
+                        OverdueEvent(borrowing_id, book_id, reader_id, as_utc(due_date))
+                        for borrowing_id, book_id, reader_id, due_date in result.all()
+                    )
+
+                await db.commit()
+            except BaseException:
+                # Nothing was stamped, the next tick retries these loans
+                self._requeue(due)
+                raise
+
+        for event in events:
+            await self._emit(event)
+
+        return events
+
+    async def _emit(self, event: OverdueEvent) -> None:
+        logger.info(
+            "Borrowing %s is overdue (book %s, reader %s, due %s)",
+            event.borrowing_id, event.book_id, event.reader_id, event.due_date.isoformat()
+        )
+        for listener in self._listeners:
+            try:
+                result = listener(event)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("Overdue listener failed for borrowing %s", event.borrowing_id)
+
+    def _next_wakeup(self) -> float:
+        if not self._heap:
+            return self._interval
+        delay = (self._heap[0][0] - datetime.now(timezone.utc)).total_seconds()
+        return min(max(delay, 0), self._interval)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Overdue scan failed")
+            await asyncio.sleep(self._next_wakeup())
+
+
+overdue_scheduler = OverdueScheduler(async_session)
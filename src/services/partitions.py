@@ -0,0 +1,222 @@
+"""Monthly range partitions of ``borrowed_books`` (Postgres only).
+
+The table is partitioned by ``borrow_date`` into ``borrowed_books_pYYYY_MM``
+children. :class:`PartitionMaintainer` keeps ``PARTITION_MONTHS_AHEAD``
+months of empty partitions ready, whether or not archiving is enabled:
+without a partition for the current month every borrow fails. With
+``ARCHIVE_ENABLED`` it also retires months older than
+``ARCHIVE_AFTER_DAYS``: the partition is detached, its rows are appended to
+``borrowed_books_archive`` and the detached table is dropped, so retention
+never runs a DELETE against the live table. A month that still has an
+active loan is kept until that loan is returned.
+
+Queries on active loans can't know the borrow dates they are after, so
+:func:`active_loan_conditions` adds a lower bound on ``borrow_date`` taken
+from the oldest active loan. That bound lets the planner prune every
+partition older than the oldest loan still out.
+"""
+import asyncio
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, func, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.core.database import as_utc, engine
+from src.models.borrowing import BorrowedBook
+
+logger = logging.getLogger(__name__)
+
+PARENT = "borrowed_books"
+PARTITION_NAME = re.compile(r"^borrowed_books_p(\d{4})_(\d{2})$")
+ARCHIVED_COLUMNS = "id, book_id, reader_id, branch_id, item_id, borrow_date, due_date, return_date, overdue_notified_at"
+
+# Covers loans that were opened but not yet committed when the bound was read
+ACTIVE_BOUND_MARGIN = timedelta(minutes=5)
+
+active_bound_cache = TTLCache(maxsize=1, ttl=settings.ACTIVE_LOAN_BOUND_TTL_SECONDS)
+
+
+def month_start(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return value.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(start: datetime) -> str:
+    return f"{PARENT}_p{start:%Y_%m}"
+
+
+async def active_loans_since(db: AsyncSession) -> datetime:
+    """Lower bound on ``borrow_date`` of every active loan.
+
+    Active loans only ever disappear and new ones start now, so a cached
+    bound stays valid until it expires; it merely prunes a little less.
+    """
+    bound = active_bound_cache.get(PARENT)
+    if bound is not None:
+        return bound
+
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        select(func.min(BorrowedBook.borrow_date)).where(BorrowedBook.return_date.is_(None))
+    )
+    oldest = result.scalar_one()
+    bound = min(as_utc(oldest), now) if oldest is not None else now
+    bound -= ACTIVE_BOUND_MARGIN
+
+    active_bound_cache.set(PARENT, bound)
+    return bound
+
+
+async def active_loan_conditions(db: AsyncSession) -> list:
+    return [
+        BorrowedBook.return_date.is_(None),
+        BorrowedBook.borrow_date >= await active_loans_since(db)
+    ]
+
+
+class PartitionMaintainer:
+    def __init__(
+            self,
+            engine: AsyncEngine,
+            months_ahead: int = settings.PARTITION_MONTHS_AHEAD,
+            retention: timedelta = timedelta(days=settings.ARCHIVE_AFTER_DAYS),
+            interval: float = settings.ARCHIVE_INTERVAL_SECONDS,
+            retire: bool = settings.ARCHIVE_ENABLED
+    ):
+        self._engine = engine
+        self._months_ahead = months_ahead
+        self._retention = retention
+        self._retire = retire
+        self._interval = interval
+
+    async def _partitions(self, conn) -> dict[datetime, tuple[str, bool]]:
+        result = await conn.execute(
+            text(
+                "SELECT c.relname, i.inhdetachpending FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :parent"
+            ),
+            {"parent": PARENT}
+        )
+        partitions = {}
+        for name, detach_pending in result.all():
+            match = PARTITION_NAME.match(name)
+            if match:
+                start = datetime(int(match[1]), int(match[2]), 1, tzinfo=timezone.utc)
+                partitions[start] = (name, detach_pending)
+        return partitions
+
+    async def is_partitioned(self) -> bool:
+        async with self._engine.connect() as conn:
+            result = await conn.execute(
+                text(
+                    "SELECT 1 FROM pg_partitioned_table t "
+                    "JOIN pg_class c ON c.oid = t.partrelid WHERE c.relname = :parent"
+                ),
+                {"parent": PARENT}
+            )
+            return result.first() is not None
+
+    async def create_future_partitions(self, now: datetime) -> list[str]:
+        created = []
+        async with self._engine.begin() as conn:
+            existing = await self._partitions(conn)
+            start = month_start(now)
+            for _ in range(self._months_ahead + 1):
+                end = add_months(start, 1)
+                if start not in existing:
+                    name = partition_name(start)
+                    await conn.execute(text(
+                        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT} "
+                        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                    ))
+                    created.append(name)
+                start = end
+
+        if created:
+            logger.info("Created borrowing partitions %s", ", ".join(created))
+        return created
+
+    async def _detached(self, conn) -> list[str]:
+        result = await conn.execute(
+            text(
+                "SELECT relname FROM pg_class "
+                "WHERE relkind = 'r' AND NOT relispartition AND relname LIKE :pattern"
+            ),
+            {"pattern": f"{PARENT}_p%"}
+        )
+        return sorted(name for (name,) in result.all() if PARTITION_NAME.match(name))
+
+    async def retire_expired_partitions(self, now: datetime) -> list[str]:
+        cutoff = now - self._retention
+
+        async with self._engine.connect() as conn:
+            partitions = await self._partitions(conn)
+
+        for start, (name, detach_pending) in sorted(partitions.items()):
+            if add_months(start, 1) > cutoff:
+                break
+
+            async with self._engine.connect() as conn:
+                autocommit = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                if detach_pending:
+                    # A concurrent detach that was interrupted has to be finalized
+                    await autocommit.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name} FINALIZE"))
+                    continue
+
+                result = await conn.execute(
+                    text(f"SELECT EXISTS (SELECT 1 FROM {name} WHERE return_date IS NULL)")
+                )
+                if result.scalar_one():
+                    logger.info("Keeping %s: it still has active loans", name)
+                    continue
+
+                # DETACH ... CONCURRENTLY can't run inside a transaction block
+                await autocommit.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name} CONCURRENTLY"))
+
+        # Also picks up partitions detached by an earlier, interrupted run
+        async with self._engine.connect() as conn:
+            detached = await self._detached(conn)
+
+        for name in detached:
+            async with self._engine.begin() as conn:
+                await conn.execute(text(
+                    f"INSERT INTO borrowed_books_archive ({ARCHIVED_COLUMNS}) "
+                    f"SELECT {ARCHIVED_COLUMNS} FROM {name} ON CONFLICT (id) DO NOTHING"
+                ))
+                await conn.execute(text(f"DROP TABLE {name}"))
+
+        if detached:
+            logger.info("Archived borrowing partitions %s", ", ".join(detached))
+        return detached
+
+    async def run_once(self, now: datetime | None = None) -> None:
+        now = now or datetime.now(timezone.utc)
+        if not await self.is_partitioned():
+            logger.warning("%s is not partitioned; skipping partition maintenance", PARENT)
+            return
+        await self.create_future_partitions(now)
+        if self._retire:
+            await self.retire_expired_partitions(now)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Borrowing partition maintenance failed")
+            await asyncio.sleep(self._interval)
+
+
+partition_maintainer = PartitionMaintainer(engine)
@@ -0,0 +1,262 @@
+"""Precomputed "readers also borrowed" neighbours.
+
+The job keeps a sparse reader x book incidence matrix ``R`` and the book x
+book co-occurrence matrix ``C = R.T @ R``; ``C[a, b]`` is the number of
+readers who borrowed both books. New borrowings are folded in as a delta
+``D`` of previously unseen (reader, book) pairs::
+
+    C' = C + D.T @ R + R.T @ D + D.T @ D
+
+and only the books whose rows changed get their top-k neighbours rewritten
+in ``book_neighbours``. Serving is then a single primary key range scan.
+A book's rows are replaced in one transaction, also during a full rebuild,
+so readers always see either its old or its new neighbours.
+
+Needs the optional ``numpy`` and ``scipy`` packages (``recommendations``
+extra). Run it in one worker with ``RECOMMENDATIONS_ENABLED`` or offline
+with ``python -m src.services.recommendations``.
+"""
+import argparse
+import asyncio
+import logging
+import os
+
+from sqlalchemy import select, insert, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.core.config import settings
+from src.core.database import async_session
+from src.models.borrowing import BorrowedBook, ArchivedBorrowing
+from src.models.recommendation import BookNeighbour
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # pragma: no cover - optional dependency
+    np = sparse = None
+
+logger = logging.getLogger(__name__)
+
+# Borrowings commit out of id order; re-reading a window behind the watermark
+# is harmless because pairs that are already known are skipped
+REREAD_WINDOW = 1000
+WRITE_BATCH_SIZE = 1000
+STREAM_BATCH_SIZE = 50_000
+
+
+class CoOccurrence:
+    def __init__(self, incidence=None, co_occurrence=None, watermark: int = 0):
+        self.incidence = incidence if incidence is not None else sparse.csr_array((0, 0), dtype=np.int32)
+        self.co_occurrence = co_occurrence if co_occurrence is not None else sparse.csr_array((0, 0), dtype=np.int32)
+        self.watermark = watermark
+
+    @classmethod
+    def load(cls, path: str) -> "CoOccurrence":
+        with np.load(path) as state:
+            incidence = sparse.csr_array(
+                (state["r_data"], state["r_indices"], state["r_indptr"]), shape=tuple(state["r_shape"])
+            )
+            co_occurrence = sparse.csr_array(
+                (state["c_data"], state["c_indices"], state["c_indptr"]), shape=tuple(state["c_shape"])
+            )
+            return cls(incidence, co_occurrence, int(state["watermark"]))
+
+    def save(self, path: str) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            np.savez(
+                file,
+                r_data=self.incidence.data,
+                r_indices=self.incidence.indices,
+                r_indptr=self.incidence.indptr,
+                r_shape=np.array(self.incidence.shape),
+                c_data=self.co_occurrence.data,
+                c_indices=self.co_occurrence.indices,
+                c_indptr=self.co_occurrence.indptr,
+                c_shape=np.array(self.co_occurrence.shape),
+                watermark=np.array(self.watermark)
+            )
+        os.replace(tmp_path, path)
+
+    def _grow(self, readers: int, books: int) -> None:
+        readers = max(readers, self.incidence.shape[0])
+        books = max(books, self.incidence.shape[1])
+        if (readers, books) != self.incidence.shape:
+            self.incidence.resize((readers, books))
+            self.co_occurrence.resize((books, books))
+
+    def add(self, reader_ids: "np.ndarray", book_ids: "np.ndarray") -> "np.ndarray":
+        """Fold (reader, book) pairs in; returns the books whose neighbours may have changed."""
+        if len(reader_ids) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        self._grow(int(reader_ids.max()) + 1, int(book_ids.max()) + 1)
+
+        pairs = np.unique(np.stack([reader_ids, book_ids], axis=1), axis=0)
+        readers, books = pairs[:, 0], pairs[:, 1]
+        unseen = np.asarray(self.incidence[readers, books]).ravel() == 0
+        readers, books = readers[unseen], books[unseen]
+        if len(readers) == 0:
+            return np.empty(0, dtype=np.int64)
+
+        delta_incidence = sparse.csr_array(
+            (np.ones(len(readers), dtype=np.int32), (readers, books)),
+            shape=self.incidence.shape
+        )
+        cross = delta_incidence.T @ self.incidence
+        delta = (cross + cross.T + delta_incidence.T @ delta_incidence).tocsr()
+
+        self.incidence = (self.incidence + delta_incidence).tocsr()
+        self.co_occurrence = (self.co_occurrence + delta).tocsr()
+
+        return np.unique(delta.tocoo().row)
+
+    def top_k(self, book_ids: "np.ndarray", k: int):
+        """Best ``k`` neighbours of every book in ``book_ids`` as flat
+        ``(book_id, rank, neighbour_id, score)`` arrays, ranked by score then id."""
+        book_ids = np.asarray(book_ids, dtype=np.int64)
+        rows = self.co_occurrence[book_ids]
+
+        position = np.repeat(np.arange(len(book_ids)), np.diff(rows.indptr))
+        neighbours = rows.indices.astype(np.int64)
+        scores = rows.data
+
+        keep = (neighbours != book_ids[position]) & (scores > 0)
+        position, neighbours, scores = position[keep], neighbours[keep], scores[keep]
+
+        order = np.lexsort((neighbours, -scores, position))
+        position, neighbours, scores = position[order], neighbours[order], scores[order]
+
+        rank = np.arange(len(position)) - np.searchsorted(position, position)
+        keep = rank < k
+        return book_ids[position[keep]], rank[keep], neighbours[keep], scores[keep]
+
+
+class RecommendationJob:
+    def __init__(
+            self,
+            session_factory: async_sessionmaker[AsyncSession],
+            top_k: int = settings.RECOMMENDATIONS_TOP_K,
+            interval: float = settings.RECOMMENDATIONS_INTERVAL_SECONDS,
+            state_path: str | None = settings.RECOMMENDATIONS_STATE_PATH
+    ):
+        self._session_factory = session_factory
+        self._top_k = top_k
+        self._interval = interval
+        self._state_path = state_path
+        self._matrix: CoOccurrence | None = None
+
+    @staticmethod
+    async def _read_pairs(db: AsyncSession, query) -> tuple["np.ndarray", "np.ndarray"]:
+        readers, books = [], []
+        result = await db.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+        async for rows in result.partitions():
+            chunk = np.array(rows, dtype=np.int64).reshape(-1, 2)
+            readers.append(chunk[:, 0])
+            books.append(chunk[:, 1])
+        if not readers:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(readers), np.concatenate(books)
+
+    async def _write(self, db: AsyncSession, book_ids: "np.ndarray") -> None:
+        for start in range(0, len(book_ids), WRITE_BATCH_SIZE):
+            batch = book_ids[start:start + WRITE_BATCH_SIZE]
+            books, ranks, neighbours, scores = await asyncio.to_thread(self._matrix.top_k, batch, self._top_k)
+
+            await db.execute(delete(BookNeighbour).where(BookNeighbour.book_id.in_(batch.tolist())))
+            if len(books):
+                await db.execute(
+                    insert(BookNeighbour),
+                    [
+                        {"book_id": book_id, "rank": rank, "neighbour_id": neighbour_id, "score": score}
+                        for book_id, rank, neighbour_id, score in zip(
+                            books.tolist(), ranks.tolist(), neighbours.tolist(), scores.tolist()
+                        )
+                    ]
+                )
+            await db.commit()
+
+    async def rebuild(self) -> int:
+        """Recompute everything from the full borrowing history, archive included."""
+        self._matrix = CoOccurrence()
+
+        async with self._session_factory() as db:
+            result = await db.execute(select(func.max(BorrowedBook.id)))
+            watermark = result.scalar_one() or 0
+
+            live = select(BorrowedBook.reader_id, BorrowedBook.book_id).where(BorrowedBook.id <= watermark)
+            archived = select(ArchivedBorrowing.reader_id, ArchivedBorrowing.book_id)
+            readers, books = await self._read_pairs(db, live.union(archived))
+
+            changed = await asyncio.to_thread(self._matrix.add, readers, books)
+            self._matrix.watermark = watermark
+
+            await self._write(db, changed)
+
+            # Books no longer borrowed alongside anything lose their rows last
+            result = await db.execute(select(BookNeighbour.book_id).distinct())
+            stale = sorted(set(result.scalars()) - set(changed.tolist()))
+            for start in range(0, len(stale), WRITE_BATCH_SIZE):
+                batch = stale[start:start + WRITE_BATCH_SIZE]
+                await db.execute(delete(BookNeighbour).where(BookNeighbour.book_id.in_(batch)))
+                await db.commit()
+
+        self._save()
+        logger.info("Rebuilt book neighbours for %s books", len(changed))
+        return len(changed)
+
+    async def refresh(self) -> int:
+        """Fold in borrowings made since the last run; returns the number of updated books."""
+        if self._matrix is None:
+            if self._state_path and os.path.exists(self._state_path):
+                self._matrix = await asyncio.to_thread(CoOccurrence.load, self._state_path)
+            else:
+                return await self.rebuild()
+
+        async with self._session_factory() as db:
+            result = await db.execute(
+                select(BorrowedBook.reader_id, BorrowedBook.book_id, BorrowedBook.id)
+                .where(BorrowedBook.id > self._matrix.watermark - REREAD_WINDOW)
+            )
+            rows = result.all()
+            if not rows:
+                return 0
+
+            new = np.array(rows, dtype=np.int64)
+            changed = await asyncio.to_thread(self._matrix.add, new[:, 0], new[:, 1])
+            self._matrix.watermark = max(self._matrix.watermark, int(new[:, 2].max()))
+
+            await self._write(db, changed)
+
+        self._save()
+        return len(changed)
+
+    def _save(self) -> None:
+        if self._state_path:
+            self._matrix.save(self._state_path)
+
+    async def run(self) -> None:
+        if np is None:
+            logger.error("Recommendations need numpy and scipy; install the 'recommendations' extra")
+            return
+
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Refreshing book neighbours failed")
+            await asyncio.sleep(self._interval)
+
+
+recommendation_job = RecommendationJob(async_session)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh precomputed book neighbours")
+    parser.add_argument("--rebuild", action="store_true", help="recompute from the full history")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(recommendation_job.rebuild() if args.rebuild else recommendation_job.refresh())
@@ -0,0 +1,116 @@
+"""Fuzzy reader lookup by name or email.
+
+On Postgres matching and ranking happen in the database through ``pg_trgm``
+and the GIN trigram indexes on ``readers.name``/``readers.email``. Other
+databases get a portable fallback: a ``LIKE`` prefilter on the query's
+trigrams followed by the same trigram similarity computed in Python. The
+prefilter keeps the ``READER_SEARCH_CANDIDATES`` readers sharing the most
+trigrams with the query. That count stands in for the similarity, which
+also depends on the length of the name, so with more matches than
+candidates the fallback's ranking is approximate.
+"""
+import re
+
+from sqlalchemy import select, func, or_, literal, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.config import settings
+from src.models.reader import Reader
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: str) -> set[str]:
+    """Trigram set of ``text`` the way pg_trgm builds it."""
+    result = set()
+    for word in _WORD.findall(text.lower()):
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def escape_like(text: str) -> str:
+    """``text`` as a literal inside a LIKE pattern using ``\\`` as the escape character."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def similarity(left: set[str], right: set[str]) -> float:
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def word_similarity(query: set[str], text: str) -> float:
+    """Best similarity between the query and any single word of ``text``."""
+    return max((similarity(query, trigrams(word)) for word in _WORD.findall(text.lower())), default=0.0)
+
+
+async def _search_postgres(db: AsyncSession, q: str, limit: int) -> list[tuple[Reader, float]]:
+    score = func.greatest(
+        func.similarity(Reader.name, q),
+        func.similarity(Reader.email, q),
+        func.word_similarity(q, Reader.name)
+    ).label("score")
+    contains = f"%{escape_like(q)}%"
+
+    # Every branch of the OR is served by the GIN trigram indexes
+    result = await db.execute(
+        select(Reader, score)
+        .where(
+            Reader.deleted_at.is_(None),
+            or_(
+                Reader.name.op("%")(q),
+                Reader.email.op("%")(q),
+                literal(q).op("<%")(Reader.name),
+                Reader.name.ilike(contains, escape="\\"),
+                Reader.email.ilike(contains, escape="\\")
+            )
+        )
+        .order_by(score.desc(), Reader.id)
+        .limit(limit)
+    )
+    return [(reader, float(value)) for reader, value in result.all()]
+
+
+async def _search_portable(db: AsyncSession, q: str, limit: int) -> list[tuple[Reader, float]]:
+    query_trigrams = trigrams(q)
+    if not query_trigrams:
+        return []
+
+    patterns = [f"%{escape_like(gram.strip())}%" for gram in query_trigrams if len(gram.strip()) >= 2]
+    if not patterns:
+        patterns = [f"%{escape_like(q.strip().lower())}%"]
+
+    matches = [
+        or_(
+            func.lower(Reader.name).like(pattern, escape="\\"),
+            func.lower(Reader.email).like(pattern, escape="\\")
+        )
+        for pattern in patterns
+    ]
+    shared = sum(case((match, 1), else_=0) for match in matches)
+    result = await db.execute(
+        select(Reader)
+        .where(Reader.deleted_at.is_(None), or_(*matches))
+        .order_by(shared.desc(), Reader.id)
+        .limit(settings.READER_SEARCH_CANDIDATES)
+    )
+
+    scored = []
+    for reader in result.scalars():
+        score = max(
+            similarity(query_trigrams, trigrams(reader.name)),
+            similarity(query_trigrams, trigrams(reader.email)),
+            word_similarity(query_trigrams, reader.name)
+        )
+        if score >= settings.READER_SEARCH_MIN_SIMILARITY:
+            scored.append((reader, score))
+
+    scored.sort(key=lambda item: (-item[1], item[0].id))
+    return scored[:limit]
+
+
+async def search_readers(db: AsyncSession, q: str, limit: int) -> list[tuple[Reader, float]]:
+    if db.bind.dialect.name == "postgresql":
+        return await _search_postgres(db, q, limit)
+    return await _search_portable(db, q, limit)
@@ -0,0 +1,134 @@
+"""Reader dashboard summary.
+
+The whole summary is read with two statements: the reader together with
+the count of past loans (archived ones included), then the active loans plus the latest returns with
+their books. Results are cached per reader until the reader's next borrow
+or return, and never past the earliest due date of an active loan so the
+overdue flags stay correct.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import select, func, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.core.cache import TTLCache
+from src.core.config import settings
+from src.core.database import as_utc
+from src.models.book import Book
+from src.models.borrowing import BorrowedBook, ArchivedBorrowing
+from src.models.reader import Reader
+from src.schemas.book import BookResponse
+from src.schemas.reader import ReaderResponse, ReaderLoan, ReaderReturn, ReaderSummary
+
+summary_cache = TTLCache(
+    maxsize=settings.READER_SUMMARY_CACHE_SIZE,
+    ttl=settings.READER_SUMMARY_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_reader_summary(*reader_ids: int) -> None:
+    """Drop cached summaries; call after the change has been committed."""
+    for reader_id in reader_ids:
+        summary_cache.pop(reader_id)
+
+
+async def build_reader_summary(db: AsyncSession, reader_id: int) -> ReaderSummary | None:
+    past_loans = (
+        select(func.count(BorrowedBook.id))
+        .where(
+            and_(
+                BorrowedBook.reader_id == reader_id,
+                BorrowedBook.return_date.is_not(None)
+            )
+        )
+        .scalar_subquery()
+    )
+    archived_loans = (
+        select(func.count(ArchivedBorrowing.id))
+        .where(ArchivedBorrowing.reader_id == reader_id)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(Reader, past_loans + archived_loans).where(Reader.id == reader_id, Reader.deleted_at.is_(None))
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+    reader, past_loans_count = row
+
+    recent_returns = (
+        select(BorrowedBook.id)
+        .where(
+            and_(
+                BorrowedBook.reader_id == reader_id,
+                BorrowedBook.return_date.is_not(None)
+            )
+        )
+        .order_by(BorrowedBook.return_date.desc())
+        .limit(settings.READER_SUMMARY_RECENT_RETURNS)
+    )
+    result = await db.execute(
+        select(BorrowedBook, Book)
+        .join(Book, Book.id == BorrowedBook.book_id)
+        .where(
+            and_(
+                BorrowedBook.reader_id == reader_id,
+                or_(
+                    BorrowedBook.return_date.is_(None),
+                    BorrowedBook.id.in_(recent_returns)
+                )
+            )
+        )
+    )
+
+    now = datetime.now(timezone.utc)
+    active_loans, returns = [], []
+    for borrowing, book in result.all():
+        book_data = BookResponse.model_validate(book)
+        if borrowing.return_date is None:
+            due_date = as_utc(borrowing.due_date)
+            active_loans.append(ReaderLoan(
+                id=borrowing.id,
+                book=book_data,
+                borrow_date=as_utc(borrowing.borrow_date),
+                due_date=due_date,
+                overdue=due_date <= now
+            ))
+        else:
+            returns.append(ReaderReturn(
+                id=borrowing.id,
+                book=book_data,
+                borrow_date=as_utc(borrowing.borrow_date),
+                due_date=as_utc(borrowing.due_date),
+                return_date=as_utc(borrowing.return_date)
+            ))
+
+    active_loans.sort(key=lambda loan: loan.due_date)
+    returns.sort(key=lambda loan: loan.return_date, reverse=True)
+
+    return ReaderSummary(
+        reader=ReaderResponse.model_validate(reader),
+        active_loans=active_loans,
+        overdue_count=sum(loan.overdue for loan in active_loans),
+        past_loans_count=past_loans_count,
+        recent_returns=returns
+    )
+
+
+async def get_reader_summary(db: AsyncSession, reader_id: int) -> ReaderSummary | None:
+    summary = summary_cache.get(reader_id)
+    if summary is not None:
+        return summary
+
+    summary = await build_reader_summary(db, reader_id)
+    if summary is None:
+        return None
+
+    ttl = settings.READER_SUMMARY_CACHE_TTL_SECONDS
+    upcoming = [loan.due_date for loan in summary.active_loans if not loan.overdue]
+    if upcoming:
+        ttl = min(ttl, (min(upcoming) - datetime.now(timezone.utc)).total_seconds())
+    if ttl > 0:
+        summary_cache.set(reader_id, summary, ttl=ttl)
+
+    return summary
@@ -1,11 +1,16 @@
 import pytest
 import asyncio
+from fastapi import Request
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from httpx import AsyncClient, ASGITransport
 
 from src.main import app
-from src.core.database import get_db
+from src.api.books import facet_cache
+from src.core.database import get_db, enable_sqlite_savepoints
 from src.models.user import Base
+from src.services.audit import audit_buffer
+from src.services.partitions import active_bound_cache
+from src.services.summary import summary_cache
 
 TEST_DB = "sqlite+aiosqlite:///:memory:"
 
@@ -21,6 +26,7 @@ def event_loop():
 @pytest.fixture(scope="function")
 async def engine():
     engine = create_async_engine(TEST_DB, echo=False)
+    enable_sqlite_savepoints(engine)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield engine
@@ -43,11 +49,18 @@ async def db_session(engine):
 @pytest.fixture(scope="function")
 async def client(db_session):
 
-    async def override_get_db():
-        yield db_session
+    async def override_get_db(request: Request):
+        # Atomic batches hand their shared session down to sub-requests
+        yield getattr(request.state, "db_session", None) or db_session
 
     app.dependency_overrides[get_db] = override_get_db
 
+    # In-process caches outlive the per-test database
+    facet_cache.clear()
+    summary_cache.clear()
+    active_bound_cache.clear()
+    audit_buffer.clear()
+
     async with AsyncClient(
             transport=ASGITransport(app=app),
             base_url="http://test"
@@ -0,0 +1,99 @@
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.fixture
+async def auth_headers(client: AsyncClient):
+    await client.post(
+        "/auth/register",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    response = await client.post(
+        "/auth/login",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+async def circulation(client: AsyncClient, auth_headers):
+    book_ids = []
+    for i in range(2):
+        response = await client.post(
+            "/books/",
+            json={
+                "title": f"Book {i}",
+                "author": "Author",
+                "year": 2024,
+                "isbn": f"978-3-16-14841-{i}",
+                "copies_available": 5
+            },
+            headers=auth_headers
+        )
+        book_ids.append(response.json()["id"])
+
+    reader_ids = []
+    for name in ("Artem", "Nikita"):
+        response = await client.post(
+            "/readers/",
+            json={"name": name, "email": f"{name.lower()}@mail.ru"},
+            headers=auth_headers
+        )
+        reader_ids.append(response.json()["id"])
+
+    for reader_id in reader_ids:
+        await client.post(
+            "/borrowing/borrow",
+            json={"book_id": book_ids[0], "reader_id": reader_id},
+            headers=auth_headers
+        )
+    await client.post(
+        "/borrowing/borrow",
+        json={"book_id": book_ids[1], "reader_id": reader_ids[0]},
+        headers=auth_headers
+    )
+    await client.post(
+        "/borrowing/return",
+        json={"book_id": book_ids[1], "reader_id": reader_ids[0]},
+        headers=auth_headers
+    )
+
+    return {"book_ids": book_ids, "reader_ids": reader_ids}
+
+
+async def test_top_books(client: AsyncClient, auth_headers, circulation):
+    response = await client.get("/analytics/top-books", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [row["book_id"] for row in data] == circulation["book_ids"]
+    assert data[0]["checkouts"] == 2
+    assert data[0]["title"] == "Book 0"
+
+
+async def test_top_readers(client: AsyncClient, auth_headers, circulation):
+    response = await client.get("/analytics/top-readers?limit=1", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["reader_id"] == circulation["reader_ids"][0]
+    assert data[0]["checkouts"] == 2
+
+
+async def test_loan_duration_and_daily_volume(client: AsyncClient, auth_headers, circulation):
+    response = await client.get("/analytics/loan-duration", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["returns"] == 1
+    assert response.json()["average_seconds"] >= 0
+
+    response = await client.get("/analytics/daily-checkouts", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data) == 1
+    assert data[0]["checkouts"] == 3
+    assert data[0]["returns"] == 1
+
+
+async def test_analytics_without_auth(client: AsyncClient):
+    response = await client.get("/analytics/top-books")
+    assert response.status_code == 401
@@ -0,0 +1,160 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src import main
+from src.core.config import settings
+from src.models.borrowing import BorrowedBook, ArchivedBorrowing
+from src.services.archive import BorrowingArchiver, borrowing_archiver
+from src.services.partitions import (
+    PartitionMaintainer,
+    active_loans_since,
+    add_months,
+    month_start,
+    partition_maintainer,
+    partition_name
+)
+
+
+@pytest.fixture
+async def auth_headers(client: AsyncClient):
+    await client.post(
+        "/auth/register",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    response = await client.post(
+        "/auth/login",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+async def loan(client: AsyncClient, auth_headers):
+    book_response = await client.post(
+        "/books/",
+        json={
+            "title": "Test Book",
+            "author": "Test Author",
+            "year": 2024,
+            "isbn": "978-3-16-148410-0",
+            "copies_available": 3
+        },
+        headers=auth_headers
+    )
+    reader_response = await client.post(
+        "/readers/",
+        json={"name": "Artem", "email": "artem@mail.ru"},
+        headers=auth_headers
+    )
+    return {
+        "book_id": book_response.json()["id"],
+        "reader_id": reader_response.json()["id"]
+    }
+
+
+async def test_archiver_moves_old_returns_in_batches(client: AsyncClient, auth_headers, engine, db_session, loan):
+    for _ in range(3):
+        await client.post("/borrowing/borrow", json=loan, headers=auth_headers)
+        await client.post("/borrowing/return", json=loan, headers=auth_headers)
+    await client.post("/borrowing/borrow", json=loan, headers=auth_headers)
+    # The in-memory database has a single connection; end the test session's transaction
+    await db_session.commit()
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    sessions = []
+
+    def session_factory():
+        sessions.append(factory())
+        return sessions[-1]
+
+    archiver = BorrowingArchiver(session_factory, retention=timedelta(days=30), batch_size=2)
+
+    # Nothing is old enough yet
+    assert await archiver.run_once() == 0
+
+    later = datetime.now(timezone.utc) + timedelta(days=31)
+    assert await archiver.run_once(now=later) == 3
+    # A session per batch, so the embedded writer lock is released in between
+    assert len(sessions) == 3
+
+    hot = await db_session.execute(select(BorrowedBook.return_date))
+    assert hot.scalars().all() == [None]
+    archived = await db_session.execute(select(func.count(ArchivedBorrowing.id)))
+    assert archived.scalar_one() == 3
+
+    # Archived loans still count towards the reader's history
+    response = await client.get(f"/readers/{loan['reader_id']}/summary", headers=auth_headers)
+    data = response.json()
+    assert data["past_loans_count"] == 3
+    assert len(data["active_loans"]) == 1
+
+
+async def test_soft_deleted_reader_keeps_history(client: AsyncClient, auth_headers, db_session, loan):
+    await client.post("/borrowing/borrow", json=loan, headers=auth_headers)
+    await client.post("/borrowing/return", json=loan, headers=auth_headers)
+
+    response = await client.delete(f"/readers/{loan['reader_id']}", headers=auth_headers)
+    assert response.status_code == 204
+
+    response = await client.get(f"/readers/{loan['reader_id']}", headers=auth_headers)
+    assert response.status_code == 404
+    response = await client.get("/readers/", headers=auth_headers)
+    assert response.json()["total"] == 0
+    response = await client.post("/borrowing/borrow", json=loan, headers=auth_headers)
+    assert response.status_code == 404
+
+    history = await db_session.execute(select(func.count(BorrowedBook.id)))
+    assert history.scalar_one() == 1
+
+    # The email is free again
+    response = await client.post(
+        "/readers/",
+        json={"name": "Artem", "email": "artem@mail.ru"},
+        headers=auth_headers
+    )
+    assert response.status_code == 201
+
+
+def test_monthly_partition_bounds():
+    start = month_start(datetime(2025, 12, 17, 23, 30, tzinfo=timezone.utc))
+    assert start == datetime(2025, 12, 1, tzinfo=timezone.utc)
+    assert add_months(start, 1) == datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert add_months(start, -12) == datetime(2024, 12, 1, tzinfo=timezone.utc)
+    assert partition_name(start) == "borrowed_books_p2025_12"
+
+
+async def test_partitions_are_created_with_archiving_off(monkeypatch, engine):
+    monkeypatch.setattr(settings, "ARCHIVE_ENABLED", False)
+    assert partition_maintainer.run in main.scheduled_jobs("postgresql")
+    assert borrowing_archiver.run not in main.scheduled_jobs("sqlite")
+
+    maintainer = PartitionMaintainer(engine, retire=False)
+    calls = []
+
+    async def is_partitioned():
+        return True
+
+    async def record(name, now):
+        calls.append(name)
+
+    monkeypatch.setattr(maintainer, "is_partitioned", is_partitioned)
+    monkeypatch.setattr(maintainer, "create_future_partitions", lambda now: record("create", now))
+    monkeypatch.setattr(maintainer, "retire_expired_partitions", lambda now: record("retire", now))
+    await maintainer.run_once()
+    assert calls == ["create"]
+
+
+async def test_active_loan_bound_covers_oldest_loan(client: AsyncClient, auth_headers, db_session, loan):
+    response = await client.post("/borrowing/borrow", json=loan, headers=auth_headers)
+    borrow_date = datetime.fromisoformat(response.json()["borrow_date"]).replace(tzinfo=timezone.utc)
+
+    bound = await active_loans_since(db_session)
+    assert bound <= borrow_date
+
+    response = await client.get("/borrowing/", params={"active_only": "true"}, headers=auth_headers)
+    assert response.json()["total"] == 1
@@ -0,0 +1,128 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.services.audit import AuditBuffer, audit_buffer
+
+
+@pytest.fixture
+async def auth_headers(client: AsyncClient):
+    await client.post(
+        "/auth/register",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    response = await client.post(
+        "/auth/login",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def test_buffer(engine, monkeypatch):
+    monkeypatch.setattr(
+        audit_buffer,
+        "session_factory",
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    return audit_buffer
+
+
+async def test_mutations_are_audited_in_batches(client: AsyncClient, auth_headers, db_session, test_buffer):
+    book_response = await client.post(
+        "/books/",
+        json={
+            "title": "Test Book",
+            "author": "Test Author",
+            "year": 2024,
+            "isbn": "978-3-16-148410-0",
+            "copies_available": 3
+        },
+        headers=auth_headers
+    )
+    book_id = book_response.json()["id"]
+    reader_response = await client.post(
+        "/readers/",
+        json={"name": "Artem", "email": "artem@mail.ru"},
+        headers=auth_headers
+    )
+    reader_id = reader_response.json()["id"]
+    loan = {"book_id": book_id, "reader_id": reader_id}
+    await client.post("/borrowing/borrow", json=loan, headers=auth_headers)
+    await client.post("/borrowing/return", json=loan, headers=auth_headers)
+
+    # Failed requests leave no trace
+    response = await client.post("/borrowing/return", json=loan, headers=auth_headers)
+    assert response.status_code == 400
+
+    # Nothing is written until the buffer is flushed
+    response = await client.get("/audit/metrics", headers=auth_headers)
+    assert response.json()["depth"] == 4
+    response = await client.get("/audit/", headers=auth_headers)
+    assert response.json()["events"] == []
+
+    await db_session.commit()
+    assert await test_buffer.flush() == 4
+    assert test_buffer.depth == 0
+
+    response = await client.get("/audit/", params={"limit": 3}, headers=auth_headers)
+    data = response.json()
+    assert [event["action"] for event in data["events"]] == ["return", "borrow", "create"]
+    assert data["events"][0]["user_email"] == "libr@mail.ru"
+    assert data["events"][0]["details"] == {"book_id": book_id, "reader_id": reader_id}
+
+    response = await client.get(
+        "/audit/",
+        params={"limit": 3, "before": data["next_cursor"]},
+        headers=auth_headers
+    )
+    data = response.json()
+    assert [(event["action"], event["entity"]) for event in data["events"]] == [("create", "book")]
+    assert data["next_cursor"] is None
+
+    response = await client.get("/audit/", params={"entity": "reader"}, headers=auth_headers)
+    assert [event["entity_id"] for event in response.json()["events"]] == [reader_id]
+
+
+async def test_rolled_back_batch_is_not_audited(client: AsyncClient, auth_headers, test_buffer):
+    book = {
+        "title": "Test Book",
+        "author": "Test Author",
+        "year": 2024,
+        "isbn": "978-3-16-148410-0",
+        "copies_available": 1
+    }
+    operations = [
+        {"method": "POST", "path": "/books/", "body": book},
+        {"method": "POST", "path": "/readers/", "body": {"name": "Artem", "email": "artem@mail.ru"}},
+        {"method": "POST", "path": "/books/", "body": book}
+    ]
+    response = await client.post(
+        "/batch", json={"atomic": True, "operations": operations}, headers=auth_headers
+    )
+    assert response.json()["committed"] is False
+    assert test_buffer.depth == 0
+
+    response = await client.post(
+        "/batch", json={"atomic": True, "operations": operations[:2]}, headers=auth_headers
+    )
+    assert response.json()["committed"] is True
+    assert test_buffer.depth == 2
+
+
+async def test_failed_flush_keeps_events():
+    def broken_session():
+        raise ConnectionError("database is down")
+
+    buffer = AuditBuffer(broken_session, batch_size=100, flush_interval=1, max_pending=3)
+    buffer.extend([{"action": "create"}, {"action": "update"}])
+
+    assert await buffer.flush() == 0
+    assert buffer.depth == 2
+
+    buffer.extend([{"action": "delete"}, {"action": "borrow"}])
+    metrics = buffer.metrics()
+    assert metrics.depth == 3
+    assert metrics.dropped == 1
+    assert metrics.failed_flushes == 1
@@ -0,0 +1,168 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+from src.core.pubsub import Broker, InMemoryBackend, PostgresNotifyBackend
+from src.services.availability import availability_broker
+
+
+@pytest.fixture
+async def auth_headers(client: AsyncClient):
+    await client.post(
+        "/auth/register",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    response = await client.post(
+        "/auth/login",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def test_broker_fans_out_to_every_subscriber():
+    broker = Broker(InMemoryBackend(), queue_size=10)
+    await broker.start()
+
+    first = broker.subscribe()
+    second = broker.subscribe()
+    await broker.publish({"book_id": 1, "copies_available": 2, "delta": -1})
+
+    assert await first.get() == {"book_id": 1, "copies_available": 2, "delta": -1}
+    assert await second.get() == {"book_id": 1, "copies_available": 2, "delta": -1}
+
+    await broker.stop()
+
+
+async def test_broker_drops_slow_subscriber():
+    broker = Broker(InMemoryBackend(), queue_size=2)
+    await broker.start()
+
+    slow = broker.subscribe()
+    for delta in range(3):
+        await broker.publish({"book_id": 1, "copies_available": 0, "delta": delta})
+
+    assert slow.dropped
+    assert broker.subscriber_count == 0
+    assert await slow.get() is None
+
+    await broker.stop()
+
+
+class FakeConnection:
+    """Loops ``pg_notify`` back to its listeners, like a single-worker Postgres."""
+
+    def __init__(self):
+        self.listeners = {}
+        self.termination_listeners = []
+        self.closed = False
+
+    async def add_listener(self, channel, callback):
+        self.listeners[channel] = callback
+
+    def add_termination_listener(self, callback):
+        self.termination_listeners.append(callback)
+
+    async def execute(self, query, *args):
+        if self.closed:
+            raise ConnectionResetError("connection is closed")
+        if query.startswith("SELECT pg_notify"):
+            channel, payload = args
+            self.listeners[channel](self, 1, channel, payload)
+
+    def drop(self):
+        self.closed = True
+        for callback in self.termination_listeners:
+            callback(self)
+
+    def terminate(self):
+        self.drop()
+
+    async def close(self):
+        self.drop()
+
+
+class FlakyConnect:
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.connections: list[FakeConnection] = []
+
+    async def __call__(self, dsn):
+        if len(self.connections) == 1 and self.failures:
+            self.failures -= 1
+            raise OSError("connection refused")
+        self.connections.append(FakeConnection())
+        return self.connections[-1]
+
+
+async def test_postgres_backend_reconnects_after_losing_its_connection():
+    connect = FlakyConnect(failures=2)
+    backend = PostgresNotifyBackend("postgresql://db/library", "availability", base_backoff=0.01, connect=connect)
+    broker = Broker(backend, queue_size=10)
+    await broker.start()
+    subscription = broker.subscribe()
+
+    connect.connections[0].drop()
+    # Dropped while the connection is down instead of failing the request
+    await broker.publish({"book_id": 1, "copies_available": 0, "delta": -1})
+
+    async def reconnected():
+        while len(connect.connections) < 2 or backend._connection is None:
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(reconnected(), timeout=1)
+    assert connect.failures == 0
+    assert "availability" in connect.connections[1].listeners
+
+    await broker.publish({"book_id": 1, "copies_available": 1, "delta": 1})
+    assert await asyncio.wait_for(subscription.get(), timeout=1) == {"book_id": 1, "copies_available": 1, "delta": 1}
+
+    await broker.stop()
+    assert connect.connections[1].closed and len(connect.connections) == 2
+
+
+async def test_postgres_backend_replaces_a_connection_failing_health_checks():
+    connect = FlakyConnect(failures=0)
+    backend = PostgresNotifyBackend("postgresql://db/library", "availability", health_interval=0.01, connect=connect)
+    await backend.start(lambda payload: None)
+
+    # Closed without asyncpg noticing, so only the ping finds out
+    connect.connections[0].closed = True
+
+    async def replaced():
+        while len(connect.connections) < 2:
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(replaced(), timeout=1)
+    await backend.stop()
+
+
+async def test_borrow_and_return_publish_deltas(client: AsyncClient, auth_headers):
+    book_response = await client.post(
+        "/books/",
+        json={
+            "title": "Test Book",
+            "author": "Test Author",
+            "year": 2024,
+            "isbn": "978-3-16-148410-0",
+            "copies_available": 3
+        },
+        headers=auth_headers
+    )
+    book_id = book_response.json()["id"]
+    reader_response = await client.post(
+        "/readers/",
+        json={"name": "Artem", "email": "artem@mail.ru"},
+        headers=auth_headers
+    )
+    loan = {"book_id": book_id, "reader_id": reader_response.json()["id"]}
+
+    with availability_broker.subscribe() as subscription:
+        await client.post("/borrowing/borrow", json=loan, headers=auth_headers)
+        await client.post("/borrowing/return", json=loan, headers=auth_headers)
+        await client.put(f"/books/{book_id}", json={"copies_available": 5}, headers=auth_headers)
+
+        assert await subscription.get() == {"book_id": book_id, "copies_available": 2, "delta": -1}
+        assert await subscription.get() == {"book_id": book_id, "copies_available": 3, "delta": 1}
+        assert await subscription.get() == {"book_id": book_id, "copies_available": 5, "delta": 2}
@@ -0,0 +1,154 @@
+import pytest
+from httpx import AsyncClient
+
+from src.main import app
+from src.services.availability import availability_broker
+
+
+@pytest.fixture
+async def auth_headers(client: AsyncClient):
+    await client.post(
+        "/auth/register",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    response = await client.post(
+        "/auth/login",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def failing_route():
+    async def fail():
+        raise RuntimeError("boom")
+
+    app.add_api_route("/test-failure", fail, methods=["GET"])
+    yield "/test-failure"
+    app.router.routes.pop()
+
+
+def book(isbn: str, title: str = "Test Book") -> dict:
+    return {
+        "title": title,
+        "author": "Test Author",
+        "year": 2024,
+        "isbn": isbn,
+        "copies_available": 2
+    }
+
+
+async def test_batch_runs_operations_in_order(client: AsyncClient, auth_headers):
+    response = await client.post(
+        "/batch",
+        json={
+            "operations": [
+                {"id": "book", "method": "POST", "path": "/books/", "body": book("978-3-16-148410-0")},
+                {"id": "reader", "method": "POST", "path": "/readers/",
+                 "body": {"name": "Artem", "email": "artem@mail.ru"}},
+                {"id": "borrow", "method": "POST", "path": "/borrowing/borrow",
+                 "body": {"book_id": 1, "reader_id": 1}},
+                {"id": "check", "method": "GET", "path": "/books/?ids=1,2"},
+                {"id": "stock", "method": "GET", "path": "/books/1/availability"}
+            ]
+        },
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data["responses"]] == ["book", "reader", "borrow", "check", "stock"]
+    assert [item["status"] for item in data["responses"]] == [201, 201, 201, 200, 200]
+    # The catalog total is folded in the background, the per-branch view is live
+    assert data["responses"][4]["body"]["copies_available"] == 1
+    assert data["responses"][3]["body"]["missing"] == [2]
+
+
+async def test_atomic_batch_rolls_back_on_failure(client: AsyncClient, auth_headers):
+    response = await client.post(
+        "/batch",
+        json={
+            "atomic": True,
+            "operations": [
+                {"method": "POST", "path": "/books/", "body": book("978-3-16-148410-0")},
+                {"method": "POST", "path": "/books/", "body": book("978-3-16-148410-0", "Duplicate")},
+                {"method": "GET", "path": "/books/"}
+            ]
+        },
+        headers=auth_headers
+    )
+    data = response.json()
+    assert data["committed"] is False
+    assert [item["status"] for item in data["responses"]] == [201, 400, 424]
+
+    books = await client.get("/books/")
+    assert books.json()["total"] == 0
+
+
+async def test_rolled_back_batch_publishes_nothing(client: AsyncClient, auth_headers):
+    await client.post("/books/", json=book("978-3-16-148410-0"), headers=auth_headers)
+    await client.post(
+        "/readers/",
+        json={"name": "Artem", "email": "artem@mail.ru"},
+        headers=auth_headers
+    )
+    loan = {"book_id": 1, "reader_id": 1}
+
+    with availability_broker.subscribe() as subscription:
+        response = await client.post(
+            "/batch",
+            json={
+                "atomic": True,
+                "operations": [
+                    {"method": "POST", "path": "/borrowing/borrow", "body": loan},
+                    {"method": "POST", "path": "/borrowing/borrow", "body": loan}
+                ]
+            },
+            headers=auth_headers
+        )
+        assert [item["status"] for item in response.json()["responses"]] == [201, 400]
+
+        await client.put("/books/1", json={"copies_available": 5}, headers=auth_headers)
+        # The first delta is the update's, the rolled back loan announced nothing
+        assert await subscription.get() == {"book_id": 1, "copies_available": 5, "delta": 3}
+
+        response = await client.post(
+            "/batch",
+            json={
+                "atomic": True,
+                "operations": [{"method": "POST", "path": "/borrowing/borrow", "body": loan}]
+            },
+            headers=auth_headers
+        )
+        assert response.json()["committed"] is True
+        assert await subscription.get() == {"book_id": 1, "copies_available": 4, "delta": -1}
+
+
+async def test_raising_operation_gets_its_own_500(client: AsyncClient, auth_headers, failing_route):
+    operations = [
+        {"method": "POST", "path": "/readers/", "body": {"name": "Artem", "email": "artem@mail.ru"}},
+        {"method": "GET", "path": failing_route},
+        {"method": "GET", "path": "/readers/"}
+    ]
+
+    response = await client.post("/batch", json={"operations": operations}, headers=auth_headers)
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()["responses"]] == [201, 500, 200]
+    assert response.json()["responses"][2]["body"]["total"] == 1
+
+    operations[0]["body"] = {"name": "Nikita", "email": "nikita@mail.ru"}
+    response = await client.post("/batch", json={"operations": operations, "atomic": True}, headers=auth_headers)
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()["responses"]] == [201, 500, 424]
+    assert response.json()["committed"] is False
+
+    response = await client.get("/readers/", headers=auth_headers)
+    assert response.json()["total"] == 1
+
+
+async def test_batch_requires_auth(client: AsyncClient):
+    response = await client.post(
+        "/batch",
+        json={"operations": [{"method": "GET", "path": "/books/"}]}
+    )
+    assert response.status_code == 401
@@ -62,3 +62,149 @@ async def test_get_all_books(client: AsyncClient, auth_headers):
     response = await client.get("/books/")
     assert response.status_code == 200
     assert len(response.json()["books"]) == 1
+
+
+async def test_get_books_by_ids(client: AsyncClient, auth_headers):
+    book_ids = []
+    for i in range(3):
+        response = await client.post(
+            "/books/",
+            json={
+                "title": f"Book {i}",
+                "author": "Author",
+                "year": 2024,
+                "isbn": f"978-3-16-14841-{i}",
+                "copies_available": 5
+            },
+            headers=auth_headers
+        )
+        book_ids.append(response.json()["id"])
+
+    requested = [book_ids[2], 999, book_ids[0]]
+    response = await client.get("/books/", params={"ids": ",".join(map(str, requested))})
+    assert response.status_code == 200
+    data = response.json()
+    assert [book["id"] for book in data["books"]] == [book_ids[2], book_ids[0]]
+    assert data["missing"] == [999]
+
+
+async def test_get_books_by_ids_invalid(client: AsyncClient):
+    response = await client.get("/books/", params={"ids": "1,abc"})
+    assert response.status_code == 422
+
+    response = await client.get("/books/", params={"ids": ",".join(map(str, range(1, 500)))})
+    assert response.status_code == 422
+
+
+async def test_get_books_sparse_fields(client: AsyncClient, auth_headers):
+    response = await client.post(
+        "/books/",
+        json={
+            "title": "Book 1",
+            "author": "Author",
+            "year": 2024,
+            "isbn": "978-3-16-148410-0",
+            "copies_available": 5,
+            "description": "A very long description"
+        },
+        headers=auth_headers
+    )
+    book_id = response.json()["id"]
+
+    response = await client.get("/books/", params={"fields": "title,copies_available"})
+    assert response.status_code == 200
+    assert response.json()["books"] == [{"id": book_id, "title": "Book 1", "copies_available": 5}]
+
+    response = await client.get(f"/books/{book_id}", params={"fields": "author"})
+    assert response.json() == {"id": book_id, "author": "Author"}
+
+    response = await client.get("/books/", params={"fields": "title,secret"})
+    assert response.status_code == 422
+
+
+@pytest.fixture
+async def catalog(client: AsyncClient, auth_headers):
+    books = [
+        ("Dune", "Herbert", 1965, 2),
+        ("Children of Dune", "Herbert", 1976, 0),
+        ("Solaris", "Lem", 1961, 1),
+        ("Fiasco", "Lem", 1986, 0)
+    ]
+    for i, (title, author, year, copies) in enumerate(books):
+        await client.post(
+            "/books/",
+            json={
+                "title": title,
+                "author": author,
+                "year": year,
+                "isbn": f"978-3-16-14841-{i}",
+                "copies_available": copies
+            },
+            headers=auth_headers
+        )
+
+
+async def test_filter_and_sort_books(client: AsyncClient, catalog):
+    response = await client.get(
+        "/books/",
+        params={"author": "Herbert", "sort": "-year"}
+    )
+    assert [book["title"] for book in response.json()["books"]] == ["Children of Dune", "Dune"]
+
+    response = await client.get(
+        "/books/",
+        params={"year_from": 1960, "year_to": 1970, "available": "true", "sort": "title"}
+    )
+    assert response.json()["total"] == 2
+    assert [book["title"] for book in response.json()["books"]] == ["Dune", "Solaris"]
+
+
+async def test_book_facets(client: AsyncClient, catalog):
+    response = await client.get("/books/facets")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 4
+    assert data["authors"] == [
+        {"value": "Herbert", "count": 2},
+        {"value": "Lem", "count": 2}
+    ]
+    assert data["decades"] == [
+        {"decade": 1960, "count": 2},
+        {"decade": 1970, "count": 1},
+        {"decade": 1980, "count": 1}
+    ]
+    assert data["availability"] == {"available": 2, "unavailable": 2}
+
+    response = await client.get("/books/facets", params={"author": "Lem"})
+    assert response.json()["availability"] == {"available": 1, "unavailable": 1}
+
+
+async def test_delete_book_is_soft(client: AsyncClient, auth_headers, catalog):
+    response = await client.get("/books/", params={"author": "Lem", "sort": "title"})
+    fiasco_id = response.json()["books"][0]["id"]
+
+    response = await client.delete(f"/books/{fiasco_id}", headers=auth_headers)
+    assert response.status_code == 204
+
+    response = await client.get(f"/books/{fiasco_id}")
+    assert response.status_code == 404
+    response = await client.get("/books/", params={"ids": str(fiasco_id)})
+    assert response.json()["missing"] == [fiasco_id]
+    response = await client.get("/books/facets")
+    assert response.json()["total"] == 3
+    response = await client.delete(f"/books/{fiasco_id}", headers=auth_headers)
+    assert response.status_code == 404
+
+    # The ISBN of a deleted book can be reused
+    response = await client.post(
+        "/books/",
+        json={
+            "title": "Fiasco",
+            "author": "Lem",
+            "year": 1986,
+            "isbn": "978-3-16-14841-3",
+            "copies_available": 1
+        },
+        headers=auth_headers
+    )
+    assert response.status_code == 201
@@ -1,5 +1,14 @@
+from types import SimpleNamespace
+
 import pytest
+from fastapi import HTTPException
 from httpx import AsyncClient
+from sqlalchemy import select
+
+from src.api.borrowing import close_loan
+from src.models.borrowing import BorrowedBook
+from src.services.audit import AuditTrail
+from src.services.book_totals import fold_stock_changes
 
 
 @pytest.fixture
@@ -55,7 +64,7 @@ async def test_borrow_book(client: AsyncClient, auth_headers, setup_book_and_rea
     assert response.json()["return_date"] is None
 
 
-async def test_borrow_decreases_copies(client: AsyncClient, auth_headers, setup_book_and_reader):
+async def test_borrow_decreases_copies(client: AsyncClient, auth_headers, db_session, setup_book_and_reader):
     book_id = setup_book_and_reader["book_id"]
 
     book_before = await client.get(f"/books/{book_id}")
@@ -70,6 +79,8 @@ async def test_borrow_decreases_copies(client: AsyncClient, auth_headers, setup_
         headers=auth_headers
     )
 
+    # The stored total catches up once the background job folds the change in
+    await fold_stock_changes(db_session)
     book_after = await client.get(f"/books/{book_id}")
     assert book_after.json()["copies_available"] == initial_copies - 1
 
@@ -162,7 +173,7 @@ async def test_return_book(client: AsyncClient, auth_headers, setup_book_and_rea
     assert response.json()["return_date"] is not None
 
 
-async def test_return_increases_copies(client: AsyncClient, auth_headers, setup_book_and_reader):
+async def test_return_increases_copies(client: AsyncClient, auth_headers, db_session, setup_book_and_reader):
     book_id = setup_book_and_reader["book_id"]
 
     await client.post(
@@ -174,6 +185,7 @@ async def test_return_increases_copies(client: AsyncClient, auth_headers, setup_
         headers=auth_headers
     )
 
+    await fold_stock_changes(db_session)
     book_borrowed = await client.get(f"/books/{book_id}")
     copies_after_borrow = book_borrowed.json()["copies_available"]
 
@@ -186,10 +198,35 @@ async def test_return_increases_copies(client: AsyncClient, auth_headers, setup_
         headers=auth_headers
     )
 
+    await fold_stock_changes(db_session)
     book_returned = await client.get(f"/books/{book_id}")
     assert book_returned.json()["copies_available"] == copies_after_borrow + 1
 
 
+async def test_concurrent_returns_close_the_loan_once(
+        client: AsyncClient, auth_headers, setup_book_and_reader, db_session
+):
+    book_id = setup_book_and_reader["book_id"]
+    loan = {"book_id": book_id, "reader_id": setup_book_and_reader["reader_id"]}
+    await client.post("/borrowing/borrow", json=loan, headers=auth_headers)
+
+    # The second check-in read the open loan before the first one committed
+    result = await db_session.execute(select(BorrowedBook))
+    borrowing = result.scalar_one()
+    response = await client.post("/borrowing/return", json=loan, headers=auth_headers)
+    assert response.status_code == 200
+
+    request = SimpleNamespace(state=SimpleNamespace())
+    audit = AuditTrail(SimpleNamespace(id=1, email="libr@mail.ru"))
+    with pytest.raises(HTTPException) as error:
+        await close_loan(request, db_session, audit, borrowing, None)
+    assert error.value.status_code == 400
+    await db_session.rollback()
+
+    book = await client.get(f"/books/{book_id}")
+    assert book.json()["copies_available"] == 3
+
+
 async def test_cannot_return_not_borrowed(client: AsyncClient, auth_headers, setup_book_and_reader):
     response = await client.post(
         "/borrowing/return",
@@ -218,3 +255,63 @@ async def test_get_reader_books(client: AsyncClient, auth_headers, setup_book_an
     )
     assert response.status_code == 200
     assert len(response.json()) == 1
+
+
+async def test_get_borrowings_sparse_fields(client: AsyncClient, auth_headers, setup_book_and_reader):
+    await client.post(
+        "/borrowing/borrow",
+        json={
+            "book_id": setup_book_and_reader["book_id"],
+            "reader_id": setup_book_and_reader["reader_id"]
+        },
+        headers=auth_headers
+    )
+
+    response = await client.get(
+        "/borrowing/",
+        params={"fields": "book,return_date"},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    borrowing = response.json()["borrowings"][0]
+    assert set(borrowing) == {"id", "book", "return_date"}
+    assert borrowing["book"]["id"] == setup_book_and_reader["book_id"]
+
+    response = await client.get(
+        f"/borrowing/{borrowing['id']}",
+        params={"fields": "due_date"},
+        headers=auth_headers
+    )
+    assert set(response.json()) == {"id", "due_date"}
+
+
+async def test_reader_summary(client: AsyncClient, auth_headers, setup_book_and_reader):
+    book_id = setup_book_and_reader["book_id"]
+    reader_id = setup_book_and_reader["reader_id"]
+    loan = {"book_id": book_id, "reader_id": reader_id}
+
+    response = await client.get(f"/readers/{reader_id}/summary", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["reader"]["name"] == "Artem"
+    assert data["active_loans"] == []
+    assert data["past_loans_count"] == 0
+
+    # Borrowing and returning invalidate the cached summary
+    await client.post("/borrowing/borrow", json=loan, headers=auth_headers)
+    response = await client.get(f"/readers/{reader_id}/summary", headers=auth_headers)
+    data = response.json()
+    assert [item["book"]["id"] for item in data["active_loans"]] == [book_id]
+    assert data["active_loans"][0]["overdue"] is False
+    assert data["overdue_count"] == 0
+
+    await client.post("/borrowing/return", json=loan, headers=auth_headers)
+    await client.post("/borrowing/borrow", json=loan, headers=auth_headers)
+    response = await client.get(f"/readers/{reader_id}/summary", headers=auth_headers)
+    data = response.json()
+    assert len(data["active_loans"]) == 1
+    assert data["past_loans_count"] == 1
+    assert data["recent_returns"][0]["book"]["title"] == "Test Book"
+
+    response = await client.get("/readers/999/summary", headers=auth_headers)
+    assert response.status_code == 404
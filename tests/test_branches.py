@@ -0,0 +1,220 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select, func
+
+from src.models.book import Book
+from src.models.branch import BookStockChange
+from src.services.book_totals import fold_stock_changes
+
+
+@pytest.fixture
+async def auth_headers(client: AsyncClient):
+    await client.post(
+        "/auth/register",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    response = await client.post(
+        "/auth/login",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+async def setup_branches(client: AsyncClient, auth_headers):
+    book_response = await client.post(
+        "/books/",
+        json={
+            "title": "Test Book",
+            "author": "Test Author",
+            "year": 2024,
+            "isbn": "978-3-16-148410-0",
+            "copies_available": 1
+        },
+        headers=auth_headers
+    )
+    book_id = book_response.json()["id"]
+
+    branch_response = await client.post(
+        "/branches/",
+        json={"code": "north", "name": "North branch"},
+        headers=auth_headers
+    )
+    assert branch_response.status_code == 201
+    branch_id = branch_response.json()["id"]
+
+    reader_ids = []
+    for name in ("Artem", "Nikita"):
+        reader_response = await client.post(
+            "/readers/",
+            json={"name": name, "email": f"{name.lower()}@mail.ru"},
+            headers=auth_headers
+        )
+        reader_ids.append(reader_response.json()["id"])
+
+    return {"book_id": book_id, "branch_id": branch_id, "reader_ids": reader_ids}
+
+
+async def availability(client: AsyncClient, book_id: int) -> dict:
+    response = await client.get(f"/books/{book_id}/availability")
+    assert response.status_code == 200
+    data = response.json()
+    return {"total": data["copies_available"], **{b["code"]: b["copies_available"] for b in data["branches"]}}
+
+
+async def test_loans_take_copies_per_branch(client: AsyncClient, auth_headers, setup_branches):
+    book_id = setup_branches["book_id"]
+    branch_id = setup_branches["branch_id"]
+    first, second = setup_branches["reader_ids"]
+
+    response = await client.put(
+        f"/branches/{branch_id}/inventory/{book_id}",
+        json={"copies_available": 2},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["book_copies_available"] == 3
+    assert await availability(client, book_id) == {"total": 3, "main": 1, "north": 2}
+
+    # Without a branch the default one lends, as before
+    response = await client.post(
+        "/borrowing/borrow",
+        json={"book_id": book_id, "reader_id": first},
+        headers=auth_headers
+    )
+    assert response.status_code == 201
+    assert response.json()["branch_id"] == 1
+
+    response = await client.post(
+        "/borrowing/borrow",
+        json={"book_id": book_id, "reader_id": second, "branch_id": 1},
+        headers=auth_headers
+    )
+    assert response.status_code == 400
+    assert "branch 1" in response.json()["detail"]
+
+    response = await client.post(
+        "/borrowing/borrow",
+        json={"book_id": book_id, "reader_id": second, "branch_id": branch_id},
+        headers=auth_headers
+    )
+    assert response.status_code == 201
+    assert await availability(client, book_id) == {"total": 1, "main": 0, "north": 1}
+
+    response = await client.get(f"/books/{book_id}")
+    assert response.json()["copies_available"] == 1
+
+    # A copy can be returned to any branch
+    response = await client.post(
+        "/borrowing/return",
+        json={"book_id": book_id, "reader_id": first, "branch_id": branch_id},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    assert await availability(client, book_id) == {"total": 2, "main": 0, "north": 2}
+
+    response = await client.post(
+        "/borrowing/return",
+        json={"book_id": book_id, "reader_id": second},
+        headers=auth_headers
+    )
+    assert await availability(client, book_id) == {"total": 3, "main": 0, "north": 3}
+
+
+async def test_stocking_a_branch_fulfils_holds(client: AsyncClient, auth_headers, setup_branches):
+    book_id = setup_branches["book_id"]
+    branch_id = setup_branches["branch_id"]
+    first, second = setup_branches["reader_ids"]
+
+    await client.post(
+        "/borrowing/borrow",
+        json={"book_id": book_id, "reader_id": first},
+        headers=auth_headers
+    )
+    response = await client.post(
+        f"/books/{book_id}/holds", json={"reader_id": second}, headers=auth_headers
+    )
+    hold_id = response.json()["id"]
+
+    response = await client.put(
+        f"/branches/{branch_id}/inventory/{book_id}",
+        json={"copies_available": 1},
+        headers=auth_headers
+    )
+    assert response.json()["copies_available"] == 0
+
+    response = await client.get(f"/books/{book_id}/holds/{hold_id}", headers=auth_headers)
+    borrowing_id = response.json()["borrowing_id"]
+    assert response.json()["status"] == "fulfilled"
+
+    response = await client.get(f"/borrowing/{borrowing_id}", headers=auth_headers)
+    assert response.json()["reader"]["id"] == second
+    assert await availability(client, book_id) == {"total": 0, "main": 0, "north": 0}
+
+
+async def test_book_total_is_adjusted_at_default_branch(client: AsyncClient, auth_headers, setup_branches):
+    book_id = setup_branches["book_id"]
+    branch_id = setup_branches["branch_id"]
+
+    await client.put(
+        f"/branches/{branch_id}/inventory/{book_id}",
+        json={"copies_available": 4},
+        headers=auth_headers
+    )
+
+    response = await client.put(f"/books/{book_id}", json={"copies_available": 7}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["copies_available"] == 7
+    assert await availability(client, book_id) == {"total": 7, "main": 3, "north": 4}
+
+    response = await client.put(f"/books/{book_id}", json={"copies_available": 2}, headers=auth_headers)
+    assert response.status_code == 400
+    assert await availability(client, book_id) == {"total": 7, "main": 3, "north": 4}
+
+    response = await client.post(
+        "/branches/",
+        json={"code": "north", "name": "Another"},
+        headers=auth_headers
+    )
+    assert response.status_code == 400
+
+
+async def test_book_totals_are_folded_from_branch_changes(
+        client: AsyncClient, auth_headers, db_session, setup_branches
+):
+    book_id = setup_branches["book_id"]
+    first, second = setup_branches["reader_ids"]
+    await fold_stock_changes(db_session)
+
+    response = await client.post(
+        "/borrowing/borrow",
+        json={"book_id": book_id, "reader_id": first},
+        headers=auth_headers
+    )
+    assert response.status_code == 201
+    # Decided on the live total, not the stored one that still says 1
+    response = await client.post(f"/books/{book_id}/holds", json={"reader_id": second}, headers=auth_headers)
+    assert response.status_code == 201
+
+    # The loan wrote its branch row and a change, not the book row
+    stored = await db_session.execute(select(Book.copies_available).where(Book.id == book_id))
+    assert stored.scalar_one() == 1
+    assert await availability(client, book_id) == {"total": 0, "main": 0}
+
+    assert await fold_stock_changes(db_session, batch_size=10) == 1
+    assert (await db_session.execute(select(func.count(BookStockChange.id)))).scalar_one() == 0
+    response = await client.get("/books/", params={"available": "false"})
+    assert [book["id"] for book in response.json()["books"]] == [book_id]
+
+    # A return hands the copy to the hold; folding again is a no-op
+    response = await client.post(
+        "/borrowing/return",
+        json={"book_id": book_id, "reader_id": first},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    await fold_stock_changes(db_session)
+    assert await fold_stock_changes(db_session) == 0
+    response = await client.get(f"/books/{book_id}")
+    assert response.json()["copies_available"] == 0
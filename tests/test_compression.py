@@ -0,0 +1,111 @@
+import uuid
+import zlib
+
+import pytest
+from httpx import AsyncClient
+
+from src.core.compression import CompressionMiddleware, CompressionPolicy
+
+
+@pytest.fixture
+async def auth_headers(client: AsyncClient):
+    await client.post(
+        "/auth/register",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    response = await client.post(
+        "/auth/login",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_negotiate_respects_q_values():
+    policy = CompressionPolicy()
+    assert policy.negotiate("gzip") == "gzip"
+    assert policy.negotiate("gzip;q=0, identity") is None
+    assert policy.negotiate("identity") is None
+    assert policy.negotiate(None) is None
+
+
+async def test_large_response_is_gzipped(client: AsyncClient, auth_headers):
+    for i in range(10):
+        await client.post(
+            "/books/",
+            json={
+                "title": f"Book {i}",
+                "author": "Author",
+                "year": 2024,
+                "isbn": f"978-3-16-14841-{i}",
+                "copies_available": 5,
+                "description": "Long description " * 20
+            },
+            headers=auth_headers
+        )
+
+    response = await client.get("/books/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert len(response.json()["books"]) == 10
+
+
+async def test_small_response_is_not_compressed(client: AsyncClient):
+    response = await client.get("/books/", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+async def test_replayed_response_is_served_precompressed(client: AsyncClient, auth_headers):
+    headers = {
+        **auth_headers,
+        "Idempotency-Key": str(uuid.uuid4()),
+        "Accept-Encoding": "gzip"
+    }
+    book = {
+        "title": "Test Book",
+        "author": "Test Author",
+        "year": 2024,
+        "isbn": "978-3-16-148410-0",
+        "copies_available": 1,
+        "description": "Long description " * 100
+    }
+
+    first = await client.post("/books/", json=book, headers=headers)
+    replay = await client.post("/books/", json=book, headers=headers)
+
+    assert first.headers["content-encoding"] == "gzip"
+    assert replay.headers["content-encoding"] == "gzip"
+    assert replay.headers["idempotent-replayed"] == "true"
+    assert replay.json() == first.json()
+
+
+async def test_streaming_response_is_compressed_per_chunk():
+    async def app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/event-stream")]
+        })
+        for i in range(3):
+            await send({"type": "http.response.body", "body": f"data: {i}\n\n".encode(), "more_body": True})
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    middleware = CompressionMiddleware(app, CompressionPolicy())
+    await middleware(
+        {"type": "http", "headers": [(b"accept-encoding", b"gzip")]},
+        None,
+        send
+    )
+
+    start, *chunks = messages
+    assert (b"content-encoding", b"gzip") in start["headers"]
+
+    # Every chunk is flushed, so the events seen so far decode on their own
+    decoder = zlib.decompressobj(31)
+    assert decoder.decompress(chunks[0]["body"]) == b"data: 0\n\n"
+    assert b"".join(decoder.decompress(c["body"]) for c in chunks[1:]) == b"data: 1\n\ndata: 2\n\n"
@@ -0,0 +1,60 @@
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from src.core.database import enable_sqlite_savepoints
+from src.core.sqlite import SerializedSession, apply_pragmas
+from src.models.user import Base
+
+
+async def file_engine(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/library.db")
+    enable_sqlite_savepoints(engine)
+    apply_pragmas(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    return engine
+
+
+async def test_pragmas_are_applied_on_connect(tmp_path):
+    engine = await file_engine(tmp_path)
+    async with engine.connect() as conn:
+        assert (await conn.execute(text("PRAGMA journal_mode"))).scalar_one() == "wal"
+        assert (await conn.execute(text("PRAGMA synchronous"))).scalar_one() == 1
+        assert (await conn.execute(text("PRAGMA foreign_keys"))).scalar_one() == 1
+        assert (await conn.execute(text("PRAGMA cache_size"))).scalar_one() < 0
+    await engine.dispose()
+
+
+async def test_writers_take_turns_while_readers_run(tmp_path):
+    engine = await file_engine(tmp_path)
+    writer_session = async_sessionmaker(
+        engine, class_=SerializedSession, writer_lock=asyncio.Lock(), expire_on_commit=False
+    )
+    reader_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    events = []
+
+    async def borrow(number: int) -> None:
+        async with writer_session() as db:
+            # Reads first, like a borrow checking the limit, then writes
+            await db.execute(text("SELECT count(*) FROM readers"))
+            events.append(("start", number))
+            await asyncio.sleep(0.01)
+            await db.execute(
+                text("INSERT INTO readers (name, email) VALUES (:name, :email)"),
+                {"name": f"Reader {number}", "email": f"reader{number}@mail.ru"}
+            )
+            await db.commit()
+            events.append(("end", number))
+
+    async def browse() -> int:
+        async with reader_session() as db:
+            return (await db.execute(text("SELECT count(*) FROM readers"))).scalar_one()
+
+    results = await asyncio.gather(*(borrow(number) for number in range(5)), browse())
+
+    assert events == [(kind, number) for number in range(5) for kind in ("start", "end")]
+    assert results[-1] <= 5
+    assert await browse() == 5
+    await engine.dispose()
@@ -0,0 +1,154 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.hold import Hold
+from src.services.book_totals import fold_stock_changes
+
+
+@pytest.fixture
+async def auth_headers(client: AsyncClient):
+    await client.post(
+        "/auth/register",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    response = await client.post(
+        "/auth/login",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+async def setup_lent_out_book(client: AsyncClient, auth_headers):
+    book_response = await client.post(
+        "/books/",
+        json={
+            "title": "Popular Book",
+            "author": "Author",
+            "year": 2024,
+            "isbn": "978-3-16-148410-0",
+            "copies_available": 1
+        },
+        headers=auth_headers
+    )
+    book_id = book_response.json()["id"]
+
+    reader_ids = []
+    for name in ("Artem", "Nikita", "Grisha"):
+        reader_response = await client.post(
+            "/readers/",
+            json={"name": name, "email": f"{name.lower()}@mail.ru"},
+            headers=auth_headers
+        )
+        reader_ids.append(reader_response.json()["id"])
+
+    await client.post(
+        "/borrowing/borrow",
+        json={"book_id": book_id, "reader_id": reader_ids[0]},
+        headers=auth_headers
+    )
+
+    return {"book_id": book_id, "reader_ids": reader_ids}
+
+
+async def test_hold_positions_are_fifo(client: AsyncClient, auth_headers, setup_lent_out_book):
+    book_id = setup_lent_out_book["book_id"]
+    _, first, second = setup_lent_out_book["reader_ids"]
+
+    response = await client.post(
+        f"/books/{book_id}/holds", json={"reader_id": first}, headers=auth_headers
+    )
+    assert response.status_code == 201
+    assert response.json()["position"] == 1
+
+    response = await client.post(
+        f"/books/{book_id}/holds", json={"reader_id": second}, headers=auth_headers
+    )
+    second_hold_id = response.json()["id"]
+    assert response.json()["position"] == 2
+
+    response = await client.get(f"/books/{book_id}/holds", headers=auth_headers)
+    assert [h["reader_id"] for h in response.json()["holds"]] == [first, second]
+
+    first_hold_id = response.json()["holds"][0]["id"]
+    response = await client.delete(f"/books/{book_id}/holds/{first_hold_id}", headers=auth_headers)
+    assert response.status_code == 204
+
+    response = await client.get(f"/books/{book_id}/holds/{second_hold_id}", headers=auth_headers)
+    assert response.json()["position"] == 1
+
+
+async def test_duplicate_hold_rejected(client: AsyncClient, auth_headers, setup_lent_out_book):
+    book_id = setup_lent_out_book["book_id"]
+    reader_id = setup_lent_out_book["reader_ids"][1]
+
+    await client.post(f"/books/{book_id}/holds", json={"reader_id": reader_id}, headers=auth_headers)
+    response = await client.post(
+        f"/books/{book_id}/holds", json={"reader_id": reader_id}, headers=auth_headers
+    )
+    assert response.status_code == 400
+
+
+async def test_concurrent_duplicate_hold_is_a_conflict(
+        client: AsyncClient, auth_headers, setup_lent_out_book, monkeypatch
+):
+    book_id = setup_lent_out_book["book_id"]
+    reader_id = setup_lent_out_book["reader_ids"][1]
+    commit = AsyncSession.commit
+
+    async def racing_commit(self):
+        # The other request's hold lands between the duplicate check and this insert
+        monkeypatch.setattr(AsyncSession, "commit", commit)
+        self.add(Hold(book_id=book_id, reader_id=reader_id))
+        await commit(self)
+
+    monkeypatch.setattr(AsyncSession, "commit", racing_commit)
+    response = await client.post(
+        f"/books/{book_id}/holds", json={"reader_id": reader_id}, headers=auth_headers
+    )
+    assert response.status_code == 409
+
+
+async def test_return_assigns_copy_to_first_hold(
+        client: AsyncClient, auth_headers, db_session, setup_lent_out_book
+):
+    book_id = setup_lent_out_book["book_id"]
+    holder, first, second = setup_lent_out_book["reader_ids"]
+
+    response = await client.post(
+        f"/books/{book_id}/holds", json={"reader_id": first}, headers=auth_headers
+    )
+    hold_id = response.json()["id"]
+    await client.post(f"/books/{book_id}/holds", json={"reader_id": second}, headers=auth_headers)
+
+    response = await client.post(
+        "/borrowing/return",
+        json={"book_id": book_id, "reader_id": holder},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+
+    response = await client.get(f"/books/{book_id}/holds/{hold_id}", headers=auth_headers)
+    assert response.json()["status"] == "fulfilled"
+    assert response.json()["borrowing_id"] is not None
+
+    response = await client.get(f"/borrowing/reader/{first}", headers=auth_headers)
+    assert len(response.json()) == 1
+
+    await fold_stock_changes(db_session)
+    book = await client.get(f"/books/{book_id}")
+    assert book.json()["copies_available"] == 0
+
+
+async def test_hold_rejected_when_copies_available(client: AsyncClient, auth_headers, setup_lent_out_book):
+    book_id = setup_lent_out_book["book_id"]
+    await client.put(f"/books/{book_id}", json={"copies_available": 2}, headers=auth_headers)
+
+    response = await client.post(
+        f"/books/{book_id}/holds",
+        json={"reader_id": setup_lent_out_book["reader_ids"][1]},
+        headers=auth_headers
+    )
+    assert response.status_code == 400
@@ -0,0 +1,99 @@
+import asyncio
+import uuid
+
+import pytest
+from httpx import AsyncClient
+
+from src.services.book_totals import fold_stock_changes
+
+
+@pytest.fixture
+async def auth_headers(client: AsyncClient):
+    await client.post(
+        "/auth/register",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    response = await client.post(
+        "/auth/login",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+async def setup_book_and_reader(client: AsyncClient, auth_headers):
+    book_response = await client.post(
+        "/books/",
+        json={
+            "title": "Test Book",
+            "author": "Test Author",
+            "year": 2024,
+            "isbn": "978-3-16-148410-0",
+            "copies_available": 3
+        },
+        headers=auth_headers
+    )
+    reader_response = await client.post(
+        "/readers/",
+        json={"name": "Artem", "email": "artem@mail.ru"},
+        headers=auth_headers
+    )
+    return {
+        "book_id": book_response.json()["id"],
+        "reader_id": reader_response.json()["id"]
+    }
+
+
+async def test_retried_borrow_is_replayed(client: AsyncClient, auth_headers, db_session, setup_book_and_reader):
+    headers = {**auth_headers, "Idempotency-Key": str(uuid.uuid4())}
+
+    first = await client.post("/borrowing/borrow", json=setup_book_and_reader, headers=headers)
+    second = await client.post("/borrowing/borrow", json=setup_book_and_reader, headers=headers)
+
+    assert first.status_code == 201
+    assert second.status_code == 201
+    assert second.json() == first.json()
+    assert second.headers["idempotent-replayed"] == "true"
+
+    await fold_stock_changes(db_session)
+    book = await client.get(f"/books/{setup_book_and_reader['book_id']}")
+    assert book.json()["copies_available"] == 2
+
+
+async def test_key_reused_with_other_body(client: AsyncClient, auth_headers, setup_book_and_reader):
+    headers = {**auth_headers, "Idempotency-Key": str(uuid.uuid4())}
+
+    await client.post("/borrowing/borrow", json=setup_book_and_reader, headers=headers)
+    response = await client.post(
+        "/borrowing/return", json=setup_book_and_reader, headers=headers
+    )
+    assert response.status_code == 200
+
+    response = await client.post(
+        "/borrowing/borrow",
+        json={**setup_book_and_reader, "book_id": setup_book_and_reader["book_id"] + 1},
+        headers=headers
+    )
+    assert response.status_code == 422
+
+
+async def test_concurrent_duplicates_execute_once(client: AsyncClient, auth_headers):
+    headers = {**auth_headers, "Idempotency-Key": str(uuid.uuid4())}
+    book = {
+        "title": "Test Book",
+        "author": "Test Author",
+        "year": 2024,
+        "isbn": "978-3-16-148410-9",
+        "copies_available": 1
+    }
+
+    responses = await asyncio.gather(
+        *(client.post("/books/", json=book, headers=headers) for _ in range(3))
+    )
+
+    assert [r.status_code for r in responses] == [201, 201, 201]
+    assert len({r.json()["id"] for r in responses}) == 1
+
+    books = await client.get("/books/")
+    assert books.json()["total"] == 1
@@ -0,0 +1,158 @@
+import pytest
+from httpx import AsyncClient
+
+from src.services.book_totals import fold_stock_changes
+
+
+@pytest.fixture
+async def auth_headers(client: AsyncClient):
+    await client.post(
+        "/auth/register",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    response = await client.post(
+        "/auth/login",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+async def setup_items(client: AsyncClient, auth_headers):
+    book_response = await client.post(
+        "/books/",
+        json={
+            "title": "Test Book",
+            "author": "Test Author",
+            "year": 2024,
+            "isbn": "978-3-16-148410-0",
+            "copies_available": 2
+        },
+        headers=auth_headers
+    )
+    book_id = book_response.json()["id"]
+
+    reader_ids = []
+    for name in ("Artem", "Nikita"):
+        reader_response = await client.post(
+            "/readers/",
+            json={"name": name, "email": f"{name.lower()}@mail.ru"},
+            headers=auth_headers
+        )
+        reader_ids.append(reader_response.json()["id"])
+
+    return {"book_id": book_id, "reader_ids": reader_ids}
+
+
+async def item_statuses(client: AsyncClient, auth_headers, book_id: int) -> dict[str, str]:
+    response = await client.get(f"/books/{book_id}/items", headers=auth_headers)
+    return {item["barcode"]: item["status"] for item in response.json()["items"]}
+
+
+async def test_checkout_and_checkin_by_barcode(client: AsyncClient, auth_headers, db_session, setup_items):
+    book_id = setup_items["book_id"]
+    first, second = setup_items["reader_ids"]
+
+    statuses = await item_statuses(client, auth_headers, book_id)
+    assert statuses == {f"{book_id:07d}00001": "available", f"{book_id:07d}00002": "available"}
+    second_copy = f"{book_id:07d}00002"
+
+    response = await client.post(
+        "/borrowing/checkout",
+        json={"barcode": second_copy, "reader_id": first},
+        headers=auth_headers
+    )
+    assert response.status_code == 201
+    item_id = response.json()["item_id"]
+    assert (await item_statuses(client, auth_headers, book_id))[second_copy] == "on_loan"
+
+    response = await client.post(
+        "/borrowing/checkout",
+        json={"barcode": second_copy, "reader_id": second},
+        headers=auth_headers
+    )
+    assert response.status_code == 400
+    assert "on loan" in response.json()["detail"]
+
+    # Borrowing without a scan takes the remaining free copy
+    response = await client.post(
+        "/borrowing/borrow",
+        json={"book_id": book_id, "reader_id": second},
+        headers=auth_headers
+    )
+    assert response.status_code == 201
+    assert response.json()["item_id"] != item_id
+
+    await fold_stock_changes(db_session)
+    response = await client.get(f"/books/{book_id}")
+    assert response.json()["copies_available"] == 0
+
+    response = await client.post("/borrowing/checkin", json={"barcode": second_copy}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["reader_id"] == first
+    assert response.json()["return_date"] is not None
+
+    response = await client.post("/borrowing/checkin", json={"barcode": second_copy}, headers=auth_headers)
+    assert response.status_code == 400
+
+    response = await client.post("/borrowing/checkin", json={"barcode": "unknown"}, headers=auth_headers)
+    assert response.status_code == 404
+
+    assert (await item_statuses(client, auth_headers, book_id))[second_copy] == "available"
+    await fold_stock_changes(db_session)
+    response = await client.get(f"/books/{book_id}")
+    assert response.json()["copies_available"] == 1
+
+
+async def test_register_and_withdraw_items(client: AsyncClient, auth_headers, db_session, setup_items):
+    book_id = setup_items["book_id"]
+
+    response = await client.post(
+        f"/books/{book_id}/items",
+        json={"barcodes": ["LIB-0001", "LIB-0002"]},
+        headers=auth_headers
+    )
+    assert response.status_code == 201
+    assert [item["copy_number"] for item in response.json()["items"]] == [3, 4]
+
+    response = await client.post(
+        f"/books/{book_id}/items",
+        json={"barcodes": ["LIB-0002", "LIB-0003"]},
+        headers=auth_headers
+    )
+    assert response.status_code == 400
+
+    await fold_stock_changes(db_session)
+    response = await client.get(f"/books/{book_id}")
+    assert response.json()["copies_available"] == 4
+
+    # Lowering the count withdraws the newest free copies
+    response = await client.put(f"/books/{book_id}", json={"copies_available": 3}, headers=auth_headers)
+    assert response.json()["copies_available"] == 3
+    statuses = await item_statuses(client, auth_headers, book_id)
+    assert statuses["LIB-0002"] == "withdrawn"
+    assert list(statuses.values()).count("available") == 3
+
+
+async def test_generated_barcode_taken_by_preprinted_copy(client: AsyncClient, auth_headers, setup_items):
+    book_id = setup_items["book_id"]
+    # The barcode the next book's first copy would be given
+    taken = f"{book_id + 1:07d}00001"
+
+    response = await client.post(f"/books/{book_id}/items", json={"barcodes": [taken]}, headers=auth_headers)
+    assert response.status_code == 201
+
+    response = await client.post(
+        "/books/",
+        json={
+            "title": "Other Book",
+            "author": "Test Author",
+            "year": 2024,
+            "isbn": "978-0-306-40615-7",
+            "copies_available": 1
+        },
+        headers=auth_headers
+    )
+    assert response.status_code == 409
+    assert taken in response.json()["detail"]
@@ -0,0 +1,45 @@
+import json
+
+from fastapi import FastAPI
+from httpx import AsyncClient
+
+from src.core.openapi import source_fingerprint, use_precomputed_openapi, write_openapi
+from src.main import app
+
+
+def make_app(schema_path) -> FastAPI:
+    fresh = FastAPI(title="Library API")
+
+    @fresh.get("/ping")
+    async def ping():
+        return {}
+
+    use_precomputed_openapi(fresh, str(schema_path))
+    return fresh
+
+
+def test_precomputed_schema_is_served(tmp_path):
+    path = tmp_path / "openapi.json"
+    path.write_text(json.dumps({"fingerprint": source_fingerprint(), "schema": {"openapi": "3.1.0", "paths": {}}}))
+
+    assert make_app(path).openapi()["paths"] == {}
+
+
+def test_stale_or_missing_schema_is_regenerated(tmp_path):
+    path = tmp_path / "openapi.json"
+    assert "/ping" in make_app(path).openapi()["paths"]
+
+    path.write_text(json.dumps({"fingerprint": "stale", "schema": {"openapi": "3.1.0", "paths": {}}}))
+    assert "/ping" in make_app(path).openapi()["paths"]
+
+
+async def test_written_schema_matches_generated(client: AsyncClient, tmp_path):
+    path = tmp_path / "openapi.json"
+    write_openapi(app, str(path))
+
+    stored = json.loads(path.read_text())
+    assert stored["fingerprint"] == source_fingerprint()
+
+    response = await client.get("/openapi.json")
+    assert response.json() == stored["schema"]
+    assert "/borrowing/checkout" in stored["schema"]["paths"]
@@ -0,0 +1,173 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.models.outbox import OutboxEvent
+from src.core.config import Settings
+from src.services.outbox import FileSink, MemorySink, OutboxRelay, make_sink
+
+
+@pytest.fixture
+async def auth_headers(client: AsyncClient):
+    await client.post(
+        "/auth/register",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    response = await client.post(
+        "/auth/login",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def session_factory(engine):
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+class FlakySink(MemorySink):
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    async def deliver(self, events: list[dict]) -> None:
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("sink unavailable")
+        await super().deliver(events)
+
+
+async def circulate(client: AsyncClient, auth_headers) -> int:
+    book_response = await client.post(
+        "/books/",
+        json={
+            "title": "Test Book",
+            "author": "Test Author",
+            "year": 2024,
+            "isbn": "978-3-16-148410-0",
+            "copies_available": 2
+        },
+        headers=auth_headers
+    )
+    book_id = book_response.json()["id"]
+    reader_response = await client.post(
+        "/readers/",
+        json={"name": "Reader", "email": "reader@mail.ru"},
+        headers=auth_headers
+    )
+    reader_id = reader_response.json()["id"]
+
+    loan = {"book_id": book_id, "reader_id": reader_id}
+    await client.post("/borrowing/borrow", json=loan, headers=auth_headers)
+    await client.post("/borrowing/return", json=loan, headers=auth_headers)
+    await client.put(f"/books/{book_id}", json={"title": "Renamed"}, headers=auth_headers)
+    await client.delete(f"/books/{book_id}", headers=auth_headers)
+    return book_id
+
+
+async def test_relay_delivers_events_in_commit_order(client: AsyncClient, auth_headers, db_session, session_factory):
+    book_id = await circulate(client, auth_headers)
+    await db_session.commit()
+
+    sink = MemorySink()
+    relay = OutboxRelay(session_factory, sink, batch_size=2)
+
+    assert await relay.relay_once() == 2
+    assert await relay.relay_once() == 2
+    assert await relay.relay_once() == 1
+    assert await relay.relay_once() == 0
+
+    assert [event["type"] for event in sink.events] == [
+        "book.created", "book.borrowed", "book.returned", "book.updated", "book.deleted"
+    ]
+    assert sink.events[0]["aggregate_id"] == book_id
+    assert sink.events[1]["payload"]["book_id"] == book_id
+    assert sink.events[3]["payload"]["changes"] == {"title": "Renamed"}
+    assert len({event["id"] for event in sink.events}) == 5
+
+    metrics = relay.metrics()
+    assert metrics.delivered == 5
+    assert metrics.last_batch_size == 1
+
+    response = await client.get("/outbox/metrics", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["pending"] == 0
+
+
+async def test_failed_delivery_is_retried_with_backoff(client: AsyncClient, auth_headers, db_session, session_factory):
+    await circulate(client, auth_headers)
+    await db_session.commit()
+
+    sink = FlakySink(failures=2)
+    relay = OutboxRelay(session_factory, sink, batch_size=100, base_backoff=10, max_backoff=15)
+    now = datetime.now(timezone.utc)
+
+    assert await relay.relay_once(now) == 0
+    assert await relay.relay_once(now) == 0
+    assert await relay.relay_once(now + timedelta(seconds=11)) == 0
+    assert sink.events == []
+
+    async with session_factory() as db:
+        events = (await db.execute(select(OutboxEvent))).scalars().all()
+    assert all(event.attempts == 2 and event.delivered_at is None for event in events)
+    assert all("sink unavailable" in event.last_error for event in events)
+
+    # Second backoff is capped at max_backoff
+    assert await relay.relay_once(now + timedelta(seconds=11 + 14)) == 0
+    assert await relay.relay_once(now + timedelta(seconds=11 + 16)) == 5
+    assert len(sink.events) == 5
+    assert relay.metrics().failed_batches == 2
+
+
+async def test_delivered_events_are_purged_after_retention(
+        client: AsyncClient, auth_headers, db_session, session_factory
+):
+    await circulate(client, auth_headers)
+    await db_session.commit()
+
+    sessions = []
+
+    def counting_factory():
+        sessions.append(session_factory())
+        return sessions[-1]
+
+    relay = OutboxRelay(counting_factory, MemorySink(), batch_size=2, retention=timedelta(hours=1))
+    now = datetime.now(timezone.utc)
+    assert await relay.relay_once(now) == 2
+    assert await relay.relay_once(now + timedelta(minutes=30)) == 2
+
+    assert await relay.purge(now + timedelta(minutes=59)) == 0
+    assert await relay.purge(now + timedelta(minutes=61)) == 2
+    sessions.clear()
+    assert await relay.purge(now + timedelta(minutes=91)) == 2
+    # A full batch and the empty one after it, each in its own session
+    assert len(sessions) == 2
+
+    async with session_factory() as db:
+        remaining = (await db.execute(select(OutboxEvent))).scalars().all()
+    # The undelivered event stays, however old it is
+    assert len(remaining) == 1 and remaining[0].delivered_at is None
+
+
+async def test_file_sink_appends_json_lines(tmp_path):
+    path = tmp_path / "events.jsonl"
+    sink = FileSink(str(path))
+
+    await sink.deliver([{"id": 1}, {"id": 2}])
+    await sink.deliver([{"id": 3}])
+
+    assert [json.loads(line)["id"] for line in path.read_text().splitlines()] == [1, 2, 3]
+
+
+def test_unknown_sink_is_rejected():
+    assert isinstance(make_sink("memory"), MemorySink)
+    with pytest.raises(ValueError, match="kafka"):
+        make_sink("kafka")
+    with pytest.raises(ValidationError):
+        Settings(OUTBOX_SINK="flie")
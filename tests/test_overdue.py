@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.models.borrowing import BorrowedBook
+from src.services.overdue import OverdueScheduler
+
+
+@pytest.fixture
+async def auth_headers(client: AsyncClient):
+    await client.post(
+        "/auth/register",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    response = await client.post(
+        "/auth/login",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+async def borrowing_id(client: AsyncClient, auth_headers):
+    book_response = await client.post(
+        "/books/",
+        json={
+            "title": "Test Book",
+            "author": "Test Author",
+            "year": 2024,
+            "isbn": "978-3-16-148410-0",
+            "copies_available": 3
+        },
+        headers=auth_headers
+    )
+    reader_response = await client.post(
+        "/readers/",
+        json={"name": "Artem", "email": "artem@mail.ru"},
+        headers=auth_headers
+    )
+    response = await client.post(
+        "/borrowing/borrow",
+        json={
+            "book_id": book_response.json()["id"],
+            "reader_id": reader_response.json()["id"]
+        },
+        headers=auth_headers
+    )
+    return response.json()["id"]
+
+
+async def make_overdue(db_session: AsyncSession, borrowing_id: int):
+    await db_session.execute(
+        update(BorrowedBook)
+        .where(BorrowedBook.id == borrowing_id)
+        .values(due_date=datetime.now(timezone.utc) - timedelta(days=1))
+    )
+    await db_session.commit()
+
+
+async def test_borrow_sets_due_date(client: AsyncClient, auth_headers, borrowing_id):
+    response = await client.get(f"/borrowing/{borrowing_id}", headers=auth_headers)
+    data = response.json()
+    borrow_date = datetime.fromisoformat(data["borrow_date"])
+    due_date = datetime.fromisoformat(data["due_date"])
+    assert due_date - borrow_date == timedelta(days=14)
+
+
+async def test_get_overdue(client: AsyncClient, auth_headers, db_session, borrowing_id):
+    response = await client.get("/borrowing/overdue", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["total"] == 0
+
+    await make_overdue(db_session, borrowing_id)
+
+    response = await client.get("/borrowing/overdue", headers=auth_headers)
+    assert response.json()["total"] == 1
+    assert response.json()["borrowings"][0]["id"] == borrowing_id
+
+
+async def test_scheduler_emits_each_overdue_loan_once(engine, db_session, borrowing_id):
+    await make_overdue(db_session, borrowing_id)
+
+    scheduler = OverdueScheduler(
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+        batch_size=1
+    )
+    received = []
+    scheduler.subscribe(received.append)
+
+    events = await scheduler.tick()
+    assert [event.borrowing_id for event in events] == [borrowing_id]
+    assert received == events
+
+    assert await scheduler.tick() == []
+
+
+async def test_failed_tick_keeps_due_loans(engine, db_session, borrowing_id, monkeypatch):
+    await make_overdue(db_session, borrowing_id)
+
+    scheduler = OverdueScheduler(async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False))
+
+    async def broken_commit(self):
+        raise ConnectionError("database is down")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(AsyncSession, "commit", broken_commit)
+        with pytest.raises(ConnectionError):
+            await scheduler.tick()
+    assert scheduler.pending == 1
+
+    events = await scheduler.tick()
+    assert [event.borrowing_id for event in events] == [borrowing_id]
@@ -0,0 +1,131 @@
+import asyncio
+import time
+
+import pytest
+from httpx import AsyncClient
+
+from src.core.profiler import Profiler, profiler
+
+
+@pytest.fixture
+async def auth_headers(client: AsyncClient):
+    await client.post(
+        "/auth/register",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    response = await client.post(
+        "/auth/login",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(autouse=True)
+def reset_profiler():
+    yield
+    profiler.stop()
+    profiler.data = None
+
+
+def busy(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def test_sampling_separates_running_and_awaiting_requests():
+    sampler = Profiler()
+    sampler.start(2, interval=0.001)
+
+    async def compute():
+        await asyncio.sleep(0)
+        busy(0.05)
+
+    async def wait():
+        await asyncio.sleep(0.08)
+
+    scope = {"type": "http", "method": "GET", "path": "/books/"}
+    assert sampler.claim(scope) and sampler.claim(scope)
+    assert not sampler.armed
+
+    await asyncio.gather(sampler.profile(scope, compute()), sampler.profile(scope, wait()))
+
+    collapsed = sampler.collapsed()
+    assert ".compute (test_profiler.py:41);busy (test_profiler.py" in collapsed
+    assert any(".wait (" in line and line.rsplit(" ", 1)[0].endswith(";[await]") for line in collapsed.splitlines())
+    assert sampler.status()["await_seconds"] > 0
+
+    speedscope = sampler.speedscope()
+    profile = speedscope["profiles"][0]
+    assert len(profile["samples"]) == len(profile["weights"]) == len(collapsed.splitlines())
+
+
+async def test_profile_requests_to_one_route(client: AsyncClient, auth_headers):
+    book_response = await client.post(
+        "/books/",
+        json={
+            "title": "Test Book",
+            "author": "Test Author",
+            "year": 2024,
+            "isbn": "978-3-16-148410-0",
+            "copies_available": 1
+        },
+        headers=auth_headers
+    )
+    book_id = book_response.json()["id"]
+
+    response = await client.post(
+        "/admin/profiler",
+        json={"requests": 2, "route": "/books/{book_id}", "mode": "cprofile"},
+        headers=auth_headers
+    )
+    assert response.status_code == 201
+    assert response.json()["armed"] is True
+
+    conflict = await client.post("/admin/profiler", json={}, headers=auth_headers)
+    assert conflict.status_code == 409
+
+    await client.get("/books/", headers=auth_headers)
+    for _ in range(3):
+        await client.get(f"/books/{book_id}", headers=auth_headers)
+
+    status = (await client.get("/admin/profiler", headers=auth_headers)).json()
+    assert status["armed"] is False
+    assert status["profiled"] == 2
+    assert status["categories"]["sqlalchemy"] > 0
+    assert status["categories"]["pydantic"] > 0
+
+    collapsed = await client.get("/admin/profiler/profile", headers=auth_headers)
+    assert collapsed.headers["content-type"].startswith("text/plain")
+    assert "[sqlalchemy]" in collapsed.text
+
+    speedscope = await client.get(
+        "/admin/profiler/profile", params={"format": "speedscope"}, headers=auth_headers
+    )
+    assert speedscope.json()["profiles"][0]["type"] == "sampled"
+
+    missing = await client.post(
+        "/admin/profiler", json={"route": "/nowhere"}, headers=auth_headers
+    )
+    assert missing.status_code == 404
+
+
+async def test_record_returns_the_profile_of_this_worker(client: AsyncClient, auth_headers):
+    async def traffic():
+        while not profiler.armed:
+            await asyncio.sleep(0.01)
+        for _ in range(2):
+            await client.get("/books/", headers=auth_headers)
+
+    response, _ = await asyncio.gather(
+        client.post(
+            "/admin/profiler/record",
+            json={"requests": 2, "mode": "cprofile", "wait_seconds": 5},
+            headers=auth_headers
+        ),
+        traffic()
+    )
+    assert response.status_code == 200
+    assert "[sqlalchemy]" in response.text
+    assert profiler.finished
@@ -1,6 +1,9 @@
 import pytest
 from httpx import AsyncClient
 
+from src.core.config import settings
+from src.services.search import escape_like
+
 
 @pytest.fixture
 async def auth_headers(client: AsyncClient):
@@ -32,3 +35,62 @@ async def test_create_reader_without_auth(client: AsyncClient):
         json={"name": "Artem", "email": "artem@mail.ru"}
     )
     assert response.status_code == 401
+
+
+async def test_get_readers_by_ids(client: AsyncClient, auth_headers):
+    reader_ids = []
+    for name in ("Nikita", "Grisha"):
+        response = await client.post(
+            "/readers/",
+            json={"name": name, "email": f"{name.lower()}@mail.ru"},
+            headers=auth_headers
+        )
+        reader_ids.append(response.json()["id"])
+
+    response = await client.get(
+        "/readers/",
+        params={"ids": f"{reader_ids[1]},{reader_ids[0]},42"},
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [reader["name"] for reader in data["readers"]] == ["Grisha", "Nikita"]
+    assert data["missing"] == [42]
+
+
+async def test_search_readers(client: AsyncClient, auth_headers):
+    for name, email in (
+            ("Nikita Petrov", "nikita@mail.ru"),
+            ("Grisha Sokolov", "grisha@mail.ru"),
+            ("Artem Ivanov", "artem.ivanov@gmail.com")
+    ):
+        await client.post("/readers/", json={"name": name, "email": email}, headers=auth_headers)
+
+    response = await client.get("/readers/search", params={"q": "Ivanof"}, headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["readers"][0]["name"] == "Artem Ivanov"
+    assert data["readers"][0]["score"] > 0
+
+    response = await client.get("/readers/search", params={"q": "grsha@mail"}, headers=auth_headers)
+    assert response.json()["readers"][0]["email"] == "grisha@mail.ru"
+
+    response = await client.get("/readers/search", params={"q": "x"}, headers=auth_headers)
+    assert response.status_code == 422
+
+
+async def test_search_keeps_the_best_candidates(client: AsyncClient, auth_headers, monkeypatch):
+    for name, email in (
+            ("Nikita Petrov", "nikita@mail.ru"),
+            ("Grisha Sokolov", "grisha@mail.ru")
+    ):
+        await client.post("/readers/", json={"name": name, "email": email}, headers=auth_headers)
+    monkeypatch.setattr(settings, "READER_SEARCH_CANDIDATES", 1)
+
+    # Every reader shares the "mail" trigrams, the candidate must be the closest one
+    response = await client.get("/readers/search", params={"q": "grsha@mail"}, headers=auth_headers)
+    assert [reader["name"] for reader in response.json()["readers"]] == ["Grisha Sokolov"]
+
+
+def test_like_wildcards_are_escaped():
+    assert escape_like("under_score 100%") == "under\\_score 100\\%"
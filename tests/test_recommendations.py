@@ -0,0 +1,137 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+from src.models.recommendation import BookNeighbour  # noqa: E402
+from src.services.recommendations import CoOccurrence, RecommendationJob  # noqa: E402
+
+
+@pytest.fixture
+async def auth_headers(client: AsyncClient):
+    await client.post(
+        "/auth/register",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    response = await client.post(
+        "/auth/login",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+async def library(client: AsyncClient, auth_headers):
+    book_ids = []
+    for i, title in enumerate(("Dune", "Solaris", "Fiasco", "Hyperion")):
+        response = await client.post(
+            "/books/",
+            json={
+                "title": title,
+                "author": "Author",
+                "year": 1970,
+                "isbn": f"978-3-16-14841-{i}",
+                "copies_available": 5
+            },
+            headers=auth_headers
+        )
+        book_ids.append(response.json()["id"])
+
+    reader_ids = []
+    for name in ("Nikita", "Grisha", "Artem"):
+        response = await client.post(
+            "/readers/",
+            json={"name": name, "email": f"{name.lower()}@mail.ru"},
+            headers=auth_headers
+        )
+        reader_ids.append(response.json()["id"])
+
+    return book_ids, reader_ids
+
+
+async def borrow(client: AsyncClient, auth_headers, reader_id: int, book_id: int):
+    loan = {"book_id": book_id, "reader_id": reader_id}
+    await client.post("/borrowing/borrow", json=loan, headers=auth_headers)
+    await client.post("/borrowing/return", json=loan, headers=auth_headers)
+
+
+def test_incremental_update_matches_full_build():
+    readers = np.array([1, 1, 2, 2, 2, 3])
+    books = np.array([10, 11, 10, 11, 12, 12])
+
+    full = CoOccurrence()
+    full.add(readers, books)
+
+    incremental = CoOccurrence()
+    incremental.add(readers[:3], books[:3])
+    changed = incremental.add(readers[3:], books[3:])
+
+    assert (full.co_occurrence != incremental.co_occurrence).nnz == 0
+    assert set(changed.tolist()) == {10, 11, 12}
+
+    book_ids, ranks, neighbours, scores = full.top_k(np.array([10, 12]), k=1)
+    assert book_ids.tolist() == [10, 12]
+    assert ranks.tolist() == [0, 0]
+    assert neighbours.tolist() == [11, 10]
+    assert scores.tolist() == [2, 1]
+
+
+async def test_related_books(client: AsyncClient, auth_headers, engine, db_session, library):
+    (dune, solaris, fiasco, hyperion), (nikita, grisha, artem) = library
+
+    response = await client.get(f"/books/{dune}/related")
+    assert response.status_code == 200
+    assert response.json() == {"books": [], "total": 0}
+
+    for reader_id, book_id in ((nikita, dune), (nikita, solaris), (grisha, dune), (grisha, solaris),
+                               (grisha, fiasco), (artem, fiasco)):
+        await borrow(client, auth_headers, reader_id, book_id)
+    await db_session.commit()
+
+    job = RecommendationJob(async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False), top_k=5)
+    assert await job.refresh() == 3
+
+    response = await client.get(f"/books/{dune}/related")
+    data = response.json()
+    assert [(book["title"], book["score"]) for book in data["books"]] == [("Solaris", 2), ("Fiasco", 1)]
+
+    # Only the new borrowing is folded in
+    await borrow(client, auth_headers, artem, hyperion)
+    await db_session.commit()
+    assert await job.refresh() == 2
+
+    response = await client.get(f"/books/{hyperion}/related")
+    assert [book["title"] for book in response.json()["books"]] == ["Fiasco"]
+
+    response = await client.get("/books/999/related")
+    assert response.status_code == 404
+
+
+async def test_rebuild_replaces_neighbours_book_by_book(client: AsyncClient, auth_headers, engine, db_session, library):
+    (dune, solaris, _, _), (nikita, _, _) = library
+    for book_id in (dune, solaris):
+        await borrow(client, auth_headers, nikita, book_id)
+    # Left over from a book that has no borrowings any more
+    db_session.add(BookNeighbour(book_id=999, rank=0, neighbour_id=dune, score=1))
+    await db_session.commit()
+
+    job = RecommendationJob(async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False), top_k=5)
+    writes = []
+    write = job._write
+
+    async def observed_write(db, book_ids):
+        # Neighbours of the other books stay readable while the rebuild writes
+        result = await db.execute(select(BookNeighbour.book_id).distinct())
+        writes.append(set(result.scalars()))
+        await write(db, book_ids)
+
+    job._write = observed_write
+    assert await job.rebuild() == 2
+    assert writes == [{999}]
+
+    result = await db_session.execute(select(BookNeighbour.book_id, BookNeighbour.neighbour_id))
+    assert sorted(result.all()) == [(dune, solaris), (solaris, dune)]
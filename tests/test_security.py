@@ -1,6 +1,16 @@
-from datetime import timedelta
+import time
+from datetime import datetime, timedelta, UTC
 
-from src.core.security import hash_password, verify_password, create_access_token, decode_access_token
+import pytest
+
+from src.core.security import (
+    hash_password,
+    verify_password,
+    create_access_token,
+    decode_access_token,
+    token_cache
+)
+from src.core.tokens import InvalidToken, JoseBackend, NativeHMACBackend, VerifiedTokenCache
 
 
 def test_hash_password():
@@ -41,4 +51,53 @@ def test_token_expiration():
     data = {"sub": email}
     token = create_access_token(data, expires_delta=timedelta(seconds=-1))
     decoded = decode_access_token(token)
-    assert decoded is None
\ No newline at end of file
+    assert decoded is None
+
+def test_native_and_jose_backends_agree():
+    claims = {"sub": "user@example.com", "exp": datetime.now(UTC) + timedelta(minutes=5)}
+    native, reference = NativeHMACBackend(), JoseBackend()
+
+    for issuer, verifier in ((native, reference), (reference, native)):
+        token = issuer.encode(claims, "secret", algorithm="HS256")
+        assert verifier.decode(token, "secret", algorithms=["HS256"])["sub"] == "user@example.com"
+
+        with pytest.raises(InvalidToken):
+            verifier.decode(token, "other-secret", algorithms=["HS256"])
+        with pytest.raises(InvalidToken):
+            verifier.decode(token, "secret", algorithms=["HS512"])
+
+    expired = native.encode(
+        {"sub": "user@example.com", "exp": datetime.now(UTC) - timedelta(seconds=1)}, "secret", "HS256"
+    )
+    with pytest.raises(InvalidToken):
+        native.decode(expired, "secret", algorithms=["HS256"])
+
+
+def test_verified_tokens_are_cached():
+    token_cache.clear()
+    token = create_access_token({"sub": "cached@example.com"})
+
+    assert decode_access_token(token)["sub"] == "cached@example.com"
+    assert len(token_cache) == 1
+
+    # Callers get their own copy of the cached payload
+    decode_access_token(token)["sub"] = "changed"
+    assert decode_access_token(token)["sub"] == "cached@example.com"
+
+    assert decode_access_token(token[:-2]) is None
+    assert len(token_cache) == 1
+
+
+def test_token_cache_evicts_expired_and_least_recent():
+    cache = VerifiedTokenCache(maxsize=2)
+    now = time.time()
+
+    cache.set(b"a", {"exp": now + 60})
+    cache.set(b"b", {"exp": now + 60})
+    cache.get(b"a")
+    cache.set(b"c", {"exp": now + 60})
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") is not None
+
+    cache.set(b"d", {"exp": now - 1})
+    assert cache.get(b"d") is None
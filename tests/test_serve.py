@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from src import serve
+from src.core.leader import LeaderElection
+from src.core.config import settings
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    monkeypatch.setattr(settings, "DB_MAX_CONNECTIONS", 100)
+    monkeypatch.setattr(settings, "DB_RESERVED_CONNECTIONS", 10)
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 5)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 10)
+    monkeypatch.setattr(settings, "AVAILABILITY_BACKEND", "memory")
+    monkeypatch.setattr(settings, "IDEMPOTENCY_ENABLED", False)
+    monkeypatch.setattr(settings, "READER_SUMMARY_CACHE_TTL_SECONDS", 0)
+    return monkeypatch
+
+
+def test_pools_fit_the_connection_budget(budget):
+    assert serve.pool_limits(4) == (5, 10)
+    assert serve.pool_limits(16) == (5, 0)
+    assert serve.pool_limits(30) == (3, 0)
+
+    budget.setattr(settings, "AVAILABILITY_BACKEND", "postgres")
+    for workers in range(1, 46):
+        pool_size, max_overflow = serve.pool_limits(workers)
+        assert pool_size >= 1
+        assert workers * (pool_size + max_overflow + 1) <= 90
+
+    with pytest.raises(SystemExit):
+        serve.pool_limits(46)
+
+
+def test_server_options(budget):
+    budget.setattr(settings, "SERVER_LOOP", "auto")
+    budget.setattr(settings, "SERVER_HTTP", "h11")
+
+    options = serve.server_options(4)
+    assert options["loop"] in {"uvloop", "asyncio"}
+    assert options["http"] == "h11"
+    assert options["limit_max_requests"] == settings.SERVER_MAX_REQUESTS
+
+    # Without the supervisor a recycled worker would take the server down
+    assert "limit_max_requests" not in serve.server_options(1)
+    assert serve.available_cpus() >= 1
+
+
+def test_process_local_state_limits_workers(budget):
+    budget.setattr(settings, "DATABASE_URL", "postgresql+asyncpg://library@db/library")
+    budget.setattr(settings, "SERVER_WORKERS", 4)
+    assert serve.worker_count() == 4
+
+    budget.setattr(settings, "IDEMPOTENCY_ENABLED", True)
+    with pytest.raises(SystemExit, match="IDEMPOTENCY_ENABLED"):
+        serve.worker_count()
+
+    budget.setattr(settings, "SERVER_WORKERS", 0)
+    assert serve.worker_count() == 1
+
+
+async def test_background_jobs_run_in_the_elected_worker(engine):
+    ran = asyncio.Event()
+
+    async def job():
+        ran.set()
+        await asyncio.Event().wait()
+
+    # SQLite has a single worker, which is always elected
+    election = LeaderElection(engine, lock_id=1, retry_interval=0.01)
+    task = asyncio.create_task(election.run([job]))
+    await asyncio.wait_for(ran.wait(), timeout=1)
+    assert election.leader
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert not election.leader
+
+
+def test_embedded_mode_runs_one_worker(budget):
+    budget.setattr(settings, "DATABASE_URL", "sqlite+aiosqlite:///library.db")
+    budget.setattr(settings, "SERVER_WORKERS", 8)
+
+    assert serve.worker_count() == 1
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.core.database import enable_sqlite_savepoints, slow_query_log
+from src.core.slow_queries import SlowQueryLog, current_scope
+from src.models.user import Base
+
+
+@pytest.fixture
+async def auth_headers(client: AsyncClient):
+    await client.post(
+        "/auth/register",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    response = await client.post(
+        "/auth/login",
+        json={"email": "libr@mail.ru", "password": "test-pass"}
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def test_slow_statements_are_logged_with_route_and_plan(tmp_path):
+    # A file database, so the EXPLAIN gets a connection of its own
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/library.db")
+    enable_sqlite_savepoints(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    log = SlowQueryLog(threshold_ms=0, size=3, sample_rate=1.0, explain_timeout_ms=1000)
+    log.attach(engine)
+    scope = {"method": "GET", "path": "/books/7", "route": SimpleNamespace(path="/books/{book_id}")}
+    token = current_scope.set(scope)
+    try:
+        async with engine.connect() as conn:
+            for book_id in range(5):
+                await conn.execute(text("SELECT title FROM books WHERE id = :id"), {"id": book_id})
+        await log.drain()
+    finally:
+        current_scope.reset(token)
+        log.detach(engine)
+        await engine.dispose()
+
+    assert len(log.entries) == 3
+    assert all(entry.route == "GET /books/{book_id}" for entry in log.entries)
+    assert not any("EXPLAIN" in entry.statement for entry in log.entries)
+
+    explained = [entry for entry in log.entries if entry.plan is not None]
+    assert explained
+    assert "books" in explained[0].plan
+    assert explained[0].plan_error is None
+
+
+def test_parameters_are_redacted_by_default():
+    log = SlowQueryLog(threshold_ms=0, size=2, sample_rate=0, explain_timeout_ms=1000)
+    entry = log.record(
+        "INSERT INTO users (email, hashed_password) VALUES (:email, :hashed_password)",
+        {"email": "libr@mail.ru", "hashed_password": "$2b$12$hash"},
+        300.0,
+        None
+    )
+    assert entry.parameters == "{'email': '?', 'hashed_password': '?'}"
+
+    log = SlowQueryLog(threshold_ms=0, size=2, sample_rate=0, explain_timeout_ms=1000, log_parameters=True)
+    assert log.record("SELECT :id", {"id": 7}, 300.0, None).parameters == "{'id': 7}"
+
+
+async def test_slow_query_endpoint(client: AsyncClient, auth_headers):
+    slow_query_log.clear()
+    slow_query_log.record("SELECT 1", (), 250.0, "GET /books/")
+    slow_query_log.record("SELECT 2", ("libr@mail.ru", 5), 400.0, None)
+
+    response = await client.get("/admin/slow-queries", params={"limit": 1}, headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["threshold_ms"] == slow_query_log.threshold_ms
+    assert [query["statement"] for query in data["queries"]] == ["SELECT 2"]
+    # Bound values are redacted unless SLOW_QUERY_LOG_PARAMETERS is set
+    assert data["queries"][0]["parameters"] == "('?', '?')"
+
+    assert (await client.get("/admin/slow-queries")).status_code == 401
+    slow_query_log.clear()